@@ -0,0 +1,127 @@
+# Generated from tokendefs.py by 'python -m cssypy.tokentable'. Do not edit.
+
+FAMILIES = [
+    ('BAD_TOKEN', 0x80000000),
+    ('DELIM_TOKEN', 0x00010000),
+    ('DIMENSION_TOKEN', 0x00020000),
+    ('ATKEYWORD_TOKEN', 0x00040000),
+    ('EXTENSION_TOKEN', 0x10000000),
+]
+
+TOKENS = [
+    ('START', 0x00000001),
+    ('EOF', 0x00000002),
+    ('WS', 0x00000003),
+    ('URI', 0x00000004),
+    ('BADURI', 0x80000005),
+    ('UNICODE_RANGE', 0x00000006),
+    ('FUNCTION', 0x00000007),
+    ('IDENT', 0x00000008),
+    ('VARNAME', 0x10000009),
+    ('HASH', 0x0000000A),
+    ('DIMENSION', 0x0002000B),
+    ('PERCENTAGE', 0x0000000C),
+    ('NUMBER', 0x0000000D),
+    ('CDO', 0x0000000E),
+    ('CDC', 0x0000000F),
+    ('NOT', 0x00000010),
+    ('DJANGO_TTAG', 0x10000011),
+    ('DJANGO_TVAR', 0x10000012),
+    ('COLON', 0x00000013),
+    ('SEMICOLON', 0x00000014),
+    ('LBRACE', 0x00000015),
+    ('RBRACE', 0x00000016),
+    ('LPAREN', 0x00000017),
+    ('RPAREN', 0x00000018),
+    ('LSQBRACKET', 0x00000019),
+    ('RSQBRACKET', 0x0000001A),
+    ('STRING', 0x0000001B),
+    ('BADSTRING', 0x8000001C),
+    ('COMMENT', 0x0000001D),
+    ('BADCOMMENT', 0x8000001E),
+    ('IMPORTANT_SYM', 0x0000001F),
+    ('IMPORT_SYM', 0x00040020),
+    ('PAGE_SYM', 0x00040021),
+    ('MEDIA_SYM', 0x00040022),
+    ('CHARSET_SYM', 0x00040023),
+    ('ATKEYWORD_OTHER', 0x00040024),
+    ('INCLUDES', 0x00000025),
+    ('DASHMATCH', 0x00000026),
+    ('PREFIXMATCH', 0x00000027),
+    ('SUFFIXMATCH', 0x00000028),
+    ('SUBSTRINGMATCH', 0x00000029),
+    ('COMMA', 0x0001002A),
+    ('DOT', 0x0001002B),
+    ('PLUS', 0x0001002C),
+    ('CARET', 0x0001002D),
+    ('AMPERSAND', 0x1001002E),
+    ('LESSTHAN', 0x0001002F),
+    ('GREATERTHAN', 0x00010030),
+    ('STAR', 0x00010031),
+    ('FWDSLASH', 0x00010032),
+    ('PIPE', 0x00010033),
+    ('EXCLAMATION', 0x00010034),
+    ('TILDE', 0x00010035),
+    ('MINUS', 0x00010036),
+    ('EQUAL', 0x00010037),
+    ('UNKNOWN', 0x00000038),
+]
+
+TOKEN_REGEXES = [
+    '(?P<WS>(?:[ \\t\\r\\n\\f]+))',
+    '(?P<URI>(?:(?:[Uu][Rr][Ll]\\((?:[ \\t\\r\\n\\f]*)(?:(?:"(?:[^\\n\\r\\f\\\\"]|\\\\(?:\\n|\\r\\n|\\r|\\f)|(?:(?:\\\\[0-9a-fA-F]{1,6}(?:\\r\\n|[ \\n\\r\\t\\f])?)|\\\\[^\\n\\r\\f0-9a-fA-F]))*")|(?:\'(?:[^\\n\\r\\f\\\\\']|\\\\(?:\\n|\\r\\n|\\r|\\f)|(?:(?:\\\\[0-9a-fA-F]{1,6}(?:\\r\\n|[ \\n\\r\\t\\f])?)|\\\\[^\\n\\r\\f0-9a-fA-F]))*\'))(?:[ \\t\\r\\n\\f]*)\\))|(?:[Uu][Rr][Ll]\\((?:[ \\t\\r\\n\\f]*)(?:(?:[!#$%&*-\\[\\]-~]|(?:[^\\0-\\237])|(?:(?:\\\\[0-9a-fA-F]{1,6}(?:\\r\\n|[ \\n\\r\\t\\f])?)|\\\\[^\\n\\r\\f0-9a-fA-F]))*)(?:[ \\t\\r\\n\\f]*)\\))))',
+    '(?P<BADURI>(?:(?:[Uu][Rr][Ll]\\((?:[ \\t\\r\\n\\f]*)(?:(?:[!#$%&*-\\[\\]-~]|(?:[^\\0-\\237])|(?:(?:\\\\[0-9a-fA-F]{1,6}(?:\\r\\n|[ \\n\\r\\t\\f])?)|\\\\[^\\n\\r\\f0-9a-fA-F]))*)(?:[ \\t\\r\\n\\f]*))|(?:[Uu][Rr][Ll]\\((?:[ \\t\\r\\n\\f]*)(?:(?:"(?:[^\\n\\r\\f\\\\"]|\\\\(?:\\n|\\r\\n|\\r|\\f)|(?:(?:\\\\[0-9a-fA-F]{1,6}(?:\\r\\n|[ \\n\\r\\t\\f])?)|\\\\[^\\n\\r\\f0-9a-fA-F]))*")|(?:\'(?:[^\\n\\r\\f\\\\\']|\\\\(?:\\n|\\r\\n|\\r|\\f)|(?:(?:\\\\[0-9a-fA-F]{1,6}(?:\\r\\n|[ \\n\\r\\t\\f])?)|\\\\[^\\n\\r\\f0-9a-fA-F]))*\'))(?:[ \\t\\r\\n\\f]*))|(?:[Uu][Rr][Ll]\\((?:[ \\t\\r\\n\\f]*)(?:(?:"(?:[^\\n\\r\\f\\\\"]|\\\\(?:\\n|\\r\\n|\\r|\\f)|(?:(?:\\\\[0-9a-fA-F]{1,6}(?:\\r\\n|[ \\n\\r\\t\\f])?)|\\\\[^\\n\\r\\f0-9a-fA-F]))*\\\\?)|(?:\'(?:[^\\n\\r\\f\\\\\']|\\\\(?:\\n|\\r\\n|\\r|\\f)|(?:(?:\\\\[0-9a-fA-F]{1,6}(?:\\r\\n|[ \\n\\r\\t\\f])?)|\\\\[^\\n\\r\\f0-9a-fA-F]))*\\\\?)))))',
+    '(?P<UNICODE_RANGE>(?:u\\+[0-9A-Fa-f?]{1,6}(?:-[0-9A-Fa-f]{1,6})?))',
+    '(?P<FUNCTION>(?:(?:-?(?:[_a-zA-Z]|(?:[^\\0-\\237])|(?:(?:\\\\[0-9a-fA-F]{1,6}(?:\\r\\n|[ \\n\\r\\t\\f])?)|\\\\[^\\n\\r\\f0-9a-fA-F]))(?:[_a-zA-Z0-9-]|(?:[^\\0-\\237])|(?:(?:\\\\[0-9a-fA-F]{1,6}(?:\\r\\n|[ \\n\\r\\t\\f])?)|\\\\[^\\n\\r\\f0-9a-fA-F]))*)\\())',
+    '(?P<IDENT>(?:-?(?:[_a-zA-Z]|(?:[^\\0-\\237])|(?:(?:\\\\[0-9a-fA-F]{1,6}(?:\\r\\n|[ \\n\\r\\t\\f])?)|\\\\[^\\n\\r\\f0-9a-fA-F]))(?:[_a-zA-Z0-9-]|(?:[^\\0-\\237])|(?:(?:\\\\[0-9a-fA-F]{1,6}(?:\\r\\n|[ \\n\\r\\t\\f])?)|\\\\[^\\n\\r\\f0-9a-fA-F]))*))',
+    '(?P<VARNAME>(?:\\$(?:-?(?:[_a-zA-Z]|(?:[^\\0-\\237])|(?:(?:\\\\[0-9a-fA-F]{1,6}(?:\\r\\n|[ \\n\\r\\t\\f])?)|\\\\[^\\n\\r\\f0-9a-fA-F]))(?:[_a-zA-Z0-9-]|(?:[^\\0-\\237])|(?:(?:\\\\[0-9a-fA-F]{1,6}(?:\\r\\n|[ \\n\\r\\t\\f])?)|\\\\[^\\n\\r\\f0-9a-fA-F]))*)))',
+    '(?P<HASH>(?:#(?:(?:[_a-zA-Z0-9-]|(?:[^\\0-\\237])|(?:(?:\\\\[0-9a-fA-F]{1,6}(?:\\r\\n|[ \\n\\r\\t\\f])?)|\\\\[^\\n\\r\\f0-9a-fA-F]))+)))',
+    '(?P<DIMENSION>(?:(?:[0-9]*\\.[0-9]+|[0-9]+)(?:-?(?:[_a-zA-Z]|(?:[^\\0-\\237])|(?:(?:\\\\[0-9a-fA-F]{1,6}(?:\\r\\n|[ \\n\\r\\t\\f])?)|\\\\[^\\n\\r\\f0-9a-fA-F]))(?:[_a-zA-Z0-9-]|(?:[^\\0-\\237])|(?:(?:\\\\[0-9a-fA-F]{1,6}(?:\\r\\n|[ \\n\\r\\t\\f])?)|\\\\[^\\n\\r\\f0-9a-fA-F]))*)))',
+    '(?P<PERCENTAGE>(?:(?:[0-9]*\\.[0-9]+|[0-9]+)%))',
+    '(?P<NUMBER>(?:(?:[0-9]*\\.[0-9]+|[0-9]+)))',
+    '(?P<CDO><!--)',
+    '(?P<CDC>-->)',
+    '(?P<NOT>:[Nn][Oo][Tt]\\()',
+    '(?P<DJANGO_TTAG>(?:\\{%(?:[^\\n\\r%\\\'"]|%[^\\n\\r\\}\\\'"]|"[^\\n\\r"]*"|\\\'[^\\n\\r\\\']*\\\')*%\\}))',
+    '(?P<DJANGO_TVAR>(?:\\{\\{(?:[^\\n\\r\\{\\}\\\'"]|"[^\\n\\r"]*"|\\\'[^\\n\\r\\\']*\\\')*\\}\\}))',
+    '(?P<COLON>:)',
+    '(?P<SEMICOLON>;)',
+    '(?P<LBRACE>\\{)',
+    '(?P<RBRACE>\\})',
+    '(?P<LPAREN>\\()',
+    '(?P<RPAREN>\\))',
+    '(?P<LSQBRACKET>\\[)',
+    '(?P<RSQBRACKET>\\])',
+    '(?P<STRING>(?:(?:"(?:[^\\n\\r\\f\\\\"]|\\\\(?:\\n|\\r\\n|\\r|\\f)|(?:(?:\\\\[0-9a-fA-F]{1,6}(?:\\r\\n|[ \\n\\r\\t\\f])?)|\\\\[^\\n\\r\\f0-9a-fA-F]))*")|(?:\'(?:[^\\n\\r\\f\\\\\']|\\\\(?:\\n|\\r\\n|\\r|\\f)|(?:(?:\\\\[0-9a-fA-F]{1,6}(?:\\r\\n|[ \\n\\r\\t\\f])?)|\\\\[^\\n\\r\\f0-9a-fA-F]))*\')))',
+    '(?P<BADSTRING>(?:(?:"(?:[^\\n\\r\\f\\\\"]|\\\\(?:\\n|\\r\\n|\\r|\\f)|(?:(?:\\\\[0-9a-fA-F]{1,6}(?:\\r\\n|[ \\n\\r\\t\\f])?)|\\\\[^\\n\\r\\f0-9a-fA-F]))*\\\\?)|(?:\'(?:[^\\n\\r\\f\\\\\']|\\\\(?:\\n|\\r\\n|\\r|\\f)|(?:(?:\\\\[0-9a-fA-F]{1,6}(?:\\r\\n|[ \\n\\r\\t\\f])?)|\\\\[^\\n\\r\\f0-9a-fA-F]))*\\\\?)))',
+    '(?P<COMMENT>(?:/\\*[^*]*\\*+(?:[^/*][^*]*\\*+)*/))',
+    '(?P<BADCOMMENT>(?:(?:/\\*[^*]*\\*+(?:[^/*][^*]*\\*+)*)|(?:/\\*[^*]*(\\*+?:[^/*][^*]*)*)))',
+    '(?P<IMPORTANT_SYM>(?:!(?:[ \\t\\r\\n\\f]*)[Ii][Mm][Pp][Oo][Rr][Tt][Aa][Nn][Tt]\\b))',
+    '(?P<IMPORT_SYM>(?:@[Ii][Mm][Pp][Oo][Rr][Tt]\\b))',
+    '(?P<PAGE_SYM>(?:@[Pp][Aa][Gg][Ee]\\b))',
+    '(?P<MEDIA_SYM>(?:@[Mm][Ee][Dd][Ii][Aa]\\b))',
+    '(?P<CHARSET_SYM>(?:@charset ))',
+    '(?P<ATKEYWORD_OTHER>(?:@(?:-?(?:[_a-zA-Z]|(?:[^\\0-\\237])|(?:(?:\\\\[0-9a-fA-F]{1,6}(?:\\r\\n|[ \\n\\r\\t\\f])?)|\\\\[^\\n\\r\\f0-9a-fA-F]))(?:[_a-zA-Z0-9-]|(?:[^\\0-\\237])|(?:(?:\\\\[0-9a-fA-F]{1,6}(?:\\r\\n|[ \\n\\r\\t\\f])?)|\\\\[^\\n\\r\\f0-9a-fA-F]))*)))',
+    '(?P<INCLUDES>~=)',
+    '(?P<DASHMATCH>\\|=)',
+    '(?P<PREFIXMATCH>\\^=)',
+    '(?P<SUFFIXMATCH>\\$=)',
+    '(?P<SUBSTRINGMATCH>\\*=)',
+    '(?P<COMMA>,)',
+    '(?P<DOT>\\.)',
+    '(?P<PLUS>\\+)',
+    '(?P<CARET>\\^)',
+    '(?P<AMPERSAND>&)',
+    '(?P<LESSTHAN><)',
+    '(?P<GREATERTHAN>>)',
+    '(?P<STAR>\\*)',
+    '(?P<FWDSLASH>/)',
+    '(?P<PIPE>\\|)',
+    '(?P<EXCLAMATION>!)',
+    '(?P<TILDE>~)',
+    '(?P<MINUS>-)',
+    '(?P<EQUAL>=)',
+    '(?P<UNKNOWN>.)',
+]
+
+NEWLINE_PATTERN = '(?:\\n|\\r\\n|\\r|\\f)'
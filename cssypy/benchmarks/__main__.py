@@ -0,0 +1,5 @@
+from __future__ import absolute_import
+
+from .runner import main
+
+main()
@@ -0,0 +1,156 @@
+"""Reproducible synthetic stylesheets for the benchmarks.
+
+Each generator takes a size (roughly the number of rulesets) and a
+random.Random instance, and returns a dict mapping filenames to their
+contents. The stylesheet to compile is always MAIN; other files are
+imported from it. The same size and seed give the same corpus (on the same
+major version of Python, whose random number generators differ).
+"""
+from __future__ import absolute_import
+from __future__ import print_function
+
+import collections
+import io
+import os.path
+import posixpath
+import random
+
+from .. import filesystems
+from ..utils.py3compat import range
+
+MAIN = 'main.css'
+
+PROPERTIES = [u'color', u'background-color', u'margin', u'padding',
+              u'border-width', u'font-size', u'line-height', u'width',
+              u'height', u'top', u'left', u'opacity', u'z-index']
+UNITS = [u'px', u'em', u'rem', u'%', u'pt']
+
+
+#==============================================================================#
+def _selector(rand, i):
+    kind = rand.randint(0, 3)
+    if kind == 0:
+        return u'.block-{0}'.format(i)
+    elif kind == 1:
+        return u'#item-{0} > .label'.format(i)
+    elif kind == 2:
+        return u'ul.menu-{0} li a:hover'.format(i)
+    return u'.block-{0}__elem--mod, .block-{0} + p'.format(i)
+
+def _value(rand):
+    kind = rand.randint(0, 3)
+    if kind == 0:
+        return u'#{0:06x}'.format(rand.randint(0, 0xFFFFFF))
+    elif kind == 1:
+        return u'{0}{1}'.format(rand.randint(0, 100), rand.choice(UNITS))
+    elif kind == 2:
+        return u'{0}px {1}px'.format(rand.randint(0, 20), rand.randint(0, 20))
+    return u'"Helvetica Neue", Arial, sans-serif'
+
+def _declarations(rand, count):
+    return u' '.join(u'{0}: {1};'.format(rand.choice(PROPERTIES), _value(rand))
+                     for _ in range(count))
+
+def _rulesets(rand, count, offset=0):
+    return u''.join(u'{0} {{ {1} }}\n'.format(_selector(rand, offset + i),
+                                              _declarations(rand, 4))
+                    for i in range(count))
+
+
+#==============================================================================#
+def flat(size, rand):
+    """Plain CSS: 'size' rulesets, nothing to solve or flatten."""
+    return {MAIN: _rulesets(rand, size)}
+
+def nested(size, rand, depth=4, fanout=2):
+    """About 'size' rulesets, nested 'depth' levels deep with 'fanout'
+    children per level.
+    """
+    per_block = sum(fanout ** level for level in range(depth))
+    def block(level, i):
+        selectors = u', '.join(u'.n{0}-{1}-{2}'.format(level, i, j)
+                               for j in range(fanout))
+        if level + 1 < depth:
+            inner = u' '.join(block(level + 1, i) for _ in range(fanout))
+        else:
+            inner = u''
+        return u'{0} {{ {1} {2} }}'.format(selectors,
+                                           _declarations(rand, 2), inner)
+    nblocks = max(1, size // per_block)
+    return {MAIN: u'\n'.join(block(0, i) for i in range(nblocks)) + u'\n'}
+
+def variables(size, rand, nvars=20):
+    """'nvars' variables used in arithmetic in 'size' rulesets."""
+    parts = [u'$v{0}: {1}px;\n'.format(i, rand.randint(1, 50))
+             for i in range(nvars)]
+    for i in range(size):
+        a, b, c = (rand.randrange(nvars) for _ in range(3))
+        parts.append(u'.var-{0} {{ margin: $v{1}+$v{2}; padding: $v{3}*2; '
+                     u'width: ($v{1}+10px)*3; }}\n'.format(i, a, b, c))
+    return {MAIN: u''.join(parts)}
+
+def imports(size, rand, fanout=10):
+    """MAIN imports 'fanout' partials, which share 'size' rulesets and each
+    import one of a few common files.
+    """
+    files = {}
+    ncommon = max(1, fanout // 3)
+    for i in range(ncommon):
+        files['common-{0}.css'.format(i)] = _rulesets(rand, 2, offset=1000*i)
+    per_partial = max(1, size // fanout)
+    main = []
+    for i in range(fanout):
+        name = 'partial-{0}.css'.format(i)
+        files[name] = u'@import "common-{0}.css";\n{1}'.format(
+                            i % ncommon,
+                            _rulesets(rand, per_partial, offset=i*per_partial))
+        main.append(u'@import "{0}";\n'.format(name))
+    main.append(_rulesets(rand, max(1, size // 10)))
+    files[MAIN] = u''.join(main)
+    return files
+
+def colors(size, rand):
+    """'size' rulesets calling the color functions with computed arguments."""
+    parts = []
+    for i in range(size):
+        r, g, b = (rand.randint(0, 120) for _ in range(3))
+        h = rand.randint(0, 359)
+        parts.append(u'.color-{0} {{ color: rgb({1}*2, {2}+10, {3}); '
+                     u'background-color: hsl({4}, 50%, 40%); '
+                     u'border-color: #{5:06x}; }}\n'.format(
+                        i, r, g, b, h, rand.randint(0, 0xFFFFFF)))
+    return {MAIN: u''.join(parts)}
+
+CORPORA = collections.OrderedDict([
+    ('flat', flat),
+    ('nested', nested),
+    ('variables', variables),
+    ('imports', imports),
+    ('colors', colors),
+])
+
+
+#==============================================================================#
+def generate(name, size, seed=0):
+    """Returns the files of the corpus 'name'."""
+    return CORPORA[name](size, random.Random(seed))
+
+def write(name, size, directory, seed=0):
+    """Writes the corpus 'name' to 'directory' and returns the path of its
+    MAIN file.
+    """
+    for filename, data in generate(name, size, seed).items():
+        with io.open(os.path.join(directory, filename), 'w',
+                     encoding='utf-8') as f:
+            f.write(data)
+    return os.path.join(directory, MAIN)
+
+def load(name, size, seed=0, directory='/corpus'):
+    """Loads the corpus 'name' into a filesystems.MemoryFileSystem, in
+    'directory'. Returns the filesystem and the path of its MAIN file.
+    """
+    files = generate(name, size, seed)
+    fs = filesystems.MemoryFileSystem(
+            dict((posixpath.join(directory, filename), data)
+                 for filename, data in files.items()))
+    return fs, posixpath.join(directory, MAIN)
@@ -0,0 +1,116 @@
+"""Benchmark for writing encoded output.
+
+Formats a generated stylesheet (with some non-ASCII strings) to a byte
+stream and reports the throughput in MB/s of bytes written, for:
+
+  lines     the previous formatter buffer, writing one line at a time through
+            a codecs StreamWriter
+  blocks    the chunk writer, writing blocks through a codecs StreamWriter
+  encoded   the chunk writer, writing through writers.EncodedOutput
+
+in UTF-8 and in ASCII (where the non-ASCII characters are escaped). The
+'write' rows time the encoding alone: the formatted output is written one
+line at a time through a StreamWriter and through EncodedOutput.
+
+Usage: python -m cssypy.benchmarks.encoding [RULESETS]
+"""
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+
+import codecs
+import io
+import sys
+import time
+
+from .. import parsers, writers
+from ..utils import stringutil
+from ..visitors import formatters
+from ..utils.py3compat import range
+from .output import LegacyFormatterVisitor
+
+DEFAULT_RULESETS = 5000
+ENCODINGS = ('utf-8', 'ascii')
+
+
+def generate_source(nrulesets):
+    parts = []
+    for i in range(nrulesets):
+        parts.append(u'.item-{0} .label, .item-{0} .title {{ '
+                     u'margin: {0}px 2em; color: #ABCDEF; '
+                     u'font-family: "Helvetica Neue", Arial; '.format(i))
+        if i % 10 == 0:
+            parts.append(u'content: "\u00e9t\u00e9 \u2014 {0}"; '.format(i))
+        parts.append(u'}\n')
+    return u''.join(parts)
+
+def codecs_stream(stream, encoding):
+    return codecs.getwriter(encoding)(stream, errors='cssypy')
+
+def encoded_stream(stream, encoding):
+    return writers.EncodedOutput(stream, encoding)
+
+def time_output(Formatter, make_stream, stylesheet, encoding, repeat):
+    best = None
+    for _ in range(repeat):
+        output = io.BytesIO()
+        start = time.time()
+        stream = make_stream(output, encoding)
+        Formatter(stream).visit(stylesheet)
+        if hasattr(stream, 'flush'):
+            stream.flush()
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, output.getvalue()
+
+def time_encoding(make_stream, lines, encoding, repeat):
+    best = None
+    for _ in range(repeat):
+        output = io.BytesIO()
+        start = time.time()
+        stream = make_stream(output, encoding)
+        for line in lines:
+            stream.write(line)
+        if hasattr(stream, 'flush'):
+            stream.flush()
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, output.getvalue()
+
+def run(nrulesets=DEFAULT_RULESETS, repeat=3):
+    stringutil.register_unicode_handlers()
+    stylesheet = parsers.Parser(generate_source(nrulesets)).parse()
+    results = []
+    for encoding in ENCODINGS:
+        outputs = []
+        for name, Formatter, make_stream in (
+                ('lines', LegacyFormatterVisitor, codecs_stream),
+                ('blocks', formatters.CSSFormatterVisitor, codecs_stream),
+                ('encoded', formatters.CSSFormatterVisitor, encoded_stream)):
+            seconds, output = time_output(Formatter, make_stream, stylesheet,
+                                          encoding, repeat)
+            outputs.append(output)
+            results.append(('{0}/{1}'.format(name, encoding), seconds,
+                            len(output)))
+        lines = io.StringIO(outputs[0].decode(encoding)).readlines()
+        for name, make_stream in (('write-codecs', codecs_stream),
+                                  ('write-encoded', encoded_stream)):
+            seconds, output = time_encoding(make_stream, lines, encoding,
+                                            repeat)
+            outputs.append(output)
+            results.append(('{0}/{1}'.format(name, encoding), seconds,
+                            len(output)))
+        assert all(output == outputs[0] for output in outputs)
+    return results
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    nrulesets = int(argv[0]) if argv else DEFAULT_RULESETS
+    for name, seconds, nbytes in run(nrulesets):
+        print('{0:<20} {1:>8.3f}s  {2:>8.2f} MB/s  ({3} bytes)'.format(
+                name, seconds, nbytes / seconds / 1e6 if seconds else 0,
+                nbytes))
+
+
+if __name__ == '__main__':
+    main()
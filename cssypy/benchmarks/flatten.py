@@ -0,0 +1,63 @@
+"""Benchmark for flattening nested rulesets.
+
+Builds a stylesheet with DEPTH levels of nested rulesets, each with FANOUT 
+comma-separated selectors, and times the chain-based and single-pass 
+flatteners on it.
+
+Usage: python -m cssypy.benchmarks.flatten [DEPTH [FANOUT]]
+"""
+from __future__ import absolute_import
+from __future__ import print_function
+
+import sys
+import time
+
+from .. import parsers
+from ..visitors import flatteners
+from ..utils.py3compat import range
+
+DEFAULT_DEPTH = 6
+DEFAULT_FANOUT = 5
+
+
+def nested_source(depth, fanout, level=0):
+    selectors = u', '.join(u'.l{0}-{1}'.format(level, i) 
+                           for i in range(fanout))
+    if level + 1 < depth:
+        inner = nested_source(depth, fanout, level+1)
+    else:
+        inner = u''
+    return u'{0} {{ p: {1}; {2} }}'.format(selectors, level, inner)
+    
+def time_flattener(Flattener, src, repeat):
+    best = None
+    for _ in range(repeat):
+        stylesheet = parsers.Parser(src).parse()
+        start = time.time()
+        stylesheet = Flattener()(stylesheet)
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    nselectors = sum(len(ruleset.selectors) for ruleset in stylesheet.statements)
+    return best, nselectors
+    
+def run(depth=DEFAULT_DEPTH, fanout=DEFAULT_FANOUT, repeat=3):
+    src = nested_source(depth, fanout)
+    results = []
+    for name, Flattener in (('chain', flatteners.ChainRulesetFlattener), 
+                            ('single-pass', flatteners.RulesetFlattener)):
+        seconds, nselectors = time_flattener(Flattener, src, repeat)
+        results.append((name, seconds, nselectors))
+    return results
+    
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    depth = int(argv[0]) if len(argv) > 0 else DEFAULT_DEPTH
+    fanout = int(argv[1]) if len(argv) > 1 else DEFAULT_FANOUT
+    for name, seconds, nselectors in run(depth, fanout):
+        print('{0:<12} {1:>8.3f}s  {2} selectors'.format(name, seconds, 
+                                                         nselectors))
+    
+    
+if __name__ == '__main__':
+    main()
+
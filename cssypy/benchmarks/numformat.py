@@ -0,0 +1,68 @@
+"""Micro-benchmark for formatting solved numbers.
+
+Usage: python -m cssypy.benchmarks.numformat [CALLS]
+"""
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+
+import sys
+import time
+
+from ..utils import numformat
+from ..utils.py3compat import range
+
+DEFAULT_CALLS = 1000000
+
+
+def legacy_format_number(n, precision):
+    # The formatting done by the numeric nodes before numformat existed.
+    return numformat.strip_trailing_zeros(u'{0:.{p}f}'.format(n, p=precision))
+    
+def sample_values(count):
+    # Mostly integers, halves and thirds, as produced by typical stylesheets, 
+    # with some arbitrary fractions.
+    values = []
+    for i in range(count):
+        k = i % 100
+        if k < 40:
+            values.append(k)
+        elif k < 60:
+            values.append(k + 0.5)
+        elif k < 80:
+            values.append(k / 3)
+        elif k < 90:
+            values.append(float(k))
+        else:
+            values.append(i / 7)
+    return values
+    
+def time_calls(func, values, precision):
+    start = time.time()
+    for n in values:
+        func(n, precision)
+    return time.time() - start
+    
+def run(calls=DEFAULT_CALLS, precision=3):
+    values = sample_values(calls)
+    for n in values:
+        assert numformat.format_number(n, precision) == \
+               legacy_format_number(n, precision), n
+    results = []
+    for name, func in (('legacy', legacy_format_number), 
+                       ('numformat', numformat.format_number)):
+        results.append((name, time_calls(func, values, precision)))
+    return results
+    
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    calls = int(argv[0]) if argv else DEFAULT_CALLS
+    results = run(calls)
+    for name, seconds in results:
+        print('{0:<12} {1:>8.3f}s  {2:>12,.0f} calls/s'.format(
+                name, seconds, calls / seconds if seconds else 0))
+    
+    
+if __name__ == '__main__':
+    main()
+
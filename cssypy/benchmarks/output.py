@@ -0,0 +1,112 @@
+"""Benchmark for writing formatted CSS.
+
+Formats a generated stylesheet with long selector lists (which wrap) and 
+some very long declarations (which don't), and reports the throughput of 
+the formatter in MB/s of CSS emitted, for the chunk-list writer and for the 
+previous string-concatenation buffer.
+
+Usage: python -m cssypy.benchmarks.output [RULESETS]
+"""
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+
+import io
+import sys
+import time
+
+from .. import parsers
+from ..visitors import formatters
+from ..utils.py3compat import range
+
+DEFAULT_RULESETS = 2000
+# Every LONG_EVERY-th ruleset has a declaration with LONG_TERMS values.
+LONG_EVERY = 100
+LONG_TERMS = 5000
+
+
+class LegacyFormatterVisitor(formatters.CSSFormatterVisitor):
+    """The formatter with its previous output buffer, which appends to a 
+    string and slices it at optional newlines.
+    """
+    def __init__(self, stream):
+        super(LegacyFormatterVisitor, self).__init__(stream)
+        del self.write
+        self._cache = u''
+        self._last_optional_newline = 0
+        
+    def newline(self):
+        self.write(u'\n')
+        self.flush()
+        self.write(self.indent_str * self.indent_level)
+        
+    def write(self, data):
+        self._cache += data
+        if self._last_optional_newline and len(self._cache) > self.line_width:
+            temp = self._cache[self._last_optional_newline:]
+            self._cache = self._cache[:self._last_optional_newline]
+            self.newline()
+            self._cache = temp
+        
+    def optional_newline(self):
+        if len(self._cache) > self.line_width:
+            self.newline()
+        else:
+            self._last_optional_newline = len(self._cache)
+        
+    def flush(self):
+        self.stream.write(self._cache)
+        self._cache = u''
+        self._last_optional_newline = 0
+        
+        
+def generate_source(nrulesets):
+    parts = []
+    for i in range(nrulesets):
+        nselectors = 1 + (i % 40)
+        selectors = u', '.join(u'.block-{0} .element-{1}:hover'.format(i, j) 
+                               for j in range(nselectors))
+        parts.append(u'{0} {{ color: #AABBCC; margin: {1}px 2em 0 auto; '
+                     u'font-family: a, b, c; '.format(selectors, i))
+        if i % LONG_EVERY == 0:
+            parts.append(u'will-change: {0}; '.format(
+                u', '.join(u'prop-{0}'.format(j) for j in range(LONG_TERMS))))
+        parts.append(u'}\n')
+    return u''.join(parts)
+    
+def time_formatter(Formatter, stylesheet, repeat):
+    best = None
+    for _ in range(repeat):
+        stream = io.StringIO()
+        start = time.time()
+        Formatter(stream).visit(stylesheet)
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, stream.getvalue()
+    
+def run(nrulesets=DEFAULT_RULESETS, repeat=3):
+    stylesheet = parsers.Parser(generate_source(nrulesets)).parse()
+    results = []
+    outputs = []
+    for name, Formatter in (('legacy', LegacyFormatterVisitor), 
+                            ('chunks', formatters.CSSFormatterVisitor), 
+                            ('minify', formatters.MinifyingFormatterVisitor)):
+        seconds, output = time_formatter(Formatter, stylesheet, repeat)
+        outputs.append(output)
+        nbytes = len(output.encode('utf-8'))
+        results.append((name, seconds, nbytes))
+    assert outputs[0] == outputs[1]
+    return results
+    
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    nrulesets = int(argv[0]) if argv else DEFAULT_RULESETS
+    for name, seconds, nbytes in run(nrulesets):
+        print('{0:<8} {1:>8.3f}s  {2:>8.2f} MB/s  ({3} bytes)'.format(
+                name, seconds, nbytes / seconds / 1e6 if seconds else 0, 
+                nbytes))
+    
+    
+if __name__ == '__main__':
+    main()
+
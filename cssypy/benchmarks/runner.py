@@ -0,0 +1,104 @@
+"""Runs the stage benchmarks on the generated corpora and writes the results 
+as JSON.
+
+The corpora are compiled from memory (see filesystems.MemoryFileSystem), or
+from temporary files with --disk.
+
+Usage: python -m cssypy.benchmarks [--size N] [--repeat N] [--seed N] 
+                                   [--disk] [--output FILE] [CORPUS ...]
+"""
+from __future__ import absolute_import
+from __future__ import print_function
+
+import argparse
+import json
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+from .. import __version__
+from . import corpora, stages
+
+DEFAULT_SIZE = 500
+DEFAULT_REPEAT = 3
+
+
+def run_on_disk(name, size, repeat, seed):
+    directory = tempfile.mkdtemp(prefix='cssypy-bench-')
+    try:
+        filename = corpora.write(name, size, directory, seed)
+        return stages.time_stages(filename, repeat=repeat)
+    finally:
+        shutil.rmtree(directory)
+        
+def run_in_memory(name, size, repeat, seed):
+    filesystem, filename = corpora.load(name, size, seed)
+    return stages.time_stages(filename, repeat=repeat, filesystem=filesystem)
+
+def run(names=None, size=DEFAULT_SIZE, repeat=DEFAULT_REPEAT, seed=0, 
+        disk=False):
+    """Returns the results for the corpora 'names' (default: all) as a dict 
+    that can be written as JSON. With 'disk', the corpora are written to 
+    temporary files instead of being read from memory.
+    """
+    names = names or list(corpora.CORPORA)
+    run_corpus = run_on_disk if disk else run_in_memory
+    results = {}
+    for name in names:
+        results[name] = run_corpus(name, size, repeat, seed)
+    return {
+        'cssypy': __version__,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'size': size,
+        'repeat': repeat,
+        'seed': seed,
+        'disk': disk,
+        'corpora': results,
+    }
+    
+def get_argparser():
+    parser = argparse.ArgumentParser(prog='python -m cssypy.benchmarks', 
+                        description='Time each stage of compiling generated '
+                                    'stylesheets.')
+    parser.add_argument('corpora', nargs='*', metavar='CORPUS', 
+                        help='corpora to run: {0} (default: all)'.format(
+                                ', '.join(corpora.CORPORA)))
+    parser.add_argument('--size', type=int, default=DEFAULT_SIZE, 
+                        help='about the number of rulesets in each corpus '
+                             '(default: %(default)s)')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, 
+                        help='runs of each stage; the best time is kept '
+                             '(default: %(default)s)')
+    parser.add_argument('--seed', type=int, default=0, 
+                        help='seed of the corpus generators '
+                             '(default: %(default)s)')
+    parser.add_argument('--disk', action='store_true', 
+                        help='compile the corpora from temporary files '
+                             'instead of from memory')
+    parser.add_argument('--output', '-o', metavar='FILE', 
+                        help='write the JSON results to FILE instead of '
+                             'stdout')
+    return parser
+    
+def main(argv=None):
+    args = get_argparser().parse_args(argv)
+    for name in args.corpora:
+        if name not in corpora.CORPORA:
+            sys.exit('Unknown corpus: {0!r}'.format(name))
+    results = run(args.corpora, size=args.size, repeat=args.repeat, 
+                  seed=args.seed, disk=args.disk)
+    data = json.dumps(results, indent=2, sort_keys=True, 
+                      separators=(',', ': '))
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(data + '\n')
+    else:
+        print(data)
+        
+        
+if __name__ == '__main__':
+    main()
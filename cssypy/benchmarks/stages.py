@@ -0,0 +1,78 @@
+"""Times each stage of compiling a stylesheet separately.
+
+The stages are: read (decode the file), scan (tokenize), parse (scan and
+build the tree), import, solve, flatten and format. Each stage is run
+'repeat' times on a fresh tree and the best time is kept.
+"""
+from __future__ import absolute_import
+from __future__ import print_function
+
+import io
+import time
+
+from .. import csstokens as tokens
+from .. import optionsdict, processors, readers
+from ..scanners import Scanner
+from ..visitors import flatteners, formatters, solvers
+from ..utils.py3compat import range
+
+STAGES = ('read', 'scan', 'parse', 'import', 'solve', 'flatten', 'format')
+
+
+#==============================================================================#
+class Timer(object):
+    """Keeps the best time of each stage."""
+    def __init__(self):
+        self.best = {}
+
+    def time(self, stage, func, *args):
+        start = time.time()
+        result = func(*args)
+        elapsed = time.time() - start
+        if stage not in self.best or elapsed < self.best[stage]:
+            self.best[stage] = elapsed
+        return result
+
+
+def read(filename, filesystem=None):
+    return readers.FileReader(filename, filesystem=filesystem).read()
+
+def scan(data):
+    count = 0
+    for tok in Scanner(data):
+        if tok.type == tokens.EOF:
+            break
+        count += 1
+    return count
+
+def format(rootnode):
+    stream = io.StringIO()
+    formatters.CSSFormatterVisitor(stream).visit(rootnode)
+    return stream.getvalue()
+
+def time_stages(filename, options=None, repeat=3, filesystem=None):
+    """Compiles the stylesheet 'filename' 'repeat' times. Returns a dict with
+    the best time of each stage in seconds, their total (not counting 'scan',
+    which is part of 'parse'), and the sizes of the input and output. The
+    files are read from 'filesystem' (default: the real filesystem).
+    """
+    options = optionsdict.Options(dict(options or {},
+                                       PROPAGATE_EXCEPTIONS=True))
+    timer = Timer()
+    for _ in range(repeat):
+        data = timer.time('read', read, filename, filesystem)
+        ntokens = timer.time('scan', scan, data)
+        proc = processors.Processor(options=options, filesystem=filesystem)
+        stylesheet = timer.time('parse', proc.parse_string, data, filename)
+        timer.time('import', proc.process_imports)
+        rootnode = stylesheet.rootnode
+        timer.time('solve', solvers.Solver(options), rootnode)
+        timer.time('flatten', flatteners.RulesetFlattener(options), rootnode)
+        output = timer.time('format', format, rootnode)
+    return {
+        'stages': dict((stage, timer.best[stage]) for stage in STAGES),
+        'total': sum(timer.best[stage] for stage in STAGES if stage != 'scan'),
+        'input_chars': len(data),
+        'tokens': ntokens,
+        'output_chars': len(output),
+    }
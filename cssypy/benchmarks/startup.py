@@ -0,0 +1,139 @@
+"""Benchmark for the startup time of the command line entry point.
+
+Runs a fresh interpreter that imports ENTRY_POINT (best of 'repeat' runs) and
+reports the time spent importing it, and the modules that took the most time
+to import themselves.
+
+On Python 3.7 and later, the import times are read from the output of
+'python -X importtime'. On older versions, which lack that option, each
+module is timed by wrapping __import__ in the child interpreter.
+
+Usage: python -m cssypy.benchmarks.startup [REPEAT]
+"""
+from __future__ import absolute_import
+from __future__ import print_function
+
+import os
+import subprocess
+import sys
+
+from ..utils.py3compat import range
+
+ENTRY_POINT = 'cssypy.main'
+DEFAULT_REPEAT = 5
+TOP_MODULES = 15
+
+# Run in the child interpreter when -X importtime is not available: writes
+# lines in the format of -X importtime to stderr. An import is reported under
+# the names of the modules it loaded, not counting those loaded by the
+# imports nested in it.
+IMPORT_TIMER = '''
+import sys, time
+try:
+    import __builtin__ as builtins
+except ImportError:
+    import builtins
+_import = builtins.__import__
+_stack = []     # [time, modules] of the nested imports of each import
+def timed_import(name, globals=None, locals=None, fromlist=(), level=-1):
+    if name in sys.modules and not fromlist:
+        return _import(name, globals, locals, fromlist, level)
+    before = set(sys.modules)
+    _stack.append([0.0, set()])
+    start = time.time()
+    try:
+        return _import(name, globals, locals, fromlist, level)
+    finally:
+        elapsed = time.time() - start
+        nested, nested_modules = _stack.pop()
+        loaded = set(m for m in sys.modules
+                     if m not in before and sys.modules[m] is not None)
+        if _stack:
+            _stack[-1][0] += elapsed
+            _stack[-1][1].update(loaded)
+        own = loaded - nested_modules
+        if own:
+            sys.stderr.write('import time: %d | %d | %s\\n' % (
+                (elapsed - nested) * 1e6, elapsed * 1e6, ', '.join(sorted(own))))
+builtins.__import__ = timed_import
+import {0}
+'''
+
+
+#==============================================================================#
+def has_importtime():
+    return sys.version_info >= (3, 7)
+
+def import_command(module):
+    if has_importtime():
+        return [sys.executable, '-X', 'importtime', '-c',
+                'import {0}'.format(module)]
+    return [sys.executable, '-c', IMPORT_TIMER.format(module)]
+
+def parse_importtime(output):
+    """Returns a list of (module, self us, cumulative us) tuples from the
+    output of -X importtime.
+    """
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        try:
+            own, cumulative = int(fields[0]), int(fields[1])
+        except ValueError:
+            continue    # the header line
+        modules.append((fields[2].strip(), own, cumulative))
+    return modules
+
+def time_imports(module=ENTRY_POINT):
+    """Imports 'module' in a new interpreter. Returns the list of the modules
+    it imported, as returned by parse_importtime().
+    """
+    env = dict(os.environ)
+    # Import the code of this checkout.
+    root = os.path.dirname(os.path.dirname(os.path.dirname(
+                                                os.path.abspath(__file__))))
+    env['PYTHONPATH'] = os.pathsep.join(
+                            p for p in (root, env.get('PYTHONPATH')) if p)
+    proc = subprocess.Popen(import_command(module), env=env,
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    stdout, stderr = proc.communicate()
+    if proc.returncode:
+        raise RuntimeError(stderr.decode('utf-8', 'replace'))
+    return parse_importtime(stderr.decode('utf-8', 'replace'))
+
+def total_time(modules, module=ENTRY_POINT):
+    # The cumulative time of 'module' (in us).
+    for name, own, cumulative in modules:
+        if module in name.split(', '):
+            return cumulative
+    raise ValueError("'{0}' was not imported".format(module))
+
+def run(repeat=DEFAULT_REPEAT, module=ENTRY_POINT):
+    """Returns a (total us, modules) tuple for the fastest of 'repeat'
+    imports of 'module'.
+    """
+    best = None
+    for _ in range(repeat):
+        modules = time_imports(module)
+        total = total_time(modules, module)
+        if best is None or total < best[0]:
+            best = (total, modules)
+    return best
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    repeat = int(argv[0]) if argv else DEFAULT_REPEAT
+    total, modules = run(repeat)
+    print('import {0}: {1:.1f} ms ({2} imports)'.format(
+            ENTRY_POINT, total / 1000., len(modules)))
+    print('{0:>10}  {1:>10}  {2}'.format('self ms', 'cum ms', 'module'))
+    for name, own, cumulative in sorted(modules, key=lambda m: -m[1]
+                                        )[:TOP_MODULES]:
+        print('{0:>10.2f}  {1:>10.2f}  {2}'.format(own / 1000.,
+                                                   cumulative / 1000., name))
+
+
+if __name__ == '__main__':
+    main()
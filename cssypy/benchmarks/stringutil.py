@@ -0,0 +1,114 @@
+"""Micro-benchmarks for escaping and unescaping names, identifiers and
+strings.
+
+Each function of utils.stringutil is timed against its previous version,
+which always ran the regular expressions, on a sample where most values
+need no escaping and many values repeat.
+
+Usage: python -m cssypy.benchmarks.stringutil [CALLS]
+"""
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+
+import sys
+import time
+
+from ..utils import stringutil
+from ..utils.py3compat import range
+
+DEFAULT_CALLS = 200000
+
+
+#==============================================================================#
+# The previous versions of the functions.
+def legacy_unescape_identifier(ident):
+    return stringutil.re_unescape_ident.sub(stringutil._unescape_ident, ident)
+
+def legacy_unescape_string(s):
+    return stringutil.re_unescape_string.sub(stringutil._unescape_string, s)
+
+def legacy_escape_name(name):
+    if not name:
+        return name
+    return stringutil.re_escape_nmchar.sub(stringutil._escape_nmchar, name)
+
+def legacy_escape_identifier(ident):
+    if not ident:
+        return ident
+    return stringutil._escape_identifier(ident)
+
+def legacy_escape_string(s, quote_type='double'):
+    if quote_type == 'double':
+        return stringutil.re_escape_dquote_string.sub(u'\\\\\\g<0>', s)
+    return stringutil.re_escape_squote_string.sub(u'\\\\\\g<0>', s)
+
+
+#==============================================================================#
+def sample_identifiers(count):
+    # One in a hundred needs (un)escaping; most names repeat.
+    values = []
+    for i in range(count):
+        k = i % 100
+        if k == 0:
+            values.append(u'a\\:b{0}'.format(i % 1000))
+        elif k == 1:
+            values.append(u'2col-{0}'.format(i % 1000))
+        elif k < 50:
+            values.append(u'color')
+        elif k < 80:
+            values.append(u'block-{0}'.format(k))
+        else:
+            values.append(u'element-{0}'.format(i % 5000))
+    return values
+
+def sample_strings(count):
+    values = []
+    for i in range(count):
+        if i % 100 == 0:
+            values.append(u'say \\"hello\\" {0}'.format(i % 1000))
+        else:
+            values.append(u'Helvetica Neue {0}'.format(i % 50))
+    return values
+
+BENCHMARKS = [
+    # (name, legacy, current, sample)
+    ('unescape_identifier', legacy_unescape_identifier,
+     stringutil.unescape_identifier, sample_identifiers),
+    ('unescape_string', legacy_unescape_string,
+     stringutil.unescape_string, sample_strings),
+    ('escape_name', legacy_escape_name,
+     stringutil.escape_name, sample_identifiers),
+    ('escape_identifier', legacy_escape_identifier,
+     stringutil.escape_identifier, sample_identifiers),
+    ('escape_string', legacy_escape_string,
+     stringutil.escape_string, sample_strings),
+]
+
+def time_calls(func, values):
+    start = time.time()
+    for value in values:
+        func(value)
+    return time.time() - start
+
+def run(calls=DEFAULT_CALLS):
+    results = []
+    for name, legacy, current, sample in BENCHMARKS:
+        values = sample(calls)
+        for value in values:
+            assert legacy(value) == current(value), value
+        results.append((name, time_calls(legacy, values),
+                        time_calls(current, values)))
+    return results
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    calls = int(argv[0]) if argv else DEFAULT_CALLS
+    for name, legacy, current in run(calls):
+        print('{0:<20} legacy {1:>7.3f}s  current {2:>7.3f}s  '
+              '({3:.1f}x)'.format(name, legacy, current,
+                                  legacy / current if current else 0))
+
+
+if __name__ == '__main__':
+    main()
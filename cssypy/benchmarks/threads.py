@@ -0,0 +1,76 @@
+"""Stress run of the caches shared by the compilations of all threads.
+
+Compiles a generated stylesheet of colors many times at once in a thread
+pool, starting with empty caches, and checks that every compilation gives
+the output of a single-threaded one. Then hammers an LRUCache from several
+threads. Needs concurrent.futures.
+
+Usage: python -m cssypy.benchmarks.threads [RULESETS [COMPILATIONS]]
+"""
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+
+import sys
+import threading
+import time
+
+from . import corpora
+from .. import core, stats
+from ..utils.lrucache import LRUCache
+from ..utils.py3compat import range
+
+DEFAULT_RULESETS = 300
+DEFAULT_COMPILATIONS = 32
+
+
+def compile_concurrently(rulesets, compilations, workers=8):
+    from concurrent import futures
+    fs, main = corpora.load('colors', rulesets, seed=3)
+    expected = core.compile_string(fs.read_bytes(main).decode('utf-8'))
+    for cache in stats._caches().values():
+        cache.clear()
+    pool = futures.ThreadPoolExecutor(workers)
+    try:
+        start = time.time()
+        results = [core.compile_async(main, pool, filesystem=fs)
+                   for _ in range(compilations)]
+        for future in results:
+            assert future.result() == expected
+        return time.time() - start
+    finally:
+        pool.shutdown()
+
+def hammer_cache(threads=4, calls=20000):
+    cache = LRUCache(8)
+    errors = []
+    def run():
+        try:
+            for i in range(calls):
+                key = i % 10
+                if cache.get(key) is None:
+                    cache[key] = i
+        except Exception as e:
+            errors.append(e)
+    workers = [threading.Thread(target=run) for _ in range(threads)]
+    start = time.time()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert not errors, errors
+    return time.time() - start
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    rulesets = int(argv[0]) if argv else DEFAULT_RULESETS
+    compilations = int(argv[1]) if len(argv) > 1 else DEFAULT_COMPILATIONS
+    seconds = compile_concurrently(rulesets, compilations)
+    print('{0:<12} {1:>8.3f}s  {2} compilations of {3} rulesets'.format(
+            'compile', seconds, compilations, rulesets))
+    seconds = hammer_cache()
+    print('{0:<12} {1:>8.3f}s'.format('lrucache', seconds))
+
+
+if __name__ == '__main__':
+    main()
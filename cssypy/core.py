@@ -5,12 +5,21 @@ import sys
 
 import six
 
-from . import processors, parsers, optionsdict
+from . import importgraph, processors, parsers, optionsdict, stats
+from .utils import asyncutil
 
 #==============================================================================#
 def compile_string(src, source_encoding=None, dest_encoding=None, 
                    default_encoding=None, import_directories=None, 
-                   options=None, reporter=None):
+                   options=None, reporter=None, return_stats=False, 
+                   filesystem=None, resolver_cache=None):
+    """Compiles the unicode string 'src' and returns the CSS. If 
+    'return_stats' is true, returns a tuple of the CSS and a stats.Stats with 
+    the timings and counters of the compilation. Imports are read from 
+    'filesystem' (a filesystems.FileSystem, by default the real one), and 
+    resolved through 'resolver_cache' (a processors.ResolverCache, to share 
+    between compilations) if given.
+    """
     options = options or {}
     if isinstance(options, dict):
         options.setdefault('ENABLE_SOLVE', True)
@@ -22,16 +31,29 @@ def compile_string(src, source_encoding=None, dest_encoding=None,
     options = optionsdict.Options(options)
     proc = processors.Processor(default_encoding=default_encoding, 
                                 import_directories=import_directories, 
-                                options=options, reporter=reporter)
+                                options=options, reporter=reporter, 
+                                stats=stats.Stats() if return_stats else None, 
+                                filesystem=filesystem, 
+                                resolver_cache=resolver_cache)
     proc.parse_string(src, source_encoding=source_encoding)
     proc.process_imports()
     proc.apply_transforms()
-    return proc.write_string()
+    css = proc.write_string()
+    proc.report_stats()
+    proc.report_profile()
+    proc.report_import_graph()
+    if return_stats:
+        return css, proc.stats
+    return css
 
 #==============================================================================#
 def compile(ifile, ofile, ifilename=None, ofilename=None, source_encoding=None, 
             dest_encoding=None, default_encoding=None, import_directories=None, 
-            options=None, reporter=None):
+            options=None, reporter=None, filesystem=None, resolver_cache=None):
+    # Filenames, including those of the imports, are read from and written 
+    # to 'filesystem' (a filesystems.FileSystem, by default the real one). 
+    # Imports are resolved through 'resolver_cache' (a 
+    # processors.ResolverCache, to share between compilations) if given.
     
     stream_in = stream_out = False
     
@@ -54,7 +76,9 @@ def compile(ifile, ofile, ifilename=None, ofilename=None, source_encoding=None,
     # Build the processor and parse the input.
     proc = processors.Processor(default_encoding=default_encoding, 
                                 import_directories=import_directories, 
-                                options=options, reporter=reporter)
+                                options=options, reporter=reporter, 
+                                filesystem=filesystem, 
+                                resolver_cache=resolver_cache)
     proc.parse(ifile, filename=ifilename, source_encoding=source_encoding)
     
     # Do transforms.
@@ -66,6 +90,94 @@ def compile(ifile, ofile, ifilename=None, ofilename=None, source_encoding=None,
         proc.write_stream(ofile, filename=ofilename, encoding=dest_encoding)
     else:
         proc.write(ofile, encoding=dest_encoding)
+    proc.report_stats()
+    proc.report_profile()
+    proc.report_import_graph()
 
 #==============================================================================#
+def compile_async(ifile, executor, ifilename=None, source_encoding=None, 
+                  default_encoding=None, import_directories=None, 
+                  options=None, reporter=None, filesystem=None, 
+                  resolver_cache=None):
+    """Compiles the stylesheet 'ifile' (a filename or a file object) without 
+    blocking, and returns a concurrent.futures.Future of the CSS as a unicode 
+    string: the same CSS that compile() writes. 
+    
+    The stylesheet is read and parsed in 'executor' (a 
+    concurrent.futures.Executor), along with the stylesheets it imports, 
+    which are fetched concurrently when independent of each other. The other 
+    passes then run in the executor too. Cancelling the future stops the 
+    compilation before its next step. Errors are raised by the future, as 
+    if PROPAGATE_EXCEPTIONS were set (unless it is explicitly false).
+    
+    From asyncio: css = await asyncio.wrap_future(compile_async(...))
+    """
+    if isinstance(options, optionsdict.Options):
+        options = options.opts
+    options = dict(options or {})
+    options.setdefault('PROPAGATE_EXCEPTIONS', True)
+    proc = processors.Processor(default_encoding=default_encoding, 
+                                import_directories=import_directories, 
+                                options=options, reporter=reporter, 
+                                filesystem=filesystem, 
+                                resolver_cache=resolver_cache)
+    result = asyncutil.new_future()
+    
+    def finish():
+        # The passes after parsing and prefetching imports.
+        for step in (proc.process_imports, proc.apply_transforms):
+            if result.cancelled():
+                return None
+            step()
+        css = proc.write_string()
+        proc.report_stats()
+        proc.report_profile()
+        proc.report_import_graph()
+        return css
+    
+    def on_parsed(future):
+        if asyncutil.propagate_failure(future, result) or result.done():
+            return
+        try:
+            finished = executor.submit(finish)
+        except Exception as e:
+            asyncutil.set_exception(result, e)
+            return
+        finished.add_done_callback(on_finished)
+        asyncutil.cancel_with(result, finished)
+        
+    def on_finished(future):
+        if not asyncutil.propagate_failure(future, result):
+            asyncutil.set_result(result, future.result())
+    
+    parsed = proc.aparse(ifile, executor, filename=ifilename, 
+                         source_encoding=source_encoding)
+    asyncutil.cancel_with(result, parsed)
+    parsed.add_done_callback(on_parsed)
+    return result
 
+#==============================================================================#
+
+def import_graph(ifile, ifilename=None, source_encoding=None, 
+                 default_encoding=None, import_directories=None, options=None, 
+                 reporter=None, filesystem=None, resolver_cache=None):
+    """Parses the stylesheet 'ifile' (a filename or a file object) and 
+    follows its imports, without compiling it. Returns an 
+    importgraph.ImportGraph of the imports, with the size and parse time of 
+    each file.
+    """
+    if isinstance(options, optionsdict.Options):
+        options = options.opts
+    options = dict(options or {}, ENABLE_IMPORTS=True, ENABLE_PIPELINE=False)
+    options.setdefault('PROPAGATE_EXCEPTIONS', True)
+    proc = processors.Processor(default_encoding=default_encoding, 
+                                import_directories=import_directories, 
+                                options=options, reporter=reporter, 
+                                filesystem=filesystem, 
+                                resolver_cache=resolver_cache, 
+                                import_graph=importgraph.ImportGraph())
+    proc.parse(ifile, filename=ifilename, source_encoding=source_encoding)
+    proc.process_imports()
+    return proc.import_graph
+
+#==============================================================================#
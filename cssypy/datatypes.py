@@ -7,6 +7,7 @@ import colorsys
 
 from . import units, errors
 from .utils import colorutil
+from .utils.lrucache import LRUCache
 
 
 class DataType(object):
@@ -128,11 +129,9 @@ class Percentage(DataType):
 
 
 def _dimension_op(unitset, op, a, b):
-    x1 = unitset[a.unit].to_common(a.n)
-    x2 = unitset[b.unit].to_common(b.n)
-    x = op(x1, x2)
-    n = unitset[a.unit].from_common(x)
-    return Dimension(n, a.unit)
+    entry = unitset[a.unit]
+    x = op(entry.to_common(a.n), unitset[b.unit].to_common(b.n))
+    return Dimension(entry.from_common(x), a.unit)
 
 
 class Dimension(DataType):
@@ -256,6 +255,28 @@ class Color(DataType):
         else:
             raise RuntimeError('TODO')
             
+    @classmethod
+    def cached(cls, rgb=None, hsl=None, format=None):
+        """Like the constructor, but returns a shared instance for colors that 
+        were recently created with the same format and components.
+        """
+        if rgb:
+            key = (format, 'rgb', colorutil.components_key(rgb))
+        else:
+            key = (format, 'hsl', colorutil.components_key(hsl))
+        color = _color_cache.get(key)
+        if color is None:
+            color = _color_cache[key] = cls(rgb=rgb, hsl=hsl, format=format)
+        return color
+        
+    @classmethod
+    def palette(cls, rgb=None, hsl=None, format=None):
+        """Returns a list of Colors for a sequence of rgb or hsl tuples."""
+        if rgb is not None:
+            return [cls.cached(rgb=x, format=format) for x in rgb]
+        rgbs = colorutil.hsl_to_rgb_palette(hsl)
+        return [cls.cached(rgb=x, format=format) for x in rgbs]
+            
     @property
     def hsla(self):
         return colorutil.rgba_to_hsla(*self._rgba)
@@ -270,6 +291,9 @@ class Color(DataType):
         return NotImplemented
         
         
+_color_cache = LRUCache(colorutil.CACHE_SIZE)
+        
+        
 class String(DataType):
     # strings in non-expression contexts are turned into the appropriate value:
     #   IdSelector, Number, ClassSelector, Ident, PseudoSelector
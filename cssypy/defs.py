@@ -14,6 +14,26 @@ DEFAULT_OPTIONS = {
     'ENABLE_FLATTEN': True,
     'ENABLE_SOLVE': True,
     'ENABLE_IMPORTS': True,
+    'ENABLE_PIPELINE': False,
+    # Solve numeric arithmetic in bulk before the Solver; with 
+    # ENABLE_PIPELINE, one batch per top-level statement.
+    'ENABLE_BATCH_SOLVE': False,
+    'ENABLE_MERGE_RULESETS': False,
+    
+    # Write the output without optional whitespace.
+    'MINIFY': False,
+    # Write a source map along with the output.
+    'SOURCE_MAP': False,
+    
+    # Decimal places of solved numeric values. None uses the defaults of the 
+    # value types.
+    'NUMBER_PRECISION': None,
+    
+    # Generate the selectors of flattened rulesets as they are written.
+    'LAZY_SELECTORS': False,
+    # Maximum number of selectors a flattened ruleset may have. None for no 
+    # limit.
+    'MAX_SELECTORS': None,
     
     'IMPORT_RELATIVE_TO_CURRENT_FILE': True,
     'IMPORT_RELATIVE_TO_TOPLEVEL_STYLESHEET': True,
@@ -22,6 +42,16 @@ DEFAULT_OPTIONS = {
     
     'PROPAGATE_EXCEPTIONS': False,
     
+    # Report the time spent in each stage and other counters.
+    'STATS': False,
+    # Profile the passes, visitor methods and imports: '-' reports a table, 
+    # any other value is the file to write a cProfile-compatible profile to.
+    'PROFILE': None,
+    # Record the graph of the imports: '-' reports a summary, any other 
+    # value is the file to write it to, as DOT if it ends with '.dot' or 
+    # '.gv', as JSON otherwise.
+    'IMPORT_GRAPH': None,
+    
     'IMPORT_FINDERS': (),
 }
 
@@ -48,6 +48,13 @@ class CSSSyntaxError(CSSError):
             raise
             
             
+class CSSSelectorExplosionError(CSSSyntaxError):
+    """Raised when flattening a nested ruleset would produce more selectors 
+    than allowed by the MAX_SELECTORS option.
+    """
+    pass
+            
+            
 class CSSImportError(CSSError):
     pass
     
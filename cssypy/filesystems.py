@@ -0,0 +1,402 @@
+"""Filesystems through which stylesheets and their imports are read, and the
+output is written.
+
+The import finders, the file reader and Processor.write() access files
+through a FileSystem. OSFileSystem, the default, uses the real filesystem.
+MemoryFileSystem keeps the files in a dict, and ZipFileSystem and
+TarFileSystem read them from an archive, so that a set of stylesheets loaded
+once can be compiled without any stat or open system calls.
+
+The paths of the virtual filesystems are POSIX paths from the root of the
+filesystem; a relative path is relative to '/'.
+
+IndexedFileSystem wraps any of them to look up paths in cached directory
+listings, as used to resolve imports (see processors.ResolverCache).
+"""
+from __future__ import absolute_import
+from __future__ import print_function
+
+import errno
+import io
+import os
+import posixpath
+import threading
+
+import six
+
+
+#==============================================================================#
+class FileSystem(object):
+    """The filesystem interface. 'path' is the module of the path functions
+    (join(), dirname(), isabs()...) that apply to the filesystem's paths.
+    'case_sensitive' is false if names that differ only in case are the same 
+    file.
+    """
+    path = os.path
+    case_sensitive = True
+
+    def abspath(self, path):
+        raise NotImplementedError() # pragma: no cover
+
+    def exists(self, path):
+        """True if 'path' is a file or a directory."""
+        raise NotImplementedError() # pragma: no cover
+
+    def isfile(self, path):
+        raise NotImplementedError() # pragma: no cover
+
+    def getsize(self, path):
+        """Returns the size of the file 'path' in bytes."""
+        raise NotImplementedError() # pragma: no cover
+
+    def listdir(self, path):
+        """Returns the names of the entries of the directory 'path'."""
+        raise NotImplementedError() # pragma: no cover
+
+    def open(self, path, mode='rb'):
+        """Returns a binary file object. 'mode' is 'rb' or 'wb'."""
+        raise NotImplementedError() # pragma: no cover
+
+    def read_bytes(self, path):
+        with self.open(path, 'rb') as f:
+            return f.read()
+
+    def write_bytes(self, path, data):
+        with self.open(path, 'wb') as f:
+            f.write(data)
+
+
+def _check_mode(mode):
+    if mode not in ('rb', 'wb'):
+        raise ValueError("Unsupported mode: '{0}'".format(mode))
+
+def _not_found(path):
+    return IOError(errno.ENOENT, os.strerror(errno.ENOENT), path)
+
+
+#==============================================================================#
+class OSFileSystem(FileSystem):
+    """The real filesystem. It is taken to be case-insensitive if the file 
+    of this module can be opened with the case of its path swapped, as on 
+    Windows and macOS by default.
+    """
+    path = os.path
+    _case_sensitive = None
+    
+    @property
+    def case_sensitive(self):
+        if self._case_sensitive is None:
+            path = os.path.abspath(__file__)
+            swapped = path.swapcase()
+            self._case_sensitive = (swapped == path or 
+                                    not os.path.exists(swapped))
+        return self._case_sensitive
+
+    def abspath(self, path):
+        return os.path.abspath(path)
+
+    def exists(self, path):
+        return os.path.exists(path)
+
+    def isfile(self, path):
+        return os.path.isfile(path)
+
+    def getsize(self, path):
+        return os.path.getsize(path)
+
+    def listdir(self, path):
+        return os.listdir(path)
+
+    def open(self, path, mode='rb'):
+        _check_mode(mode)
+        return io.open(path, mode)
+
+
+# The default filesystem.
+OS_FILESYSTEM = OSFileSystem()
+
+
+#==============================================================================#
+class IndexedFileSystem(FileSystem):
+    """Wraps 'filesystem', answering exists() from the listing of the parent
+    directory, which is read once and kept: checking any number of paths of
+    a directory costs a single listdir(), and each further check a set
+    lookup. Everything else is passed on to 'filesystem'.
+
+    The listings are not updated when the files change, except for those
+    written through this object; call invalidate() when they do.
+    
+    The lookups are exact: on a filesystem that is not case-sensitive, a 
+    path whose case does not match the listing is checked with 
+    'filesystem'.exists(). Other equivalent spellings of a name (e.g. 
+    Unicode normalization forms) are not matched.
+    """
+    def __init__(self, filesystem=None):
+        self.filesystem = filesystem or OS_FILESYSTEM
+        self.path = self.filesystem.path
+        self.case_sensitive = self.filesystem.case_sensitive
+        self._listings = {}     # directory -> frozenset of names
+        self._lock = threading.Lock()
+
+    def listing(self, directory):
+        """Returns the names in the absolute path 'directory' as a frozenset,
+        empty if it is not a directory.
+        """
+        names = self._listings.get(directory)
+        if names is None:
+            try:
+                names = frozenset(self.filesystem.listdir(directory))
+            except (IOError, OSError):
+                names = frozenset()
+            self._listings[directory] = names
+        return names
+
+    def invalidate(self, path=None):
+        """Forgets the listing of the directory containing 'path', and that
+        of 'path' if it is a directory, or every listing if 'path' is None.
+        """
+        with self._lock:
+            if path is None:
+                self._listings.clear()
+                return
+            path = self.abspath(path)
+            self._listings.pop(path, None)
+            self._listings.pop(self.path.dirname(path), None)
+
+    def abspath(self, path):
+        return self.filesystem.abspath(path)
+
+    def exists(self, path):
+        path = self.abspath(path)
+        directory, name = self.path.split(path)
+        if not name:
+            return self.filesystem.exists(path)     # the root
+        if name in self.listing(directory):
+            return True
+        return not self.case_sensitive and self.filesystem.exists(path)
+
+    def isfile(self, path):
+        return self.filesystem.isfile(path)
+
+    def getsize(self, path):
+        return self.filesystem.getsize(path)
+
+    def listdir(self, path):
+        return self.filesystem.listdir(path)
+
+    def open(self, path, mode='rb'):
+        if mode == 'wb':
+            self.invalidate(path)
+        return self.filesystem.open(path, mode)
+
+
+#==============================================================================#
+class VirtualFileSystem(FileSystem):
+    """Base class of the filesystems whose files are listed in 'self.files',
+    a dict that maps the absolute path of each file to its contents (or to
+    whatever _read() takes to get them). The directories are those that
+    contain the files.
+    """
+    path = posixpath
+
+    def __init__(self):
+        self.files = {}
+        self._dirs = {'/': set()}   # directory -> names of its entries
+
+    def abspath(self, path):
+        return posixpath.normpath(posixpath.join('/', path))
+
+    def _add(self, path, value):
+        path = self.abspath(path)
+        self.files[path] = value
+        while path != '/':
+            path, name = posixpath.split(path)
+            entries = self._dirs.get(path)
+            if entries is None:
+                entries = self._dirs[path] = set()
+            elif name in entries:
+                break
+            entries.add(name)
+
+    def _read(self, path):
+        # Returns the contents of the file 'path', which is in self.files.
+        return self.files[path]
+
+    def exists(self, path):
+        path = self.abspath(path)
+        return path in self.files or path in self._dirs
+
+    def isfile(self, path):
+        return self.abspath(path) in self.files
+
+    def getsize(self, path):
+        return len(self.read_bytes(path))
+
+    def listdir(self, path):
+        entries = self._dirs.get(self.abspath(path))
+        if entries is None:
+            raise _not_found(path)
+        return sorted(entries)
+
+    def read_bytes(self, path):
+        abspath = self.abspath(path)
+        if abspath not in self.files:
+            raise _not_found(path)
+        return self._read(abspath)
+
+    def open(self, path, mode='rb'):
+        _check_mode(mode)
+        if mode == 'wb':
+            raise IOError(errno.EROFS, os.strerror(errno.EROFS), path)
+        return io.BytesIO(self.read_bytes(path))
+
+    def __iter__(self):
+        return iter(sorted(self.files))
+
+    def __len__(self):
+        return len(self.files)
+
+
+#==============================================================================#
+class _MemoryFile(io.BytesIO):
+    # Stores its contents in the filesystem when closed.
+    def __init__(self, filesystem, path):
+        super(_MemoryFile, self).__init__()
+        self.filesystem = filesystem
+        self.name = path
+
+    def close(self):
+        if not self.closed:
+            self.filesystem._add(self.name, self.getvalue())
+        super(_MemoryFile, self).close()
+
+
+class MemoryFileSystem(VirtualFileSystem):
+    """Files held in memory. 'files' maps paths to the contents of the files,
+    as bytes or as unicode strings (stored encoded as UTF-8). Files can also
+    be written, e.g. the output of Processor.write().
+    """
+    def __init__(self, files=None):
+        super(MemoryFileSystem, self).__init__()
+        for path, data in (files or {}).items():
+            self.write_bytes(path, data)
+
+    @classmethod
+    def from_directory(cls, directory):
+        """Loads every file under 'directory' of the real filesystem, at the
+        same absolute paths.
+        """
+        fs = cls()
+        for dirpath, dirnames, filenames in os.walk(os.path.abspath(directory)):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                with io.open(path, 'rb') as f:
+                    fs.write_bytes(path.replace(os.sep, '/'), f.read())
+        return fs
+
+    def write_bytes(self, path, data):
+        if isinstance(data, six.text_type):
+            data = data.encode('utf-8')
+        self._add(path, data)
+
+    def open(self, path, mode='rb'):
+        _check_mode(mode)
+        if mode == 'wb':
+            return _MemoryFile(self, self.abspath(path))
+        return io.BytesIO(self.read_bytes(path))
+
+    def __repr__(self):
+        return '<MemoryFileSystem: {0} files>'.format(len(self.files))
+
+
+#==============================================================================#
+class ArchiveFileSystem(VirtualFileSystem):
+    """Read-only files of an archive, opened from 'file' (a filename or a
+    file object). The list of members is read when created; their contents
+    are read on demand, one at a time since archive objects are not thread
+    safe.
+    """
+    def __init__(self, file):
+        super(ArchiveFileSystem, self).__init__()
+        self._lock = threading.Lock()
+        self.archive = self.open_archive(file)
+        for path, member in self.members():
+            self._add(path, member)
+
+    def open_archive(self, file):
+        raise NotImplementedError() # pragma: no cover
+
+    def members(self):
+        """Yields the path and the member of each file of the archive."""
+        raise NotImplementedError() # pragma: no cover
+
+    def read_member(self, member):
+        raise NotImplementedError() # pragma: no cover
+
+    def member_size(self, member):
+        raise NotImplementedError() # pragma: no cover
+
+    def _read(self, path):
+        with self._lock:
+            return self.read_member(self.files[path])
+
+    def getsize(self, path):
+        abspath = self.abspath(path)
+        if abspath not in self.files:
+            raise _not_found(path)
+        return self.member_size(self.files[abspath])
+
+    def close(self):
+        self.archive.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __repr__(self):
+        return '<{0}: {1} files>'.format(type(self).__name__, len(self.files))
+
+
+class ZipFileSystem(ArchiveFileSystem):
+    def open_archive(self, file):
+        import zipfile
+        return zipfile.ZipFile(file)
+
+    def members(self):
+        for info in self.archive.infolist():
+            if not info.filename.endswith('/'):
+                yield info.filename, info
+
+    def read_member(self, member):
+        return self.archive.read(member)
+
+    def member_size(self, member):
+        return member.file_size
+
+
+class TarFileSystem(ArchiveFileSystem):
+    def open_archive(self, file):
+        import tarfile
+        if isinstance(file, six.string_types):
+            return tarfile.open(file)
+        return tarfile.open(fileobj=file)
+
+    def members(self):
+        for info in self.archive.getmembers():
+            if info.isfile():
+                yield info.name, info
+
+    def read_member(self, member):
+        f = self.archive.extractfile(member)
+        try:
+            return f.read()
+        finally:
+            f.close()
+
+    def member_size(self, member):
+        return member.size
+
+
+#==============================================================================#
@@ -1,4 +1,5 @@
-from .base import call, get_function, register, register_builtin
+from .base import (call, get_function, lookup_function, register, 
+                   register_builtin)
 
 # import modules with function definitions so they get registered
 from . import functions
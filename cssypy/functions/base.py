@@ -1,7 +1,8 @@
-import inspect
 import collections
 import types
 
+import six
+
 from .. import errors
 
 FuncEntry = collections.namedtuple('FuncEntry', 'name func nargs')
@@ -12,24 +13,34 @@ class FunctionRegistry(object):
         self.funcs = {}
         
     def register(self, func, name=None, nargs=None):
-        argspec = inspect.getargspec(func)
+        # The number of arguments of 'func', as counted by 
+        # inspect.getargspec() (which is slow to import).
         name = name or func.__name__
-        nargs = nargs if nargs is not None else len(argspec.args)
+        if nargs is None:
+            nargs = six.get_function_code(func).co_argcount
         if name not in self.funcs:
             self.funcs[name] = {}
         self.funcs[name][nargs] = FuncEntry(name, func, nargs)
+        _dispatch.clear()
+        
+    def lookup(self, name, nargs):
+        entry = self.funcs.get(name, _empty).get(nargs)
+        return entry.func if entry is not None else None
         
     def getfunc(self, name, nargs):
-        try:
-            nfunc = self.funcs[name]
-            try:
-                return nfunc[nargs].func
-            except KeyError:
-                raise errors.CSSFunctionNotFound()
-        except KeyError:
+        func = self.lookup(name, nargs)
+        if func is None:
             raise errors.CSSFunctionNotFound()
+        return func
         
         
+_empty = {}
+_missing = object()
+
+# (name, nargs) -> function, or None for functions that are not registered.  
+# Cleared whenever a function is registered.
+_dispatch = {}
+
 registry = FunctionRegistry()
 builtin_registry = FunctionRegistry()
 
@@ -54,11 +65,23 @@ def register_builtin(*args, **kwargs):
             return func
         return inner
     
+def lookup_function(name, nargs):
+    """Returns the function registered under 'name' that takes 'nargs' 
+    arguments, or None if there is none. Builtin functions take precedence.
+    """
+    key = (name, nargs)
+    func = _dispatch.get(key, _missing)
+    if func is _missing:
+        func = builtin_registry.lookup(name, nargs)
+        if func is None:
+            func = registry.lookup(name, nargs)
+        _dispatch[key] = func
+    return func
+    
 def get_function(name, nargs):
-    try:
-        func = builtin_registry.getfunc(name, nargs)
-    except errors.CSSFunctionNotFound:
-        func = registry.getfunc(name, nargs)
+    func = lookup_function(name, nargs)
+    if func is None:
+        raise errors.CSSFunctionNotFound()
     return func
     
 def call(name, args):
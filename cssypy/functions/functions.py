@@ -12,7 +12,7 @@ def _rgb_arg(x):
 @register_builtin
 def rgb(r, g, b):
     rgb = tuple(_rgb_arg(x) for x in (r,g,b))
-    return datatypes.Color(rgb=rgb, format='rgb')
+    return datatypes.Color.cached(rgb=rgb, format='rgb')
     
 
 @register_builtin
@@ -24,5 +24,5 @@ def hsl(h, s, l):
         raise errors.CSSValueError()
     s = s.p / 100.
     l = l.p / 100.
-    return datatypes.Color(hsl=(h,s,l), format='hsl')
+    return datatypes.Color.cached(hsl=(h,s,l), format='hsl')
     
@@ -0,0 +1,169 @@
+"""Hooks called by the Processor and the visitors as a stylesheet is compiled.
+
+A hook is given to a Processor, which calls pass_start() and pass_end()
+around each of its passes (the same stages as in stats.Stats), and
+import_start() and import_end() around each imported file (including the
+files it imports in turn). If the hook's 'trace_nodes' attribute is true,
+the visitors of the passes also call node_start() and node_end() around each
+of their visit_* methods.
+
+ProfileHook uses these to aggregate the time spent in each pass, visit_*
+method and imported file.
+"""
+from __future__ import absolute_import
+from __future__ import print_function
+
+import marshal
+import time
+
+import six
+
+from . import filesystems
+
+
+#==============================================================================#
+class Hook(object):
+    """The hook protocol. Every method does nothing; subclasses override
+    those they need.
+    """
+    # Set to true to have the visitors call node_start() and node_end().
+    trace_nodes = False
+
+    def pass_start(self, name):
+        pass
+
+    def pass_end(self, name):
+        pass
+
+    def import_start(self, filename):
+        pass
+
+    def import_end(self, filename):
+        pass
+
+    def node_start(self, visitor, method, node):
+        # 'method' is the name of the visit_* method of 'visitor' called on
+        # 'node'.
+        pass
+
+    def node_end(self, visitor, method, node):
+        pass
+
+
+#==============================================================================#
+class ProfileHook(Hook):
+    """Aggregates the time spent in each pass, visit_* method and imported
+    file.
+
+    Entries are keyed as in the cProfile module, by a (filename, lineno,
+    function name) tuple: a visit_* method by the source location of its
+    definition and 'Class.visit_Name', an imported file by its path and
+    '<import>', and a pass by '<pass name>'. 'tottime' excludes the time spent
+    in nested entries; 'cumtime' includes it, counting recursive calls once.
+    """
+    trace_nodes = True
+
+    SORT_KEYS = {
+        'calls':   lambda item: -item[1][1],
+        'tottime': lambda item: -item[1][2],
+        'cumtime': lambda item: -item[1][3],
+        'name':    lambda item: item[0][2],
+    }
+
+    def __init__(self, timer=time.time):
+        self.timer = timer
+        # key -> [primitive calls, calls, tottime, cumtime, {caller: calls}]
+        self.entries = {}
+        self._stack = []    # [key, start time, time of nested entries]
+        self._depth = {}    # key -> number of its calls on the stack
+        self._method_keys = {}
+
+    def enter(self, key):
+        self._depth[key] = self._depth.get(key, 0) + 1
+        self._stack.append([key, self.timer(), 0.0])
+
+    def exit(self):
+        now = self.timer()
+        key, start, nested = self._stack.pop()
+        elapsed = now - start
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = self.entries[key] = [0, 0, 0.0, 0.0, {}]
+        entry[1] += 1
+        entry[2] += elapsed - nested
+        self._depth[key] -= 1
+        if not self._depth[key]:
+            entry[0] += 1
+            entry[3] += elapsed
+        if self._stack:
+            caller = self._stack[-1]
+            caller[2] += elapsed
+            entry[4][caller[0]] = entry[4].get(caller[0], 0) + 1
+
+    def method_key(self, visitor, method):
+        cls = type(visitor)
+        key = self._method_keys.get((cls, method))
+        if key is None:
+            func = six.get_unbound_function(getattr(cls, method))
+            code = six.get_function_code(func)
+            key = (code.co_filename, code.co_firstlineno,
+                   '{0}.{1}'.format(cls.__name__, method))
+            self._method_keys[(cls, method)] = key
+        return key
+
+    #==========================================================================#
+    def pass_start(self, name):
+        self.enter(('~', 0, '<pass {0}>'.format(name)))
+
+    def pass_end(self, name):
+        self.exit()
+
+    def import_start(self, filename):
+        self.enter((filename, 0, '<import>'))
+
+    def import_end(self, filename):
+        self.exit()
+
+    def node_start(self, visitor, method, node):
+        self.enter(self.method_key(visitor, method))
+
+    def node_end(self, visitor, method, node):
+        self.exit()
+
+    #==========================================================================#
+    def stats(self):
+        """Returns the entries as a dict in the format of pstats.Stats.stats."""
+        return dict((key, (cc, nc, tt, ct, dict(callers)))
+                    for key, (cc, nc, tt, ct, callers) in self.entries.items())
+
+    def dump_stats(self, filename, filesystem=None):
+        """Writes the entries to 'filename' in 'filesystem' (by default the
+        real one) in the format of cProfile.Profile.dump_stats(), to be read
+        with pstats.Stats.
+        """
+        filesystem = filesystem or filesystems.OS_FILESYSTEM
+        filesystem.write_bytes(filename, marshal.dumps(self.stats()))
+
+    def sorted_entries(self, sort='tottime'):
+        """Returns a list of (key, entry) tuples sorted by 'sort', one of
+        'calls', 'tottime', 'cumtime' or 'name'.
+        """
+        return sorted(self.entries.items(), key=self.SORT_KEYS[sort])
+
+    def format(self, sort='tottime', limit=None):
+        """Returns the entries as a table, sorted by 'sort'."""
+        lines = ['{0:>8} {1:>10} {2:>10}  {3}'.format('calls', 'tottime',
+                                                      'cumtime', 'name')]
+        for key, entry in self.sorted_entries(sort)[:limit]:
+            filename, lineno, name = key
+            if name == '<import>':
+                name = '<import {0}>'.format(filename)
+            lines.append('{0:>8} {1:>10.4f} {2:>10.4f}  {3}'.format(
+                            entry[1], entry[2], entry[3], name))
+        return '\n'.join(lines)
+
+    def __repr__(self):
+        return '<ProfileHook: {0} entries>'.format(len(self.entries))
+
+
+#==============================================================================#
@@ -0,0 +1,230 @@
+"""The graph of the imports of a stylesheet.
+
+An ImportGraph is filled in by processors.Importer as it follows the
+imports: each file (node) with its size and the time spent parsing it, and
+each import (edge) from the importing file to the imported one. A file
+imported several times is parsed, and its own imports followed, each time;
+the edges count the imports.
+
+From it, the graph can be written as JSON or in the DOT format of Graphviz,
+with the critical path of a parallel build and the files imported more than
+once.
+"""
+from __future__ import absolute_import
+from __future__ import print_function
+
+import collections
+import os.path
+
+from . import filesystems
+
+
+#==============================================================================#
+class ImportedFile(object):
+    """A node of the graph. 'size' is in bytes (None if unknown, e.g. for a
+    top-level stylesheet read from a stream), 'total_time' is the time in
+    seconds spent in its 'parses' parses.
+    """
+    def __init__(self, path, size=None):
+        self.path = path
+        self.size = size
+        self.total_time = 0.0
+        self.parses = 0
+
+    @property
+    def parse_time(self):
+        """The time of one parse."""
+        if not self.parses:
+            return 0.0
+        return self.total_time / self.parses
+
+    def __repr__(self):
+        return '<ImportedFile: {0}>'.format(self.path)
+
+
+#==============================================================================#
+class ImportGraph(object):
+    def __init__(self):
+        self.root = None
+        self.files = collections.OrderedDict()  # path -> ImportedFile
+        self.edges = collections.OrderedDict()  # (importer, imported) -> count
+        self.missing = []   # (importer, name) of the imports not found
+
+    def add_file(self, path, size=None, parse_time=None):
+        """Records a parse of 'path'. The first file added is the root."""
+        node = self.files.get(path)
+        if node is None:
+            node = self.files[path] = ImportedFile(path, size)
+            if self.root is None:
+                self.root = path
+        if parse_time is not None:
+            node.parses += 1
+            node.total_time += parse_time
+        return node
+
+    def add_import(self, importer, imported):
+        key = (importer, imported)
+        self.edges[key] = self.edges.get(key, 0) + 1
+
+    def add_missing(self, importer, name):
+        self.missing.append((importer, name))
+
+    #==========================================================================#
+    def importers(self, path):
+        """Returns the files that import 'path'."""
+        return [a for a, b in self.edges if b == path]
+
+    def imports(self, path):
+        """Returns the files imported by 'path', in order."""
+        return [b for a, b in self.edges if a == path]
+
+    def import_count(self, path):
+        return sum(count for (a, b), count in self.edges.items() if b == path)
+
+    def duplicates(self):
+        """Returns the files imported more than once, with the number of
+        times, most imported first.
+        """
+        counts = collections.defaultdict(int)
+        for (a, b), count in self.edges.items():
+            counts[b] += count
+        duplicates = [(path, count) for path, count in counts.items()
+                      if count > 1]
+        return sorted(duplicates, key=lambda item: (-item[1], item[0]))
+
+    def critical_path(self):
+        """Returns the critical path of a build that parses every file once,
+        as soon as one of the files importing it has been parsed, with no
+        limit on the parses done in parallel: a (files, seconds) tuple of the
+        chain of imports from the root that takes the longest to parse.
+        """
+        importers = collections.defaultdict(list)
+        for a, b in self.edges:
+            importers[b].append(a)
+        finish = {}     # path -> (time the parse would end, previous file)
+
+        def finish_time(path):
+            if path not in finish:
+                start, previous = 0.0, None
+                for importer in importers[path]:
+                    end = finish_time(importer)[0]
+                    if previous is None or end < start:
+                        start, previous = end, importer
+                finish[path] = (start + self.files[path].parse_time, previous)
+            return finish[path]
+
+        if not self.files:
+            return [], 0.0
+        last = max(self.files, key=lambda path: finish_time(path)[0])
+        total = finish[last][0]
+        path = []
+        while last is not None:
+            path.append(last)
+            last = finish[last][1]
+        path.reverse()
+        return path, total
+
+    #==========================================================================#
+    def as_dict(self):
+        critical_path, critical_time = self.critical_path()
+        return {
+            'root': self.root,
+            'files': [{'path': node.path,
+                       'size': node.size,
+                       'parse_time': node.parse_time,
+                       'parses': node.parses,
+                       'imported': self.import_count(node.path)}
+                      for node in self.files.values()],
+            'imports': [{'from': a, 'to': b, 'count': count}
+                        for (a, b), count in self.edges.items()],
+            'missing': [{'from': a, 'name': name} for a, name in self.missing],
+            'critical_path': {'files': critical_path, 'time': critical_time},
+            'duplicates': [{'path': path, 'count': count}
+                           for path, count in self.duplicates()],
+        }
+
+    def to_json(self, indent=2):
+        import json
+        return json.dumps(self.as_dict(), indent=indent, sort_keys=True,
+                          separators=(',', ': '))
+
+    def label(self, path):
+        # The path relative to the directory of the root.
+        if self.root is None:
+            return path
+        return os.path.relpath(path, os.path.dirname(self.root))
+
+    def to_dot(self):
+        """Returns the graph in the DOT format. The critical path is drawn
+        in red, and the files imported more than once are filled.
+        """
+        critical_path = self.critical_path()[0]
+        critical_edges = set(zip(critical_path, critical_path[1:]))
+        duplicates = dict(self.duplicates())
+        lines = ['digraph imports {', '    node [shape=box];']
+        for node in self.files.values():
+            size = '?' if node.size is None else node.size
+            label = '{0}\\n{1} B, {2:.2f} ms'.format(
+                        _dot_escape(self.label(node.path)), size,
+                        node.parse_time * 1000)
+            attrs = ['label="{0}"'.format(label)]
+            if node.path in duplicates:
+                attrs.append('style=filled, fillcolor="#ffe0a0"')
+            if node.path in critical_path:
+                attrs.append('color=red')
+            lines.append('    "{0}" [{1}];'.format(_dot_escape(node.path),
+                                                   ', '.join(attrs)))
+        for (a, b), count in self.edges.items():
+            attrs = []
+            if count > 1:
+                attrs.append('label="x{0}"'.format(count))
+            if (a, b) in critical_edges:
+                attrs.append('color=red, penwidth=2')
+            lines.append('    "{0}" -> "{1}"{2};'.format(
+                            _dot_escape(a), _dot_escape(b),
+                            ' [{0}]'.format(', '.join(attrs)) if attrs else ''))
+        lines.append('}')
+        return '\n'.join(lines) + '\n'
+
+    def write(self, filename, filesystem=None):
+        """Writes the graph to 'filename' in 'filesystem' (by default the 
+        real one): in the DOT format if it ends with '.dot' or '.gv', as JSON 
+        otherwise.
+        """
+        filesystem = filesystem or filesystems.OS_FILESYSTEM
+        if filesystem.path.splitext(filename)[1].lower() in ('.dot', '.gv'):
+            data = self.to_dot()
+        else:
+            data = self.to_json() + '\n'
+        filesystem.write_bytes(filename, data.encode('utf-8'))
+
+    def format(self):
+        """Returns a summary as lines of text: the critical path and the
+        files imported more than once.
+        """
+        critical_path, critical_time = self.critical_path()
+        lines = ['Imports: {0} files, {1} imports, {2} not found'.format(
+                    len(self.files), sum(self.edges.values()),
+                    len(self.missing))]
+        lines.append('Critical path: {0:.3f} ms'.format(critical_time * 1000))
+        for path in critical_path:
+            lines.append('  {0:>9.3f} ms  {1}'.format(
+                            self.files[path].parse_time * 1000,
+                            self.label(path)))
+        duplicates = self.duplicates()
+        if duplicates:
+            lines.append('Imported more than once:')
+            for path, count in duplicates:
+                lines.append('  {0:>5}x  {1}'.format(count, self.label(path)))
+        return '\n'.join(lines)
+
+    def __repr__(self):
+        return '<ImportGraph: {0} files, {1} imports>'.format(
+                    len(self.files), len(self.edges))
+
+
+def _dot_escape(s):
+    return s.replace('\\', '\\\\').replace('"', '\\"')
+
+
+#==============================================================================#
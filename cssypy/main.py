@@ -1,8 +1,6 @@
 from __future__ import absolute_import
 from __future__ import print_function
 
-import pprint
-
 from .utils import useroptions, reporters
 from . import defs, core, optionsdict
 
@@ -41,6 +39,85 @@ def get_optspec():
             metavar='(yes|no)', default=defs.ENABLE_SOLVE,
             help='(default: yes)'))
     
+    # enable/disable single-traversal pipeline
+    optspec.add_optdef(
+        Opt('pipeline',  type=bool, dest='ENABLE_PIPELINE', 
+            metavar='(yes|no)', default=defs.ENABLE_PIPELINE,
+            help='(default: no)'))
+    
+    # enable/disable bulk solving of numeric arithmetic
+    optspec.add_optdef(
+        Opt('batch_solve',  type=bool, dest='ENABLE_BATCH_SOLVE', 
+            metavar='(yes|no)', default=defs.ENABLE_BATCH_SOLVE,
+            help='one batch per top-level statement with --pipeline '
+                 '(default: no)'))
+    
+    # enable/disable merging of rulesets after flattening
+    optspec.add_optdef(
+        Opt('merge_rulesets',  type=bool, dest='ENABLE_MERGE_RULESETS', 
+            metavar='(yes|no)', default=defs.ENABLE_MERGE_RULESETS,
+            help='Merge rulesets with identical declarations and remove '
+                 'duplicate declarations. (default: no)'))
+    
+    # enable/disable minified output
+    optspec.add_optdef(
+        Opt('minify',  type=bool, dest='MINIFY', 
+            metavar='(yes|no)', default=defs.MINIFY,
+            help='(default: no)'))
+    
+    # enable/disable source map output
+    optspec.add_optdef(
+        Opt('source_map',  type=bool, dest='SOURCE_MAP', 
+            metavar='(yes|no)', default=defs.SOURCE_MAP,
+            help='Write a source map to OUTPUT.map, or into the output if it '
+                 'is written to stdout. (default: no)'))
+    
+    # report timings and counters
+    optspec.add_optdef(
+        Opt('stats',  type=bool, dest='STATS', 
+            metavar='(yes|no)', default=defs.STATS,
+            help='Report the time spent in each stage, and counts of tokens, '
+                 'nodes, imports, cache hits and output bytes. '
+                 '(default: no)'))
+    
+    # profile the passes, visitor methods and imports
+    optspec.add_optdef(
+        Opt('profile',  dest='PROFILE', metavar='FILE',
+            default=defs.PROFILE,
+            help='Profile the time spent in each pass, visitor method and '
+                 'imported file, and write it to FILE in the format of '
+                 'cProfile (to be read with pstats). Use - to report a '
+                 'table sorted by time instead. (default: off)'))
+    
+    # record the graph of the imports
+    optspec.add_optdef(
+        Opt('import_graph',  dest='IMPORT_GRAPH', metavar='FILE',
+            default=defs.IMPORT_GRAPH,
+            help='Write the graph of the imports, with the size and parse '
+                 'time of each file, the critical path and the files '
+                 'imported more than once, to FILE: in the DOT format if it '
+                 'ends with .dot or .gv, as JSON otherwise. Use - to report '
+                 'the critical path and duplicates instead. (default: off)'))
+    
+    # decimal places of solved numeric values
+    optspec.add_optdef(
+        Opt('number_precision',  type=int, dest='NUMBER_PRECISION', 
+            metavar='DIGITS', default=defs.NUMBER_PRECISION,
+            help='Decimal places of solved numbers. (default: 3 for numbers '
+                 'and dimensions, 1 for percentages)'))
+    
+    # enable/disable lazy generation of flattened selectors
+    optspec.add_optdef(
+        Opt('lazy_selectors',  type=bool, dest='LAZY_SELECTORS', 
+            metavar='(yes|no)', default=defs.LAZY_SELECTORS,
+            help='(default: no)'))
+    
+    # limit on the selectors of a flattened ruleset
+    optspec.add_optdef(
+        Opt('max_selectors',  type=int, dest='MAX_SELECTORS', 
+            metavar='COUNT', default=defs.MAX_SELECTORS,
+            help='Maximum number of selectors of a flattened ruleset. '
+                 '(default: no limit)'))
     
     # enable/disable imports relative to the current stylesheet
     optspec.add_optdef(
@@ -3,7 +3,8 @@ from __future__ import print_function
 
 from .nodes import Node
 
-__all__ = ['iter_fields','iter_child_nodes','walk','debug_tostring','dump',]
+__all__ = ['iter_fields','iter_child_nodes','walk','debug_tostring','dump',
+           'structural_key',]
 
 def iter_fields(node):
     for name in node._fields:
@@ -18,6 +19,18 @@ def iter_child_nodes(node):
         elif isinstance(attr, Node):
             yield attr
 
+def structural_key(node):
+    """Returns a hashable key for 'node' that is equal for nodes of the same 
+    type with the same field values, recursively. Unlike __eq__, values are 
+    compared exactly as they would be written (e.g. '1.0' differs from '1').
+    """
+    if isinstance(node, Node):
+        return (type(node),) + tuple(structural_key(getattr(node, name)) 
+                                     for name in node._fields)
+    elif isinstance(node, (list, tuple)):
+        return tuple(structural_key(x) for x in node)
+    return node
+
 def walk(node):
     from collections import deque
     todo = deque([node])
@@ -6,24 +6,13 @@ import re
 import six
 
 from .. import datatypes
-from ..utils import stringutil
+from ..utils import stringutil, numformat
+from ..utils.lazy import LazyRegex
 from .nodes import Node
 
 
 #==============================================================================#
-def _strip_trailing_zeros(s, remove_decimal_point=True):
-    """Remove trailing zeros from the string. The string must contain a decimal 
-    point. If everything following the decimal point is a zero, the decimal 
-    point is also removed.
-    """
-    if '.' not in s:
-        return s
-    s = s.rstrip(u'0')
-    if remove_decimal_point and s[-1] == u'.':
-        s = s[:-1]
-    if not s:
-        return u'0'
-    return s
+_strip_trailing_zeros = numformat.strip_trailing_zeros
     
 def _int_or_float(n):
     try:
@@ -42,9 +31,12 @@ class CSSValueNode(Node):
         raise NotImplementedError() # pragma: no cover
         
     @staticmethod
-    def node_from_value(value):
+    def node_from_value(value, precision=None):
+        # 'precision' overrides the default precision of numeric nodes
         assert not value.is_negative()
         ValueClass = _datatype_to_node[type(value)]
+        if precision is not None and hasattr(ValueClass, '_precision'):
+            return ValueClass.from_value(value, precision=precision)
         return ValueClass.from_value(value)
         
     @classmethod
@@ -64,7 +56,7 @@ class CSSValueNode(Node):
 
 
 #==============================================================================#
-re_dimension = re.compile(ur'^(?P<num>[0-9\.]+)(?P<unit>[^0-9\.].*)$')
+re_dimension = LazyRegex(ur'^(?P<num>[0-9\.]+)(?P<unit>[^0-9\.].*)$')
 
 class DimensionNode(CSSValueNode):
     _fields = ('number', 'unit')
@@ -81,9 +73,11 @@ class DimensionNode(CSSValueNode):
         return datatypes.Dimension(float(self.number), self.unit.lower())
         
     @classmethod
-    def from_value(cls, value):
-        n = u'{0:.{p}f}'.format(value.n, p=cls._precision)
-        return cls(number=_strip_trailing_zeros(n), unit=value.unit)
+    def from_value(cls, value, precision=None):
+        if precision is None:
+            precision = cls._precision
+        n = numformat.format_number(value.n, precision)
+        return cls(number=n, unit=value.unit)
         
     def to_string(self):
         return u'{0}{1}'.format(self.number, 
@@ -123,9 +117,10 @@ class PercentageNode(CSSValueNode):
         return datatypes.Percentage(float(self.pct))
         
     @classmethod
-    def from_value(cls, value):
-        pct = u'{0:.{p}f}'.format(value, p=cls._precision)
-        return cls(pct=_strip_trailing_zeros(pct))
+    def from_value(cls, value, precision=None):
+        if precision is None:
+            precision = cls._precision
+        return cls(pct=numformat.format_number(value.p, precision))
             
     def to_string(self):
         return u'{0}%'.format(self.pct)
@@ -157,9 +152,10 @@ class NumberNode(CSSValueNode):
         return datatypes.Number(_int_or_float(self.number))
         
     @classmethod
-    def from_value(cls, value):
-        n = u'{0:.{p}f}'.format(value, p=cls._precision)
-        return cls(number=_strip_trailing_zeros(n))
+    def from_value(cls, value, precision=None):
+        if precision is None:
+            precision = cls._precision
+        return cls(number=numformat.format_number(value.n, precision))
             
     def to_string(self):
         return u'{0}'.format(self.number)
@@ -211,7 +207,7 @@ class UriNode(CSSValueNode):
     string = r'(?P<string>{string1}|{string2})'.format(string1=string1, string2=string2)
     bareuri = r'(?P<bareuri>(?:[^"\'\\\r\n\t \(\)]|\\[^\r\n])+)'
     _uri = r'[Uu][Rr][Ll]\({w}(?:{string}|{bareuri}){w}\)'.format(w=w, string=string, bareuri=bareuri)
-    re_uri = re.compile(_uri, re.UNICODE)
+    re_uri = LazyRegex(_uri, re.UNICODE)
     
     def __init__(self, uri, **kwargs):
         super(UriNode, self).__init__(**kwargs)
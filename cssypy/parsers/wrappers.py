@@ -9,13 +9,18 @@ from .. import readers, stylesheets
 class ParserWrapper(object):
     default_encoding = None
     
-    def __init__(self, Parser, default_encoding=None):
+    def __init__(self, Parser, default_encoding=None, stats=None, 
+                 filesystem=None):
         self.default_encoding = default_encoding or self.default_encoding
         self.Parser = Parser
+        self.stats = stats  # optional stats.Stats, for the token count
+        self.filesystem = filesystem  # files are read from it (default: OS)
     
     def _parse(self, reader):
-        parser = self.Parser(reader.read())
+        parser = self.Parser(reader.read(), filename=reader.filename() or '')
         rootnode = parser.parse()
+        if self.stats is not None:
+            self.stats.add('tokens', parser.scanner.token_count)
         if reader.charset_rule_required():
             # TODO: check that rootnode contains an appropriate @charset rule
             # rootnode.charset != None
@@ -40,7 +45,8 @@ class ParserWrapper(object):
     def parse_file(self, filename, source_encoding=None, default_encoding=None):
         default_encoding = default_encoding or self.default_encoding
         reader = readers.FileReader(filename, source_encoding=source_encoding, 
-                                    default_encoding=default_encoding)
+                                    default_encoding=default_encoding, 
+                                    filesystem=self.filesystem)
         return self._parse(reader)
                            
     def parse_stream(self, stream, filename=None, source_encoding=None, default_encoding=None, do_decoding=True):
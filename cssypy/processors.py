@@ -1,67 +1,83 @@
 from __future__ import absolute_import
 from __future__ import print_function
 
+import contextlib
 import io
-import os.path
-import codecs
+import os
 import sys
+import threading
+import time
 
+import six
+
+# The batchsolvers and optimizers visitors are only imported when their 
+# options are enabled.
 from .visitors import (formatters as formattervisitors,
                        flatteners as flattenervisitors,
                        solvers as solvervisitors,
                        importers as importervisitors)
-from . import parsers, defs, errors, optionsdict
-from .utils import reporters, stringutil
+from . import parsers, defs, errors, filesystems, hooks, importgraph
+from . import optionsdict
+from . import nodes, sourcemaps, writers, stats as statsmod
+from .utils import asyncutil, reporters, stringutil
+from .utils.py3compat import range
 
 #==============================================================================#
 stringutil.register_unicode_handlers()
 
 #==============================================================================#
 class FileRelativeFinder(object):
-    def __init__(self, basefilepath):
+    def __init__(self, basefilepath, filesystem=None):
         self.basefilepath = basefilepath  # relative to this file
+        self.filesystem = filesystem or filesystems.OS_FILESYSTEM
         
     def find(self, filename):
-        dir = os.path.dirname(self.basefilepath)
-        filepath = os.path.join(dir, filename)
-        if os.path.exists(filepath):
-            assert os.path.isabs(filepath)
+        path = self.filesystem.path
+        dir = path.dirname(self.basefilepath)
+        filepath = path.join(dir, filename)
+        if self.filesystem.exists(filepath):
+            assert path.isabs(filepath)
             return filepath
         return None
         
         
 class DirectoryListFinder(object):
-    def __init__(self, dirs):
+    def __init__(self, dirs, filesystem=None):
         self.dirs = dirs
+        self.filesystem = filesystem or filesystems.OS_FILESYSTEM
         
     def find(self, filename):
-        filepaths = [os.path.join(dir, filename) for dir in self.dirs]
+        path = self.filesystem.path
+        filepaths = [path.join(dir, filename) for dir in self.dirs]
         for filepath in filepaths:
-            if os.path.exists(filepath):
-                assert os.path.isabs(filepath)
+            if self.filesystem.exists(filepath):
+                assert path.isabs(filepath)
                 return filepath
         return None
 
 
 class ImportResolver(object):
     def __init__(self, stylesheet, importing_filename, import_directories, 
-                 options=None):
+                 options=None, filesystem=None):
         self.options = options or optionsdict.Options()
         assert isinstance(self.options, optionsdict.Options)
+        filesystem = filesystem or filesystems.OS_FILESYSTEM
         self.finders = []
         
         if self.options.IMPORT_RELATIVE_TO_CURRENT_FILE:
             # look relative to directory of 'importing_filename'
-            self.finders.append(FileRelativeFinder(importing_filename))
+            self.finders.append(FileRelativeFinder(importing_filename, 
+                                                   filesystem))
             
         if self.options.IMPORT_RELATIVE_TO_TOPLEVEL_STYLESHEET:
             # look relative to top-level stylesheet directory
-            toplevel_filename = os.path.abspath(stylesheet.filename)
-            finder = FileRelativeFinder(os.path.dirname(toplevel_filename))
+            toplevel_filename = filesystem.abspath(stylesheet.filename)
+            finder = FileRelativeFinder(
+                        filesystem.path.dirname(toplevel_filename), filesystem)
             self.finders.append(finder)
             
         self.finders.extend(finder() for finder in self.options.IMPORT_FINDERS)
-        self.finders.append(DirectoryListFinder(import_directories))
+        self.finders.append(DirectoryListFinder(import_directories, filesystem))
         
     def resolve(self, filename):
         for finder in self.finders:
@@ -69,15 +85,74 @@ class ImportResolver(object):
             if filepath:
                 return filepath
         return None
+        
+        
+class ResolverCache(object):
+    """Caches the resolution of imports, keyed by the directory of the 
+    importing stylesheet and the imported name, for the Importers given it: 
+    those of one compilation, or of all the compilations of a server. The 
+    finders look up paths in a filesystems.IndexedFileSystem, so that the 
+    candidate paths of a directory cost one listing of it. 
+    
+    The cache is not updated when files are added or removed: call 
+    invalidate() with the path of each change (e.g. on the events of a file 
+    watcher), or without a path to forget everything.
+    """
+    def __init__(self, filesystem=None):
+        self.filesystem = filesystems.IndexedFileSystem(filesystem)
+        # context -> {(importing directory, name): filepath or None}
+        self._resolutions = {}
+        self._lock = threading.Lock()
+        
+    def resolutions(self, context):
+        """Returns the dict of the resolutions made in 'context', a hashable 
+        value that stands for what else they depend on (see 
+        Importer.resolve_context()).
+        """
+        with self._lock:
+            resolutions = self._resolutions.get(context)
+            if resolutions is None:
+                resolutions = self._resolutions[context] = {}
+            return resolutions
+        
+    def invalidate(self, path=None):
+        """Forgets the listing of the directory of 'path' (see 
+        IndexedFileSystem.invalidate()) and every resolution, since a file 
+        added or removed may change those of any directory that imports 
+        from it.
+        """
+        self.filesystem.invalidate(path)
+        with self._lock:
+            for resolutions in self._resolutions.values():
+                resolutions.clear()
     
 
 class Importer(object):
+    # The clock of the parse times recorded in the import graph.
+    timer = time.time
+    
     def __init__(self, stylesheet, import_directories, options=None, 
-                 reporter=None):
-        # 'import_directories' must contain absolute paths
+                 reporter=None, stats=None, hook=None, prefetched=None, 
+                 filesystem=None, resolver_cache=None, graph=None):
+        # 'import_directories' must contain absolute paths. 'prefetched' maps 
+        # (filepath, default_encoding) to futures of the results of 
+        # parse_file_timed() run by an ImportPrefetcher; each is used once, 
+        # in place of parsing the file. The imported files are found and 
+        # read in 'filesystem' (a filesystems.FileSystem, by default the real 
+        # one). The resolutions are kept in 'resolver_cache', a ResolverCache 
+        # of the same filesystem (by default, one for this Importer). The 
+        # imports are recorded in 'graph', an importgraph.ImportGraph, if 
+        # given.
         self.options = options or optionsdict.Options()
         assert isinstance(self.options, optionsdict.Options)
         self.reporter = reporter or reporters.NullReporter()
+        self.stats = stats
+        self.hook = hook
+        self.prefetched = prefetched if prefetched is not None else {}
+        self.filesystem = filesystem or filesystems.OS_FILESYSTEM
+        self.resolver_cache = resolver_cache or ResolverCache(self.filesystem)
+        self._resolutions = None
+        self.graph = graph
         if stylesheet.forced_encoding:
             self.source_encoding = stylesheet.encoding
         else:
@@ -86,15 +161,59 @@ class Importer(object):
         self.stylesheet = stylesheet
         self.import_directories = import_directories
         
+    def resolve_context(self):
+        """What the resolution of an import depends on besides the importing 
+        directory and the imported name (see ResolverCache.resolutions()).
+        """
+        options = self.options
+        toplevel_dir = None
+        if options.IMPORT_RELATIVE_TO_TOPLEVEL_STYLESHEET:
+            toplevel_dir = self.filesystem.path.dirname(
+                                self.filesystem.abspath(self.stylesheet.filename))
+        return (toplevel_dir, tuple(self.import_directories), 
+                bool(options.IMPORT_RELATIVE_TO_CURRENT_FILE), 
+                tuple(options.IMPORT_FINDERS))
+        
     def resolve_filename(self, filename, importing_filename):
-        assert os.path.isabs(importing_filename)
+        assert self.filesystem.path.isabs(importing_filename)
+        if self._resolutions is None:
+            self._resolutions = self.resolver_cache.resolutions(
+                                                    self.resolve_context())
+        key = (self.filesystem.path.dirname(importing_filename), filename)
+        try:
+            filepath = self._resolutions[key]
+        except KeyError:
+            pass
+        else:
+            if self.stats is not None:
+                self.stats.add('resolve_hits')
+            return filepath
         resolver = ImportResolver(self.stylesheet, importing_filename, 
-                                  self.import_directories, options=self.options)
-        return resolver.resolve(filename)
+                                  self.import_directories, options=self.options, 
+                                  filesystem=self.resolver_cache.filesystem)
+        filepath = self._resolutions[key] = resolver.resolve(filename)
+        return filepath
+        
+    def toplevel_sequence(self, stylesheet):
+        # The import sequence of a top-level stylesheet.
+        return (self.filesystem.abspath(stylesheet.filename),)
         
     def parse(self, filename, default_encoding):
+        return self.parse_timed(filename, default_encoding)[0]
+        
+    def parse_timed(self, filename, default_encoding):
+        """Returns the parsed stylesheet and the time in seconds spent 
+        reading and parsing it, in this thread or in an ImportPrefetcher.
+        """
+        future = self.prefetched.pop((filename, default_encoding), None)
+        if future is not None and not future.cancelled():
+            return future.result()
+        return self.parse_file_timed(filename, default_encoding)
+        
+    def parse_file(self, filename, default_encoding):
         pw = parsers.ParserWrapper(default_encoding=default_encoding, 
-                                   Parser=self.Parser)
+                                   Parser=self.Parser, stats=self.stats, 
+                                   filesystem=self.filesystem)
         try:
             stylesheet = pw.parse_file(filename,
                                        source_encoding=self.source_encoding, 
@@ -105,6 +224,19 @@ class Importer(object):
             return None
         return stylesheet
         
+    def parse_file_timed(self, filename, default_encoding):
+        start = self.timer()
+        stylesheet = self.parse_file(filename, default_encoding)
+        return stylesheet, self.timer() - start
+        
+    def parse_recorded(self, filepath, default_encoding, importing_filepath):
+        """parse(), recording the file and its import in the graph."""
+        stylesheet, elapsed = self.parse_timed(filepath, default_encoding)
+        self.graph.add_file(filepath, self.filesystem.getsize(filepath), 
+                            elapsed)
+        self.graph.add_import(importing_filepath, filepath)
+        return stylesheet
+        
     def on_import(self, filename, default_encoding, import_sequence):
         """Opens and parses an imported stylesheet.  This is called recursively 
         if an imported stylesheet contains imports of its own.
@@ -115,6 +247,8 @@ class Importer(object):
             if not filepath:
                 msg = "Unable to import stylesheet. File not found: '{}'"
                 self.reporter.debug(msg.format(filename))
+                if self.graph is not None:
+                    self.graph.add_missing(import_sequence[-1], filename)
                 if self.options.STOP_ON_IMPORT_NOT_FOUND:
                     sys.exit(1)
                 return None
@@ -123,43 +257,282 @@ class Importer(object):
                 msg = "Stylesheet directly or indirectly imported itself: '{}'"
                 raise errors.CSSCircularImportError(msg.format(filename))
             
+            if self.hook is None:
+                return self.import_file(filepath, default_encoding, 
+                                        import_sequence)
+            self.hook.import_start(filepath)
+            try:
+                return self.import_file(filepath, default_encoding, 
+                                        import_sequence)
+            finally:
+                self.hook.import_end(filepath)
+        return None
+        
+    def import_file(self, filepath, default_encoding, import_sequence):
+        if self.graph is None:
             stylesheet = self.parse(filepath, default_encoding)
-            import_sequence = import_sequence + (filepath,)
-            if stylesheet:
-                return self.do_imports(stylesheet, import_sequence)
-            else:
-                return None
+        else:
+            stylesheet = self.parse_recorded(filepath, default_encoding, 
+                                             import_sequence[-1])
+        import_sequence = import_sequence + (filepath,)
+        if stylesheet:
+            if self.stats is not None:
+                self.stats.add('imports')
+            return self.do_imports(stylesheet, import_sequence)
         return None
         
+    def get_visitor(self, stylesheet, import_sequence):
+        def on_import(filename):
+            return self.on_import(filename, stylesheet.encoding, 
+                                  import_sequence)
+        if self.stats is None:
+            visitor = importervisitors.Importer(callback=on_import)
+        else:
+            # The import pass counts the parsed nodes for the stats.
+            visitor = importervisitors.CountingImporter(callback=on_import)
+        if self.hook is not None:
+            visitor.set_hook(self.hook)
+        return visitor
+        
     def do_imports(self, stylesheet, import_sequence):
         """Performs the imports on the stylesheet. This is called recursively 
         if imports are found.
         """
-        def on_import(filename):
-            return self.on_import(filename, stylesheet.encoding, 
-                                  import_sequence)
-        importer = importervisitors.Importer(callback=on_import)
+        importer = self.get_visitor(stylesheet, import_sequence)
         node = importer(stylesheet.rootnode)
+        if self.stats is not None:
+            self.stats.add('nodes', importer.node_count)
+        return node
+        
+    def import_node(self, node):
+        """Performs the imports on a single node belonging to the top-level 
+        stylesheet. Returns the replacement node.
+        """
+        import_sequence = self.toplevel_sequence(self.stylesheet)
+        importer = self.get_visitor(self.stylesheet, import_sequence)
+        node = importer(node)
+        if self.stats is not None:
+            self.stats.add('nodes', importer.node_count)
         return node
         
     def run(self):
-        import_sequence = (os.path.abspath(self.stylesheet.filename),)
+        import_sequence = self.toplevel_sequence(self.stylesheet)
         return self.do_imports(self.stylesheet, import_sequence)
 
 
+#==============================================================================#
+def import_uris(stylesheet):
+    """Returns the URIs imported by 'stylesheet' that the import pass 
+    follows.
+    """
+    return [node.uri.string for node in nodes.walk(stylesheet.rootnode) 
+            if isinstance(node, nodes.Import) and 
+               isinstance(node.uri, nodes.StringNode)]
+
+
+class ImportPrefetcher(object):
+    """Reads and parses the stylesheets imported by a stylesheet, and those 
+    they import in turn, in an executor, so that the import pass does not 
+    wait for them. Imports that do not depend on each other are fetched 
+    concurrently.
+    
+    'futures' maps (filepath, default_encoding) to the future of each parsed 
+    stylesheet, with the time spent parsing it, as taken by 
+    Importer.parse_timed(). Errors are left in the futures 
+    and raised by the import pass, where they would have been raised without 
+    prefetching. 'on_done' is called once nothing is being fetched anymore.
+    """
+    def __init__(self, importer, executor, on_done, futures=None):
+        self.importer = importer
+        self.executor = executor
+        self.on_done = on_done
+        self.futures = futures if futures is not None else {}
+        self.cancelled = False
+        self._lock = threading.Lock()
+        self._pending = 0
+        
+    def start(self, stylesheet):
+        import_sequence = self.importer.toplevel_sequence(stylesheet)
+        self.fetch_imports(stylesheet, import_sequence)
+        
+    def fetch_imports(self, stylesheet, import_sequence):
+        with self._lock:
+            self._pending += 1
+        try:
+            for uri in import_uris(stylesheet):
+                self.fetch(uri, stylesheet.encoding, import_sequence)
+        finally:
+            self._release()
+            
+    def fetch(self, uri, default_encoding, import_sequence):
+        filepath = self.importer.resolve_filename(uri, import_sequence[-1])
+        if not filepath or filepath in import_sequence:
+            # Left to the import pass to report.
+            return
+        key = (filepath, default_encoding)
+        with self._lock:
+            if self.cancelled or key in self.futures:
+                return
+            future = self.executor.submit(self.importer.parse_file_timed, 
+                                          filepath, default_encoding)
+            self.futures[key] = future
+            self._pending += 1
+        import_sequence = import_sequence + (filepath,)
+        future.add_done_callback(
+                lambda future: self.on_fetched(future, import_sequence))
+        
+    def on_fetched(self, future, import_sequence):
+        try:
+            if not future.cancelled() and future.exception() is None:
+                stylesheet = future.result()[0]
+                if stylesheet:
+                    self.fetch_imports(stylesheet, import_sequence)
+        finally:
+            self._release()
+            
+    def _release(self):
+        with self._lock:
+            self._pending -= 1
+            done = not self._pending
+        if done:
+            self.on_done()
+            
+    def cancel(self):
+        """Stops fetching: cancels the reads that have not started."""
+        with self._lock:
+            self.cancelled = True
+            futures = list(self.futures.values())
+        for future in futures:
+            future.cancel()
+
+
+#==============================================================================#
+class Pipeline(object):
+    """Imports, solves, flattens and formats a stylesheet in one traversal of 
+    its top-level statements.
+    
+    Each top-level statement goes through every pass before the next one is 
+    touched, and is released as soon as it has been written. The statements of 
+    the stylesheet are consumed in the process. The output is identical to 
+    running Processor.process_imports(), Processor.apply_transforms() and a 
+    formatter one after the other, except that rulesets are only merged 
+    (ENABLE_MERGE_RULESETS) with rulesets from the same top-level statement.
+    
+    With ENABLE_BATCH_SOLVE, the arithmetic of each top-level statement is 
+    solved in bulk before the Solver visits it, one batch per statement.
+    """
+    def __init__(self, importer, options=None, stats=None, hook=None):
+        # 'importer' may be None if imports are disabled. 'stats' is an 
+        # optional stats.Stats, 'hook' an optional hooks.Hook.
+        self.options = options or optionsdict.Options()
+        assert isinstance(self.options, optionsdict.Options)
+        self.importer = importer
+        self.hook = hook
+        self.batch_solve = False
+        self.solver = None
+        self.flattener = None
+        self.merger = None
+        if self.options.ENABLE_SOLVE:
+            self.batch_solve = self.options.ENABLE_BATCH_SOLVE
+            self.solver = solvervisitors.Solver(self.options, 
+                                    stats=stats.solver if stats else None)
+            if self.options.ENABLE_FLATTEN:
+                self.flattener = flattenervisitors.RulesetFlattener(self.options)
+                if self.options.ENABLE_MERGE_RULESETS:
+                    from .visitors import optimizers as optimizervisitors
+                    self.merger = optimizervisitors.RulesetMerger(self.options)
+        if hook is not None:
+            for visitor in (self.solver, self.flattener, self.merger):
+                if visitor:
+                    visitor.set_hook(hook)
+        
+    def process_statement(self, stmt):
+        """Returns the list of statements to be written in place of 'stmt'."""
+        if self.batch_solve:
+            self.batch_solve_statement(stmt)
+        if self.solver:
+            stmt = self.solver.visit(stmt)
+            if not stmt:
+                return []
+        if self.flattener:
+            stmts = self.flattener.flatten_statement(stmt)
+            if self.merger:
+                stmts = self.merger.merge(stmts)
+            return stmts
+        return [stmt]
+        
+    def batch_solve_statement(self, stmt):
+        # A BatchSolver collects the expressions of a single pass, so each 
+        # statement gets its own.
+        from .visitors import batchsolvers as batchsolvervisitors
+        batchsolver = batchsolvervisitors.BatchSolver(self.options)
+        if self.hook is not None:
+            batchsolver.set_hook(self.hook)
+        batchsolver(stmt)
+        
+    def run(self, rootnode, writer):
+        if rootnode.charset:
+            writer.visit(rootnode.charset)
+            writer.newline()
+        for imp in rootnode.imports:
+            if self.importer:
+                imp = self.importer.import_node(imp)
+            writer.visit(imp)
+        
+        statements = rootnode.statements
+        rootnode.statements = []
+        if self.solver:
+            self.solver.push_namespace()
+        try:
+            for i in range(len(statements)):
+                stmt = statements[i]
+                statements[i] = None  # release the input subtree
+                for newstmt in self.process_statement(stmt):
+                    writer.visit(newstmt)
+                    writer.newline()
+        finally:
+            if self.solver:
+                self.solver.pop_namespace()
+        writer.flush()
+
+
 #==============================================================================#
 class Processor(object):
     DefaultImporter = Importer
     DefaultParser = parsers.Parser
     
     def __init__(self, default_encoding=None, Importer=None, Parser=None, 
-                 import_directories=None, options=None, reporter=None):
+                 import_directories=None, options=None, reporter=None, 
+                 stats=None, hook=None, filesystem=None, resolver_cache=None, 
+                 import_graph=None):
+        # 'stats' is a stats.Stats to fill in. If not given, one is created 
+        # when the STATS option is set. 'hook' is a hooks.Hook; if not given, 
+        # a hooks.ProfileHook is used when the PROFILE option is set. Files 
+        # are read from and written to 'filesystem' (a 
+        # filesystems.FileSystem, by default the real one, or that of 
+        # 'resolver_cache'). 'resolver_cache' is a ResolverCache to share 
+        # with other compilations; by default, one is kept for this one. 
+        # 'import_graph' is an importgraph.ImportGraph to record the imports 
+        # in; if not given, one is created when the IMPORT_GRAPH option is set.
         if isinstance(options, dict):
             options = optionsdict.Options(options)
         self.options = options or optionsdict.Options()
         assert isinstance(self.options, optionsdict.Options)
         
         self.reporter = reporter or reporters.NullReporter()
+        if stats is None and self.options.STATS:
+            stats = statsmod.Stats()
+        self.stats = stats
+        if hook is None and self.options.PROFILE:
+            hook = hooks.ProfileHook()
+        self.hook = hook
+        if filesystem is None and resolver_cache is not None:
+            filesystem = resolver_cache.filesystem.filesystem
+        self.filesystem = filesystem or filesystems.OS_FILESYSTEM
+        self.resolver_cache = resolver_cache or ResolverCache(self.filesystem)
+        if import_graph is None and self.options.IMPORT_GRAPH:
+            import_graph = importgraph.ImportGraph()
+        self.import_graph = import_graph
         default_encoding = default_encoding or defs.DEFAULT_ENCODING
         
         self.import_directories = import_directories or []
@@ -167,9 +540,81 @@ class Processor(object):
         self.Parser = Parser or self.DefaultParser
         self.parser_wrapper = parsers.ParserWrapper(
                                             default_encoding=default_encoding, 
-                                            Parser=self.Parser)  # todo: pass options
+                                            Parser=self.Parser, 
+                                            stats=self.stats, 
+                                            filesystem=self.filesystem)  # todo: pass options
         
         self.stylesheet = None
+        # Futures of the imported stylesheets fetched by aparse().
+        self.prefetched = {}
+        
+    def timer(self, stage):
+        """Returns a context manager that adds the time spent in it to 
+        'stage' in the stats.
+        """
+        if self.stats is None:
+            return statsmod.no_timer()
+        return self.stats.timer(stage)
+        
+    @contextlib.contextmanager
+    def stage(self, stage):
+        """Context manager around a pass: times it (see timer()) and calls 
+        the hook's pass_start() and pass_end().
+        """
+        if self.hook is None:
+            with self.timer(stage):
+                yield
+            return
+        self.hook.pass_start(stage)
+        try:
+            with self.timer(stage):
+                yield
+        finally:
+            self.hook.pass_end(stage)
+        
+    def hooked(self, visitor):
+        """Sets the hook of 'visitor' and returns it."""
+        if self.hook is not None:
+            visitor.set_hook(self.hook)
+        return visitor
+        
+    def report_stats(self):
+        if self.stats is not None:
+            self.reporter.on_stats(self.stats)
+        
+    def report_profile(self):
+        """With the PROFILE option, writes the profile to the file it names 
+        in the processor's filesystem, or reports it as a table if it is '-'.
+        """
+        profile = self.options.PROFILE
+        if not profile or not isinstance(self.hook, hooks.ProfileHook):
+            return
+        if profile == '-':
+            self.reporter.on_profile(self.hook)
+        else:
+            self.hook.dump_stats(profile, self.filesystem)
+        
+    def report_import_graph(self):
+        """With the IMPORT_GRAPH option, writes the import graph to the file 
+        it names in the processor's filesystem (see 
+        importgraph.ImportGraph.write()), or reports a summary if it is '-'.
+        """
+        filename = self.options.IMPORT_GRAPH
+        if not filename or self.import_graph is None:
+            return
+        if filename == '-':
+            self.reporter.on_import_graph(self.import_graph)
+        else:
+            self.import_graph.write(filename, self.filesystem)
+        
+    def record_root(self, file, parse_time):
+        # Adds the top-level stylesheet, parsed from 'file', to the import 
+        # graph.
+        path = self.filesystem.abspath(self.stylesheet.filename)
+        size = None
+        if isinstance(file, six.string_types):
+            size = self.filesystem.getsize(file)
+        self.import_graph.add_file(path, size, parse_time)
         
     def set_stylesheet(self, stylesheet):
         self.stylesheet = stylesheet
@@ -184,12 +629,17 @@ class Processor(object):
     def parse(self, file, filename=None, source_encoding=None, 
               default_encoding=None, do_decoding=True):
         try:
-            self.stylesheet = self.parser_wrapper.parse(file, filename=filename, 
+            start = time.time()
+            with self.stage('parse'):
+                self.stylesheet = self.parser_wrapper.parse(file, 
+                                            filename=filename, 
                                             source_encoding=source_encoding, 
                                             default_encoding=default_encoding, 
                                             do_decoding=do_decoding)
         except errors.CSSSyntaxError as e:
             self.on_syntax_error(e)
+        if self.import_graph is not None:
+            self.record_root(file, time.time() - start)
         # TODO: catch other exceptions from wrapper.parse()
         return self.stylesheet
     
@@ -200,67 +650,237 @@ class Processor(object):
         already unicode).
         """
         try:
-            self.stylesheet = self.parser_wrapper.parse_string(data, 
+            start = time.time()
+            with self.stage('parse'):
+                self.stylesheet = self.parser_wrapper.parse_string(data, 
                                             filename=filename, 
                                             source_encoding=source_encoding, 
                                             default_encoding=default_encoding)
         except errors.CSSSyntaxError as e:
             self.on_syntax_error(e)
+        if self.import_graph is not None:
+            self.record_root(None, time.time() - start)
         # TODO: catch other exceptions from wrapper.parse_string()
         return self.stylesheet
         
+    def aparse(self, file, executor, filename=None, source_encoding=None, 
+               default_encoding=None):
+        """Asynchronous parse(): reads and parses 'file' in 'executor' (a 
+        concurrent.futures.Executor), then prefetches the stylesheets it 
+        imports (see ImportPrefetcher), for use by process_imports(). Returns 
+        a concurrent.futures.Future of the stylesheet, which is done when the 
+        imports have been fetched. Cancelling it stops the fetching.
+        """
+        result = asyncutil.new_future()
+        parsed = executor.submit(self.parse, file, filename=filename, 
+                                 source_encoding=source_encoding, 
+                                 default_encoding=default_encoding)
+        asyncutil.cancel_with(result, parsed)
+        
+        def on_parsed(future):
+            if asyncutil.propagate_failure(future, result):
+                return
+            stylesheet = future.result()
+            if not self.options.ENABLE_IMPORTS:
+                asyncutil.set_result(result, stylesheet)
+                return
+            prefetcher = ImportPrefetcher(self.get_importer(), executor, 
+                        lambda: asyncutil.set_result(result, stylesheet), 
+                        futures=self.prefetched)
+            asyncutil.cancel_with(result, prefetcher)
+            try:
+                prefetcher.start(stylesheet)
+            except Exception as e:
+                asyncutil.set_exception(result, e)
+        parsed.add_done_callback(on_parsed)
+        return result
+        
+    def get_importer(self):
+        return self.Importer(self.stylesheet, self.import_directories, 
+                             options=self.options, reporter=self.reporter, 
+                             stats=self.stats, hook=self.hook, 
+                             prefetched=self.prefetched, 
+                             filesystem=self.filesystem, 
+                             resolver_cache=self.resolver_cache, 
+                             graph=self.import_graph)
+        
     def process_imports(self):
         assert self.stylesheet
+        if self.options.ENABLE_PIPELINE:
+            # Imports are done one statement at a time when writing.
+            return self.stylesheet
         if self.options.ENABLE_IMPORTS:
-            importer = self.Importer(self.stylesheet, self.import_directories, 
-                                     options=self.options, 
-                                     reporter=self.reporter)
+            importer = self.get_importer()
             try:
-                importer.run()
-            except CSSSyntaxError as e:
+                with self.stage('import'):
+                    importer.run()
+            except errors.CSSSyntaxError as e:
                 self.on_syntax_error(e)
             # TODO: catch other exceptions from importer.run()
         return self.stylesheet
         
     def apply_transforms(self):
         assert self.stylesheet
+        if self.options.ENABLE_PIPELINE:
+            # Transforms are done one statement at a time when writing.
+            return self.stylesheet
         # TODO: catch exceptions from transforms
         
         if self.options.ENABLE_SOLVE:
-            solver = solvervisitors.Solver(self.options)
-            solver(self.stylesheet.rootnode)
+            with self.stage('solve'):
+                if self.options.ENABLE_BATCH_SOLVE:
+                    from .visitors import batchsolvers as batchsolvervisitors
+                    batchsolver = self.hooked(
+                            batchsolvervisitors.BatchSolver(self.options))
+                    batchsolver(self.stylesheet.rootnode)
+                solver = self.hooked(solvervisitors.Solver(self.options, 
+                            stats=self.stats.solver if self.stats else None))
+                solver(self.stylesheet.rootnode)
             
         if self.options.ENABLE_FLATTEN and self.options.ENABLE_SOLVE:
-            flattener = flattenervisitors.RulesetFlattener(self.options)
-            flattener(self.stylesheet.rootnode)
+            flattener = self.hooked(
+                            flattenervisitors.RulesetFlattener(self.options))
+            try:
+                with self.stage('flatten'):
+                    flattener(self.stylesheet.rootnode)
+            except errors.CSSSyntaxError as e:
+                self.on_syntax_error(e)
+            
+            if self.options.ENABLE_MERGE_RULESETS:
+                with self.stage('merge'):
+                    from .visitors import optimizers as optimizervisitors
+                    merger = self.hooked(
+                            optimizervisitors.RulesetMerger(self.options))
+                    merger(self.stylesheet.rootnode)
         
         return self.stylesheet
         
-    def write(self, filename, encoding=None):
+    def run_pipeline(self, writer):
+        """Import, solve, flatten and write the stylesheet in one traversal of 
+        its top-level statements. Used in place of the separate passes when 
+        the ENABLE_PIPELINE option is set.
+        """
+        assert self.stylesheet
+        importer = None
+        if self.options.ENABLE_IMPORTS:
+            importer = self.get_importer()
+        pipeline = Pipeline(importer, options=self.options, stats=self.stats, 
+                            hook=self.hook)
+        try:
+            pipeline.run(self.stylesheet.rootnode, writer)
+        except errors.CSSSyntaxError as e:
+            self.on_syntax_error(e)
+        
+    def get_formatter(self, stream, minify=None, source_map=None):
+        if minify is None:
+            minify = self.options.MINIFY
+        if minify:
+            Formatter = formattervisitors.MinifyingFormatterVisitor
+        else:
+            Formatter = formattervisitors.CSSFormatterVisitor
+        return self.hooked(Formatter(stream, source_map=source_map))
+        
+    def format(self, stream, minify=None, source_map=None):
+        # 'source_map' is an optional sourcemaps.SourceMapGenerator, which is 
+        # filled in as the stylesheet is written. With ENABLE_PIPELINE, the 
+        # 'write' stage includes the imports and transforms.
+        writer = self.get_formatter(stream, minify, source_map)
+        # TODO: catch exceptions from writer.visit()
+        with self.stage('write'):
+            if self.options.ENABLE_PIPELINE:
+                self.run_pipeline(writer)
+            else:
+                writer.visit(self.stylesheet.rootnode)
+            
+    def write_source_mapping_comment(self, stream, url, minify=None):
+        if minify is None:
+            minify = self.options.MINIFY
+        if minify:
+            # minified output doesn't end with a newline
+            stream.write(u'\n')
+        stream.write(sourcemaps.source_mapping_comment(url))
+        
+    def format_with_inline_source_map(self, stream, minify=None):
+        # The sources are relative to the directory of the stylesheet, or to 
+        # the current directory if it was not read from a file.
+        source_map = sourcemaps.SourceMapGenerator()
+        self.format(stream, minify, source_map)
+        filename = self.stylesheet.filename
+        if filename and not filename.startswith('<'):
+            directory = self.filesystem.path.dirname(
+                                        self.filesystem.abspath(filename))
+        else:
+            directory = self.filesystem.abspath(os.curdir)
+        self.write_source_mapping_comment(stream, 
+                                          source_map.to_data_uri(directory), 
+                                          minify)
+        
+    def write(self, filename, encoding=None, minify=None, source_map=None):
+        """Write the processed stylesheet to the file 'filename'. 'minify' 
+        and 'source_map' override the MINIFY and SOURCE_MAP options. With a 
+        source map, the map is written to 'filename' + '.map', and referenced 
+        from the end of the stylesheet.
+        """
         assert self.stylesheet
         encoding = encoding or self.stylesheet.encoding
-        with io.open(filename, 'w', encoding=encoding, errors='cssypy') as stream:
-            writer = formattervisitors.CSSFormatterVisitor(stream)
-            # TODO: catch exceptions from writer.visit()
-            writer.visit(self.stylesheet.rootnode)
+        if source_map is None:
+            source_map = self.options.SOURCE_MAP
+        if source_map:
+            source_map = sourcemaps.SourceMapGenerator(
+                                    self.filesystem.path.basename(filename))
+        else:
+            source_map = None
+        with self.filesystem.open(filename, 'wb') as file:
+            stream = writers.EncodedOutput(file, encoding)
+            self.format(stream, minify, source_map)
+            if source_map:
+                self.write_source_mapping_comment(stream, 
+                                                  source_map.file + '.map', 
+                                                  minify)
+            stream.flush()
+        if self.stats is not None:
+            self.stats.output_bytes += stream.bytes_written
+        if source_map:
+            directory = self.filesystem.path.dirname(
+                                        self.filesystem.abspath(filename))
+            data = six.text_type(source_map.to_json(directory))
+            self.filesystem.write_bytes(filename + '.map', data.encode('utf-8'))
         
-    def write_stream(self, stream, filename=None, encoding=None):
+    def write_stream(self, stream, filename=None, encoding=None, minify=None, 
+                     source_map=None):
+        """Write the processed stylesheet to a byte stream. With a source map 
+        (see write()), the map is included in the output as a data URI.
+        """
         assert self.stylesheet
         encoding = encoding or self.stylesheet.encoding
-        Stream = codecs.getwriter(encoding)
-        stream = Stream(stream, errors='cssypy')
-        writer = formattervisitors.CSSFormatterVisitor(stream)
-        # TODO: catch exceptions from writer.visit()
-        writer.visit(self.stylesheet.rootnode)
+        stream = writers.EncodedOutput(stream, encoding)
+        if source_map is None:
+            source_map = self.options.SOURCE_MAP
+        if source_map:
+            self.format_with_inline_source_map(stream, minify)
+        else:
+            self.format(stream, minify)
+        stream.flush()
+        if self.stats is not None:
+            self.stats.output_bytes += stream.bytes_written
     
-    def write_string(self):
-        """Write the processed stylesheet to a unicode string."""
+    def write_string(self, minify=None, source_map=None):
+        """Write the processed stylesheet to a unicode string. 'minify' and 
+        'source_map' override the MINIFY and SOURCE_MAP options. With a source 
+        map, the map is included in the output as a data URI.
+        """
         assert self.stylesheet
         stream = io.StringIO()
-        writer = formattervisitors.CSSFormatterVisitor(stream)
-        # TODO: catch exceptions from writer.visit()
-        writer.visit(self.stylesheet.rootnode)
-        return stream.getvalue()
+        if source_map is None:
+            source_map = self.options.SOURCE_MAP
+        if source_map:
+            self.format_with_inline_source_map(stream, minify)
+        else:
+            self.format(stream, minify)
+        output = stream.getvalue()
+        if self.stats is not None:
+            self.stats.output_bytes += len(output.encode('utf-8'))
+        return output
         
 
 #==============================================================================#        
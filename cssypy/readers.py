@@ -7,7 +7,8 @@ import io
 
 import six
 
-from . import errors, defs
+from . import errors, defs, filesystems
+from .utils.lazy import LazyRegex
 
 #==============================================================================#
 def name8(m):
@@ -107,10 +108,10 @@ encoding_patterns = (
 )
 
 #==============================================================================#
-# compile the regexes
-encoding_patterns = tuple((enc, re.compile(ptn), req) for (enc,ptn,req) in encoding_patterns)
+# the regexes are compiled on first use
+encoding_patterns = tuple((enc, LazyRegex(ptn), req) for (enc,ptn,req) in encoding_patterns)
 
-re_string_charset = re.compile(ur'^@charset "(?P<name>[^\n\r"])";', re.UNICODE)
+re_string_charset = LazyRegex(ur'^@charset "(?P<name>[^\n\r"])";', re.UNICODE)
 
 #==============================================================================#
 class Reader(object):
@@ -243,20 +244,24 @@ class StreamReader(EncodedReader):
         
 #==============================================================================#
 class FileReader(EncodedReader):
-    def __init__(self, filename, source_encoding=None, default_encoding=None):
+    def __init__(self, filename, source_encoding=None, default_encoding=None, 
+                 filesystem=None):
+        # 'filesystem' is the filesystems.FileSystem the file is read from.
         super(FileReader, self).__init__(filename=filename, 
                                          source_encoding=source_encoding, 
                                          default_encoding=default_encoding)
+        self.filesystem = filesystem or filesystems.OS_FILESYSTEM
         
     def get_content_for_encoding_check(self, size):
         # Called by base class when determining the encoding used.
-        with open(self.filename(), 'rb') as f:
+        with self.filesystem.open(self.filename(), 'rb') as f:
             return f.read(size)
     
     def read(self):
         encoding = self.encoding()
         # read as encoded stream
-        with io.open(self.filename(), mode='rt', encoding=encoding) as f:
+        with io.TextIOWrapper(self.filesystem.open(self.filename(), 'rb'), 
+                              encoding=encoding) as f:
             # return unicode
             return f.read()
             
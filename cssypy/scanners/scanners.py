@@ -1,9 +1,6 @@
 from __future__ import absolute_import
 from __future__ import print_function
 
-import re
-import itertools
-
 from ..utils.py3compat import range
 from .. import csstokens as tokens
 
@@ -13,6 +10,7 @@ class ScannerBase(object):
         self._lineno = 1
         self._column = 1
         self._eof_count = 0
+        self.token_count = 0    # tokens read, including comments
         self._next = [tokens.Token(tokens.START, u'', self._lineno, self._column)]
         
     def __iter__(self):
@@ -82,6 +80,7 @@ class ScannerBase(object):
         
     def get_next(self):
         m = self._tokeniter.next()
+        self.token_count += 1
         toktype = tokens.tokens[m.lastgroup]
         value = m.group()
         tok = tokens.Token(toktype, value, self._lineno, self._column)
@@ -98,51 +97,4 @@ class Scanner(ScannerBase):
         while tok.type in self.ignore_tokens:
             tok = super(Scanner, self).get_next()
         return tok
-        
-        
-#==============================================================================#
-def benchmark_iter(src, tests=5):       # pragma: no cover
-    import time
-    times = []
-    for i in range(tests):
-        start = time.clock()
-        for tok in re_tokens.finditer(src):
-            pass
-        stop = time.clock()
-        times.append(stop - start)
-    return times
-
-def benchmark_iterlist(src, tests=5):   # pragma: no cover
-    import time
-    times = []
-    for i in range(tests):
-        start = time.clock()
-        ilist = list(re_tokens.finditer(src))
-        for tok in ilist:
-            pass
-        stop = time.clock()
-        times.append(stop - start)
-    return times
-    
-def benchmark_list(src, tests=5):       # pragma: no cover
-    import time
-    times = []
-    for i in range(tests):
-        start = time.clock()
-        for tok in re_tokens.findall(src):
-            pass
-        stop = time.clock()
-        times.append(stop - start)
-    return times
-
-def benchmark(src, ntests=5):           # pragma: no cover
-    times_list = benchmark_list(src, tests=ntests)
-    times_iterlist = benchmark_iterlist(src, tests=ntests)
-    times_iter = benchmark_iter(src, tests=ntests)
-    print('iter     time: {0}'.format(min(times_iter)))
-    print('iterlist time: {0}'.format(min(times_iterlist)))
-    print('list     time: {0}'.format(min(times_list)))
-
-#==============================================================================#
-
 
@@ -0,0 +1,136 @@
+from __future__ import absolute_import
+from __future__ import print_function
+
+import os.path
+
+BASE64_DIGITS = ('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
+                 '0123456789+/')
+
+VLQ_SHIFT = 5
+VLQ_CONTINUATION = 1 << VLQ_SHIFT
+VLQ_MASK = VLQ_CONTINUATION - 1
+
+_vlq_cache = {}
+
+
+#==============================================================================#
+def encode_vlq(value):
+    """Returns the base64 VLQ encoding of the integer 'value', as used in the
+    mappings of a source map.
+    """
+    s = _vlq_cache.get(value)
+    if s is None:
+        # The sign is stored in the lowest bit.
+        n = (-value << 1) | 1 if value < 0 else value << 1
+        digits = []
+        while True:
+            digit = n & VLQ_MASK
+            n >>= VLQ_SHIFT
+            if n:
+                digit |= VLQ_CONTINUATION
+            digits.append(BASE64_DIGITS[digit])
+            if not n:
+                break
+        s = ''.join(digits)
+        if -1024 <= value < 1024:
+            _vlq_cache[value] = s
+    return s
+
+
+#==============================================================================#
+class SourceMapGenerator(object):
+    """Builds a version 3 source map while the output is written.
+
+    Mappings are added in the order of the generated output: 'add' for a
+    position in the current generated line, 'next_line' at the end of each
+    line. Each mapping is encoded as soon as it is added, relative to the
+    previous one. Source line numbers are 1-based, as in the nodes; columns
+    are 0-based.
+    """
+    def __init__(self, file=None):
+        self.file = file
+        self.sources = []
+        self._source_indexes = {}
+        self._lines = []        # encoded mappings of the finished lines
+        self._segments = []     # encoded mappings of the current line
+        self._column = 0
+        self._last = None
+        self._source = 0
+        self._source_line = 0
+        self._source_column = 0
+
+    def source_index(self, source):
+        index = self._source_indexes.get(source)
+        if index is None:
+            index = self._source_indexes[source] = len(self.sources)
+            self.sources.append(source)
+        return index
+
+    def add(self, column, source, lineno, source_column=0):
+        """Maps 'column' of the current generated line to line 'lineno' of
+        'source'.
+        """
+        source = self.source_index(source)
+        lineno -= 1
+        if self._last == (column, source, lineno, source_column):
+            return
+        self._last = (column, source, lineno, source_column)
+        self._segments.append(encode_vlq(column - self._column) +
+                              encode_vlq(source - self._source) +
+                              encode_vlq(lineno - self._source_line) +
+                              encode_vlq(source_column - self._source_column))
+        self._column = column
+        self._source = source
+        self._source_line = lineno
+        self._source_column = source_column
+
+    def next_line(self):
+        self._lines.append(','.join(self._segments))
+        self._segments = []
+        self._column = 0
+        self._last = None
+
+    def mappings(self):
+        lines = self._lines
+        if self._segments:
+            lines = lines + [','.join(self._segments)]
+        return ';'.join(lines)
+
+    def to_dict(self, relative_to=None):
+        """Returns the source map as a dict. Source filenames are made
+        relative to the directory 'relative_to', if given.
+        """
+        sources = self.sources
+        if relative_to:
+            sources = [relative_source(source, relative_to)
+                       for source in sources]
+        return {
+            'version': 3,
+            'file': self.file or '',
+            'sources': sources,
+            'names': [],
+            'mappings': self.mappings(),
+        }
+
+    def to_json(self, relative_to=None):
+        import json
+        return json.dumps(self.to_dict(relative_to), sort_keys=True)
+
+    def to_data_uri(self, relative_to=None):
+        import base64
+        data = base64.b64encode(self.to_json(relative_to).encode('utf-8'))
+        return 'data:application/json;base64,' + data.decode('ascii')
+
+
+def relative_source(source, directory):
+    if not source or source.startswith('<'):
+        # not a file, e.g. '<string>' or '<stdin>'
+        return source
+    source = os.path.relpath(os.path.abspath(source), directory)
+    return source.replace(os.sep, '/')
+
+def source_mapping_comment(url):
+    return u'/*# sourceMappingURL={0} */\n'.format(url)
+
+
+#==============================================================================#
@@ -0,0 +1,117 @@
+from __future__ import absolute_import
+from __future__ import print_function
+
+import collections
+import contextlib
+import threading
+import time
+
+from . import datatypes
+from .utils import colorutil
+from .visitors.solvers import SolverStats
+
+
+def _caches():
+    # name -> the module-level caches whose hits are reported
+    return collections.OrderedDict([
+        ('color', datatypes._color_cache),
+        ('hsl_to_rgb', colorutil._hsl_to_rgb_cache),
+        ('rgb_to_hsl', colorutil._rgb_to_hsl_cache),
+    ])
+
+
+#==============================================================================#
+class Stats(object):
+    """Timings and counters of one compilation, filled in by the Processor.
+
+    'timings' maps each stage to its wall time in seconds, in the order the
+    stages ran. 'nodes' are counted by the import pass as it goes through 
+    the parsed stylesheets: with ENABLE_PIPELINE the statements of the 
+    top-level stylesheet are not counted, and without ENABLE_IMPORTS none 
+    are.
+
+    The counters may be updated from the threads reading imports ahead 
+    (see processors.ImportPrefetcher) through add(). The hits of the color 
+    caches are counted from the creation of the Stats object, and are 
+    process-wide: the caches are shared by all compilations, so the hits of 
+    compilations running at the same time in other threads are included.
+    """
+    def __init__(self):
+        self.timings = collections.OrderedDict()
+        self.tokens = 0
+        self.nodes = 0
+        self.imports = 0
+        self.resolve_hits = 0   # imports resolved from the ResolverCache
+        self.output_bytes = 0
+        self.solver = SolverStats()
+        self._lock = threading.Lock()
+        self._cache_start = dict((name, cache.hits)
+                                 for name, cache in _caches().items())
+
+    def add(self, counter, count=1):
+        """Adds 'count' to the attribute 'counter'."""
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + count)
+
+    @contextlib.contextmanager
+    def timer(self, stage):
+        """Adds the time spent in the 'with' block to 'stage'."""
+        start = time.time()
+        try:
+            yield
+        finally:
+            elapsed = time.time() - start
+            self.timings[stage] = self.timings.get(stage, 0.0) + elapsed
+
+    def total_time(self):
+        return sum(self.timings.values())
+
+    def cache_hits(self):
+        """Returns a dict of the hits of each cache."""
+        hits = collections.OrderedDict()
+        hits['fold'] = self.solver.fold_hits
+        hits['resolve'] = self.resolve_hits
+        for name, cache in _caches().items():
+            hits[name] = cache.hits - self._cache_start[name]
+        return hits
+
+    def as_dict(self):
+        return {
+            'timings': dict(self.timings),
+            'total_time': self.total_time(),
+            'tokens': self.tokens,
+            'nodes': self.nodes,
+            'imports': self.imports,
+            'cache_hits': dict(self.cache_hits()),
+            'output_bytes': self.output_bytes,
+        }
+
+    def format(self):
+        """Returns the stats as lines of text."""
+        lines = ['Stage timings:']
+        for stage, seconds in self.timings.items():
+            lines.append('  {0:<10} {1:>9.3f} ms'.format(stage, seconds*1000))
+        lines.append('  {0:<10} {1:>9.3f} ms'.format('total',
+                                                     self.total_time()*1000))
+        lines.append('Tokens: {0}  Nodes: {1}  Imports: {2}  '
+                     'Output bytes: {3}'.format(self.tokens, self.nodes,
+                                                self.imports,
+                                                self.output_bytes))
+        lines.append('Cache hits: ' + ', '.join(
+                '{0}={1}'.format(name, hits)
+                for name, hits in self.cache_hits().items()))
+        return '\n'.join(lines)
+
+    def __repr__(self):
+        fmt = '<Stats: {0:.3f}s, tokens={1}, nodes={2}, imports={3}>'
+        return fmt.format(self.total_time(), self.tokens, self.nodes,
+                          self.imports)
+
+
+@contextlib.contextmanager
+def no_timer():
+    # Stands in for Stats.timer() when no stats are collected.
+    yield
+
+
+#==============================================================================#
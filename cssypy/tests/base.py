@@ -5,6 +5,7 @@ import unittest
 import tempfile
 import os
 import os.path
+import shutil
 
 DATADIR = 'data'
 
@@ -15,8 +16,12 @@ class TestCaseBase(unittest.TestCase):
     def setUp(self):
         super(TestCaseBase, self).setUp()
         self.tempfiles = []
+        self.tempdirs = []
         
     def tearDown(self):
+        for directory in self.tempdirs:
+            shutil.rmtree(directory, ignore_errors=True)
+        self.tempdirs = []
         for filename in self.tempfiles:
             try:
                 os.remove(filename)
@@ -32,6 +37,24 @@ class TestCaseBase(unittest.TestCase):
             name = f.name
             self.tempfiles.append(name)
         return name
+        
+    def create_tempdir(self, files=None):
+        """Creates a temporary directory, removed after the test, holding 
+        'files': a dict mapping relative paths to contents (bytes).
+        """
+        directory = tempfile.mkdtemp()
+        self.tempdirs.append(directory)
+        for name, data in (files or {}).items():
+            self.write_tempfile(directory, name, data)
+        return directory
+        
+    def write_tempfile(self, directory, name, data):
+        filename = os.path.join(directory, name)
+        if not os.path.isdir(os.path.dirname(filename)):
+            os.makedirs(os.path.dirname(filename))
+        with open(filename, 'wb') as f:
+            f.write(data)
+        return filename
 
 
 
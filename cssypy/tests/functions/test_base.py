@@ -0,0 +1,41 @@
+from cssypy.functions import base
+from cssypy import errors
+
+from .. import base as testbase
+
+
+class LookupFunction_TestCase(testbase.TestCaseBase):
+    def tearDown(self):
+        base.registry.funcs.pop('testfunc', None)
+        base._dispatch.clear()
+        super(LookupFunction_TestCase, self).tearDown()
+        
+    def test_builtin(self):
+        self.assertIs(base.builtin_registry.funcs['rgb'][3].func, 
+                      base.lookup_function('rgb', 3))
+        
+    def test_unknown(self):
+        self.assertIsNone(base.lookup_function('linear-gradient', 2))
+        self.assertIsNone(base.lookup_function('rgb', 2))
+        self.assertIn(('linear-gradient', 2), base._dispatch)
+        with self.assertRaises(errors.CSSFunctionNotFound):
+            base.get_function('linear-gradient', 2)
+            
+    def test_register_invalidates_misses(self):
+        def testfunc(a):
+            return a
+        self.assertIsNone(base.lookup_function('testfunc', 1))
+        base.register(testfunc)
+        self.assertIs(testfunc, base.lookup_function('testfunc', 1))
+        self.assertIsNone(base.lookup_function('testfunc', 2))
+        
+    def test_builtins_take_precedence(self):
+        def rgb(r, g, b):
+            return None
+        try:
+            base.register(rgb)
+            self.assertIs(base.builtin_registry.funcs['rgb'][3].func, 
+                          base.lookup_function('rgb', 3))
+        finally:
+            base.registry.funcs.pop('rgb', None)
+            
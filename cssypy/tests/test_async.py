@@ -0,0 +1,201 @@
+import io
+import os
+import unittest
+
+try:
+    from concurrent import futures
+except ImportError:     # pragma: no cover
+    futures = None
+
+from cssypy import core, errors, filesystems, importgraph, processors, stats
+from cssypy.benchmarks import corpora
+
+from . import base
+
+
+class InlineExecutor(object):
+    # Runs each job when it is submitted.
+    def __init__(self):
+        self.calls = []
+        
+    def submit(self, fn, *args, **kwargs):
+        self.calls.append(getattr(fn, '__name__', fn))
+        future = futures.Future()
+        future.set_running_or_notify_cancel()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+
+class FakeClock(object):
+    # A timer that only moves when told to.
+    def __init__(self):
+        self.now = 0.0
+        
+    def __call__(self):
+        return self.now
+
+
+class QueueExecutor(object):
+    # Runs the submitted jobs only when run() is called.
+    def __init__(self):
+        self.jobs = []
+        
+    def submit(self, fn, *args, **kwargs):
+        future = futures.Future()
+        self.jobs.append((future, fn, args, kwargs))
+        return future
+        
+    def run(self):
+        while self.jobs:
+            future, fn, args, kwargs = self.jobs.pop(0)
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+
+@unittest.skipIf(futures is None, 'requires concurrent.futures')
+class CompileAsync_TestCase(base.TestCaseBase):
+    files = {
+        'main.css': b'@import "a.css";\n@import "b.css";\n'
+                    b'$x: 2;\nmain { p: $x*3; q { r: 1; } }\n',
+        'a.css': b'@import "common.css";\na { p: 1; }\n',
+        'b.css': b'@import "common.css";\n@import "missing.css";\n'
+                 b'b { p: 2; }\n',
+        'common.css': b'common { p: 0; }\n',
+    }
+    
+    def setUp(self):
+        super(CompileAsync_TestCase, self).setUp()
+        self.directory = self.create_tempdir(self.files)
+        self.main = os.path.join(self.directory, 'main.css')
+        
+    def write_file(self, name, data):
+        self.write_tempfile(self.directory, name, data)
+        
+    def compile_sync(self):
+        stream = io.BytesIO()
+        core.compile(self.main, stream, 
+                     options={'PROPAGATE_EXCEPTIONS': True})
+        return stream.getvalue().decode('utf-8')
+        
+    def test_same_output(self):
+        expected = self.compile_sync()
+        self.assertIn(u'common', expected)
+        for workers in (1, 4):
+            pool = futures.ThreadPoolExecutor(workers)
+            try:
+                for _ in range(5):
+                    future = core.compile_async(self.main, pool)
+                    self.assertEqual(expected, future.result(timeout=10))
+            finally:
+                pool.shutdown()
+            
+    def test_concurrent_colors(self):
+        # The color caches are shared by the compilations of all threads.
+        # High-volume runs are in benchmarks.threads.
+        src = corpora.generate('colors', 10, seed=3)[corpora.MAIN]
+        self.write_file('colors.css', src.encode('utf-8'))
+        self.main = os.path.join(self.directory, 'colors.css')
+        expected = self.compile_sync()
+        self.assertNotIn(u'rgb(', expected)
+        for cache in stats._caches().values():
+            cache.clear()
+        pool = futures.ThreadPoolExecutor(4)
+        try:
+            results = [core.compile_async(self.main, pool) for _ in range(4)]
+            for future in results:
+                self.assertEqual(expected, future.result(timeout=60))
+        finally:
+            pool.shutdown()
+            
+    def test_inline_executor(self):
+        future = core.compile_async(self.main, InlineExecutor())
+        self.assertEqual(self.compile_sync(), future.result())
+        
+    def test_prefetch(self):
+        proc = processors.Processor()
+        executor = InlineExecutor()
+        stylesheet = proc.aparse(self.main, executor).result()
+        self.assertIs(proc.stylesheet, stylesheet)
+        fetched = sorted(os.path.basename(filepath) 
+                         for filepath, encoding in proc.prefetched)
+        self.assertEqual(['a.css', 'b.css', 'common.css'], fetched)
+        self.assertEqual(3, executor.calls.count('parse_file_timed'))
+        proc.process_imports()
+        self.assertEqual({}, proc.prefetched)
+        
+    def test_prefetch_graph(self):
+        # The graph records the time spent parsing the prefetched files, not 
+        # the time spent waiting for them. The clock only moves when a file 
+        # is opened.
+        clock = FakeClock()
+        class ClockedFileSystem(filesystems.OSFileSystem):
+            def open(self, path, mode='rb'):
+                clock.now += 1.0
+                return super(ClockedFileSystem, self).open(path, mode)
+        class ClockedImporter(processors.Importer):
+            timer = clock
+        graph = importgraph.ImportGraph()
+        proc = processors.Processor(Importer=ClockedImporter, 
+                                    filesystem=ClockedFileSystem(), 
+                                    import_graph=graph)
+        executor = QueueExecutor()
+        parsed = proc.aparse(self.main, executor)
+        executor.run()
+        parsed.result()
+        self.assertEqual(3, len(proc.prefetched))
+        proc.process_imports()
+        self.assertEqual({}, proc.prefetched)
+        times = dict((os.path.basename(path), (node.parses, node.total_time)) 
+                     for path, node in graph.files.items())
+        # Each parse opens its file twice (see readers.FileReader). 
+        # common.css is prefetched once, and parsed again when imported a 
+        # second time.
+        self.assertEqual((1, 2.0), times['a.css'])
+        self.assertEqual((1, 2.0), times['b.css'])
+        self.assertEqual((2, 4.0), times['common.css'])
+        
+    def test_no_imports(self):
+        proc = processors.Processor(options={'ENABLE_IMPORTS': False})
+        proc.aparse(self.main, InlineExecutor()).result()
+        self.assertEqual({}, proc.prefetched)
+        
+    def test_syntax_error(self):
+        self.write_file('common.css', b'common { p: 0; ')
+        future = core.compile_async(self.main, InlineExecutor())
+        self.assertIsInstance(future.exception(), errors.CSSSyntaxError)
+        
+    def test_missing_file(self):
+        self.main = os.path.join(self.directory, 'none.css')
+        future = core.compile_async(self.main, InlineExecutor())
+        self.assertIsNotNone(future.exception())
+        
+    def test_cancel(self):
+        executor = QueueExecutor()
+        future = core.compile_async(self.main, executor)
+        self.assertTrue(future.cancel())
+        executor.run()
+        self.assertTrue(future.cancelled())
+        self.assertEqual([], executor.jobs)
+        
+    def test_cancel_while_fetching(self):
+        executor = QueueExecutor()
+        proc = processors.Processor()
+        future = proc.aparse(self.main, executor)
+        # parse the main stylesheet, which submits its imports
+        future_, fn, args, kwargs = executor.jobs.pop(0)
+        future_.set_running_or_notify_cancel()
+        future_.set_result(fn(*args, **kwargs))
+        self.assertEqual(2, len(executor.jobs))
+        self.assertTrue(future.cancel())
+        self.assertTrue(all(job[0].cancelled() for job in executor.jobs))
+        executor.run()
+        # the import pass parses the files that were not fetched
+        proc.process_imports()
+        self.assertIn(u'common', proc.write_string())
@@ -0,0 +1,58 @@
+import json
+
+from cssypy import core
+from cssypy.benchmarks import corpora, runner, stages, startup
+
+from . import base
+
+
+class Corpora_TestCase(base.TestCaseBase):
+    def test_reproducible(self):
+        for name in corpora.CORPORA:
+            self.assertEqual(corpora.generate(name, 20, seed=1), 
+                             corpora.generate(name, 20, seed=1))
+            
+    def test_compiles(self):
+        for name in corpora.CORPORA:
+            if name == 'imports':
+                continue
+            src = corpora.generate(name, 20)[corpora.MAIN]
+            self.assertTrue(core.compile_string(src))
+            
+    def test_load(self):
+        fs, filename = corpora.load('imports', 20)
+        self.assertEqual('/corpus/main.css', filename)
+        self.assertEqual(len(corpora.generate('imports', 20)), len(fs))
+        css = core.compile_string(fs.read_bytes(filename).decode('utf-8'), 
+                                  import_directories=['/corpus'], 
+                                  filesystem=fs)
+        self.assertNotIn(u'@import', css)
+            
+            
+class Runner_TestCase(base.TestCaseBase):
+    def test_run(self):
+        results = runner.run(size=10, repeat=1)
+        self.assertEqual(set(corpora.CORPORA), set(results['corpora']))
+        for result in results['corpora'].values():
+            self.assertEqual(set(stages.STAGES), set(result['stages']))
+            self.assertGreater(result['output_chars'], 0)
+        json.dumps(results)
+        
+        
+            
+            
+class Startup_TestCase(base.TestCaseBase):
+    def test_parse_importtime(self):
+        output = ('import time: self [us] | cumulative | imported package\n'
+                  'import time:       120 |        120 |   six\n'
+                  'import time:       300 |        420 | cssypy.main\n')
+        modules = startup.parse_importtime(output)
+        self.assertEqual([('six', 120, 120), ('cssypy.main', 300, 420)], 
+                         modules)
+        self.assertEqual(420, startup.total_time(modules))
+        
+    def test_run(self):
+        total, modules = startup.run(repeat=1)
+        self.assertGreater(total, 0)
+        self.assertTrue(any('cssypy.main' in name 
+                            for name, own, cumulative in modules))
@@ -262,3 +262,61 @@ class CompileFile_TestCase(base.TestCaseBase):
 #==============================================================================#
         
 
+class CompileString_Pipeline_TestCase(base.TestCaseBase):
+    def assertSameAsReference(self, src, **options):
+        expect = core.compile_string(src, options=dict(options))
+        options['ENABLE_PIPELINE'] = True
+        r = core.compile_string(src, options=options)
+        self.assertEqual(expect, r)
+        
+    def test_empty(self):
+        self.assertSameAsReference(u'')
+        
+    def test_nested(self):
+        src = u'outer, other { inner { rule: value; } x: y; } a b {}'
+        self.assertSameAsReference(src)
+        
+    def test_variables(self):
+        src = textwrap.dedent(u'''\
+        $x: 8;
+        s1 { $x: 5; r1: $x*2; }
+        $y: $x+1;
+        s2 { r2: $y; s3 { r3: -$x; } }
+        ''')
+        self.assertSameAsReference(src)
+        
+    def test_no_solve(self):
+        src = u'$x: 1; s1 { s2 { r: $x+1; } }'
+        self.assertSameAsReference(src, ENABLE_SOLVE=False)
+        
+    def test_no_flatten(self):
+        src = u'$x: 1; s1 { s2 { r: $x+1; } }'
+        self.assertSameAsReference(src, ENABLE_FLATTEN=False)
+        
+    def test_undefined_variable(self):
+        src = u's1 { r1: $x; }'
+        with self.assertRaises(errors.CSSVarNameError):
+            core.compile_string(src, options={'ENABLE_PIPELINE': True})
+        
+    def test_imports(self):
+        impsrc = u'selector-imp { rule-imp: #123; }\n'
+        impfilename = self.create_tempfile(data=impsrc, suffix='.css')
+        src = u'@import "{0}";\nselector1 {{ inner {{ rule1: 1+2; }} }}\n'
+        src = src.format(os.path.basename(impfilename))
+        ifilename = self.create_tempfile(data=src, suffix='.css')
+        ofilename1 = self.create_tempfile(suffix='.css')
+        ofilename2 = self.create_tempfile(suffix='.css')
+        
+        core.compile(ifilename, ofilename1)
+        core.compile(ifilename, ofilename2, 
+                     options={'ENABLE_PIPELINE': True})
+        
+        with open(ofilename1, 'r') as f:
+            expect = f.read()
+        with open(ofilename2, 'r') as f:
+            data = f.read()
+        self.assertIn('selector-imp {', data)
+        self.assertEqual(expect, data)
+
+
+#==============================================================================#
@@ -0,0 +1,211 @@
+import errno
+import io
+import os.path
+import tarfile
+import zipfile
+
+from cssypy import core, filesystems, processors, readers
+
+from . import base
+
+
+FILES = {
+    '/styles/main.css': u'@import "partials/a.css";\n.main { color: red; }\n',
+    '/styles/partials/a.css': u'@import "b.css";\n.a { color: blue; }\n',
+    '/styles/partials/b.css': u'.b { width: 3px; }\n',
+}
+
+
+class MemoryFileSystem_TestCase(base.TestCaseBase):
+    def setUp(self):
+        super(MemoryFileSystem_TestCase, self).setUp()
+        self.fs = filesystems.MemoryFileSystem(FILES)
+
+    def test_exists(self):
+        self.assertTrue(self.fs.exists('/styles/main.css'))
+        self.assertTrue(self.fs.exists('/styles/partials'))
+        self.assertTrue(self.fs.exists('/styles/partials/../main.css'))
+        self.assertFalse(self.fs.exists('/styles/missing.css'))
+        self.assertTrue(self.fs.isfile('/styles/main.css'))
+        self.assertFalse(self.fs.isfile('/styles'))
+
+    def test_listdir(self):
+        self.assertEqual(['main.css', 'partials'], self.fs.listdir('/styles'))
+        self.assertEqual(['styles'], self.fs.listdir('/'))
+        with self.assertRaises(IOError) as cm:
+            self.fs.listdir('/missing')
+        self.assertEqual(errno.ENOENT, cm.exception.errno)
+
+    def test_read(self):
+        self.assertEqual(FILES['/styles/partials/b.css'].encode('utf-8'),
+                         self.fs.read_bytes('styles/partials/b.css'))
+        with self.assertRaises(IOError) as cm:
+            self.fs.open('/styles/missing.css')
+        self.assertEqual(errno.ENOENT, cm.exception.errno)
+
+    def test_write(self):
+        with self.fs.open('/out/main.css', 'wb') as f:
+            f.write(b'.a{}')
+        self.assertEqual(b'.a{}', self.fs.read_bytes('/out/main.css'))
+        self.assertEqual(['out', 'styles'], self.fs.listdir('/'))
+
+    def test_reader(self):
+        reader = readers.FileReader('/styles/main.css', filesystem=self.fs)
+        self.assertEqual(FILES['/styles/main.css'], reader.read())
+
+    def test_from_directory(self):
+        directory = os.path.join(self.DATAPATH, 'imports')
+        fs = filesystems.MemoryFileSystem.from_directory(directory)
+        for name in os.listdir(directory):
+            path = os.path.join(os.path.abspath(directory), name)
+            if os.path.isfile(path):
+                with io.open(path, 'rb') as f:
+                    self.assertEqual(f.read(), fs.read_bytes(path))
+
+
+class Finders_TestCase(base.TestCaseBase):
+    def setUp(self):
+        super(Finders_TestCase, self).setUp()
+        self.fs = filesystems.MemoryFileSystem(FILES)
+
+    def test_file_relative(self):
+        finder = processors.FileRelativeFinder('/styles/main.css', self.fs)
+        self.assertEqual('/styles/partials/a.css', finder.find('partials/a.css'))
+        self.assertEqual(None, finder.find('a.css'))
+
+    def test_directory_list(self):
+        finder = processors.DirectoryListFinder(['/other', '/styles/partials'],
+                                                self.fs)
+        self.assertEqual('/styles/partials/b.css', finder.find('b.css'))
+        self.assertEqual(None, finder.find('main.css'))
+
+
+class Compile_TestCase(base.TestCaseBase):
+    def expected(self):
+        return core.compile_string(
+                u'.b { width: 3px; }\n.a { color: blue; }\n'
+                u'.main { color: red; }\n')
+
+    def compile(self, fs):
+        proc = processors.Processor(options={'PROPAGATE_EXCEPTIONS': True},
+                                    filesystem=fs)
+        proc.parse('/styles/main.css')
+        proc.process_imports()
+        proc.apply_transforms()
+        return proc.write_string()
+
+    def test_memory(self):
+        fs = filesystems.MemoryFileSystem(FILES)
+        self.assertEqual(self.expected(), self.compile(fs))
+
+    def test_write(self):
+        fs = filesystems.MemoryFileSystem(FILES)
+        core.compile('/styles/main.css', '/out/main.css', filesystem=fs,
+                     options={'SOURCE_MAP': True})
+        css = fs.read_bytes('/out/main.css').decode('utf-8')
+        self.assertTrue(css.startswith(self.expected()))
+        self.assertTrue(fs.isfile('/out/main.css.map'))
+
+    def test_zip(self):
+        data = io.BytesIO()
+        with zipfile.ZipFile(data, 'w') as archive:
+            for path, contents in FILES.items():
+                archive.writestr(path.lstrip('/'), contents.encode('utf-8'))
+        data.seek(0)
+        with filesystems.ZipFileSystem(data) as fs:
+            self.assertEqual(self.expected(), self.compile(fs))
+            with self.assertRaises(IOError) as cm:
+                fs.open('/out.css', 'wb')
+            self.assertEqual(errno.EROFS, cm.exception.errno)
+
+    def test_tar(self):
+        data = io.BytesIO()
+        archive = tarfile.open(fileobj=data, mode='w')
+        for path, contents in FILES.items():
+            contents = contents.encode('utf-8')
+            info = tarfile.TarInfo(path.lstrip('/'))
+            info.size = len(contents)
+            archive.addfile(info, io.BytesIO(contents))
+        archive.close()
+        data.seek(0)
+        with filesystems.TarFileSystem(data) as fs:
+            self.assertEqual(self.expected(), self.compile(fs))
+
+
+class CountingFileSystem(filesystems.MemoryFileSystem):
+    def __init__(self, files=None):
+        super(CountingFileSystem, self).__init__(files)
+        self.calls = []
+
+    def exists(self, path):
+        self.calls.append(('exists', path))
+        return super(CountingFileSystem, self).exists(path)
+
+    def listdir(self, path):
+        self.calls.append(('listdir', path))
+        return super(CountingFileSystem, self).listdir(path)
+
+
+class CaseInsensitiveFileSystem(CountingFileSystem):
+    case_sensitive = False
+    
+    def exists(self, path):
+        self.calls.append(('exists', path))
+        path = self.abspath(path).lower()
+        return any(p.lower() == path for p in list(self.files) + 
+                                              list(self._dirs))
+    
+    
+class IndexedFileSystem_TestCase(base.TestCaseBase):
+    def setUp(self):
+        super(IndexedFileSystem_TestCase, self).setUp()
+        self.memfs = CountingFileSystem(FILES)
+        self.fs = filesystems.IndexedFileSystem(self.memfs)
+
+    def test_exists(self):
+        self.assertTrue(self.fs.exists('/styles/main.css'))
+        self.assertTrue(self.fs.exists('/styles/partials'))
+        self.assertFalse(self.fs.exists('/styles/missing.css'))
+        self.assertFalse(self.fs.exists('/missing/main.css'))
+        self.assertTrue(self.fs.exists('/'))
+        self.assertEqual([('listdir', '/styles'), ('listdir', '/missing'),
+                          ('exists', '/')], self.memfs.calls)
+
+    def test_invalidate(self):
+        self.assertFalse(self.fs.exists('/styles/new.css'))
+        self.memfs.write_bytes('/styles/new.css', b'')
+        self.assertFalse(self.fs.exists('/styles/new.css'))
+        self.fs.invalidate('/styles/new.css')
+        self.assertTrue(self.fs.exists('/styles/new.css'))
+        self.memfs.write_bytes('/styles/new2.css', b'')
+        self.fs.invalidate()
+        self.assertTrue(self.fs.exists('/styles/new2.css'))
+
+    def test_write(self):
+        self.assertFalse(self.fs.exists('/styles/out.css'))
+        self.fs.write_bytes('/styles/out.css', b'.a{}')
+        self.assertTrue(self.fs.exists('/styles/out.css'))
+        self.assertEqual(b'.a{}', self.fs.read_bytes('/styles/out.css'))
+        
+    def test_case_insensitive(self):
+        self.assertFalse(self.fs.exists('/styles/MAIN.css'))
+        memfs = CaseInsensitiveFileSystem(FILES)
+        fs = filesystems.IndexedFileSystem(memfs)
+        self.assertFalse(fs.case_sensitive)
+        self.assertTrue(fs.exists('/styles/main.css'))
+        self.assertTrue(fs.exists('/styles/MAIN.css'))
+        self.assertTrue(fs.exists('/Styles/Partials'))
+        self.assertFalse(fs.exists('/styles/missing.css'))
+        self.assertEqual([('listdir', '/styles'), 
+                          ('exists', '/styles/MAIN.css'), 
+                          ('listdir', '/Styles'), 
+                          ('exists', '/Styles/Partials'), 
+                          ('exists', '/styles/missing.css')], memfs.calls)
+        
+    def test_os_case_sensitive(self):
+        fs = filesystems.IndexedFileSystem()
+        self.assertIsInstance(fs.case_sensitive, bool)
+        path = os.path.abspath(filesystems.__file__)
+        self.assertTrue(fs.exists(path))
+        self.assertEqual(not fs.case_sensitive, 
+                         fs.exists(path.swapcase()))
@@ -0,0 +1,173 @@
+from cStringIO import StringIO
+import marshal
+import os
+import pstats
+
+from cssypy import core, filesystems, hooks, processors
+from cssypy.utils import reporters
+from cssypy.visitors import solvers
+
+from . import base
+
+
+class RecordingHook(hooks.Hook):
+    trace_nodes = True
+    
+    def __init__(self):
+        self.events = []
+        
+    def pass_start(self, name):
+        self.events.append(('pass_start', name))
+        
+    def pass_end(self, name):
+        self.events.append(('pass_end', name))
+        
+    def import_start(self, filename):
+        self.events.append(('import_start', os.path.basename(filename)))
+        
+    def import_end(self, filename):
+        self.events.append(('import_end', os.path.basename(filename)))
+        
+    def node_start(self, visitor, method, node):
+        self.events.append(('node_start', method))
+        
+    def node_end(self, visitor, method, node):
+        self.events.append(('node_end', method))
+
+
+class FakeTimer(object):
+    def __init__(self):
+        self.now = 0.0
+        
+    def __call__(self):
+        self.now += 1.0
+        return self.now
+
+
+class Hook_TestCase(base.TestCaseBase):
+    src = u'$x: 2;\na { b { p: $x*3; } }\n'
+    
+    def compile(self, hook, **options):
+        proc = processors.Processor(options=dict(options, 
+                                                 PROPAGATE_EXCEPTIONS=True), 
+                                    hook=hook)
+        proc.parse_string(self.src)
+        proc.process_imports()
+        proc.apply_transforms()
+        return proc.write_string()
+        
+    def test_passes(self):
+        hook = RecordingHook()
+        self.compile(hook)
+        passes = [name for event, name in hook.events 
+                  if event == 'pass_start']
+        self.assertEqual(['parse', 'import', 'solve', 'flatten', 'write'], 
+                         passes)
+        self.assertIn(('node_start', 'visit_Declaration'), hook.events)
+        
+    def test_balanced(self):
+        hook = RecordingHook()
+        self.compile(hook, ENABLE_PIPELINE=True)
+        depth = 0
+        for event, name in hook.events:
+            depth += 1 if event.endswith('_start') else -1
+            self.assertGreaterEqual(depth, 0)
+        self.assertEqual(0, depth)
+        
+    def test_untraced(self):
+        hook = hooks.Hook()
+        solver = solvers.Solver()
+        solver.set_hook(hook)
+        self.assertNotIn('visit_Declaration', vars(solver))
+        traced = RecordingHook()
+        solver.set_hook(traced)
+        self.assertIn('visit_Declaration', vars(solver))
+        solver.set_hook(None)
+        self.assertNotIn('visit_Declaration', vars(solver))
+        
+    def test_same_output(self):
+        self.assertEqual(self.compile(None), self.compile(hooks.ProfileHook()))
+        
+    def test_imports(self):
+        fs = filesystems.MemoryFileSystem({
+                '/main.css': u'@import "a.css";\nx { p: 1; }', 
+                '/a.css': u'@import "b.css";\ny { p: 2; }', 
+                '/b.css': u'z { p: 3; }'})
+        hook = RecordingHook()
+        proc = processors.Processor(hook=hook, filesystem=fs)
+        proc.parse('/main.css')
+        proc.process_imports()
+        imports = [(event, name) for event, name in hook.events 
+                   if event.startswith('import_')]
+        self.assertEqual([('import_start', 'a.css'), 
+                          ('import_start', 'b.css'), 
+                          ('import_end', 'b.css'), 
+                          ('import_end', 'a.css')], imports)
+
+
+class ProfileHook_TestCase(base.TestCaseBase):
+    src = u'$x: 2;\na { b { p: $x*3; } c { q: 1; } }\n'
+    
+    def test_times(self):
+        hook = hooks.ProfileHook(timer=FakeTimer())
+        hook.enter('outer')     # t=1
+        hook.enter('inner')     # t=2
+        hook.enter('inner')     # t=3
+        hook.exit()             # t=4
+        hook.exit()             # t=5
+        hook.exit()             # t=6
+        cc, nc, tt, ct, callers = hook.entries['outer']
+        self.assertEqual((1, 1, 2.0, 5.0), (cc, nc, tt, ct))
+        cc, nc, tt, ct, callers = hook.entries['inner']
+        self.assertEqual((1, 2, 3.0, 3.0), (cc, nc, tt, ct))
+        self.assertEqual({'outer': 1, 'inner': 1}, callers)
+        
+    def test_methods(self):
+        hook = hooks.ProfileHook()
+        proc = processors.Processor(hook=hook)
+        proc.parse_string(self.src)
+        proc.apply_transforms()
+        names = set(key[2] for key in hook.entries)
+        self.assertIn('<pass solve>', names)
+        self.assertIn('Solver.visit_Declaration', names)
+        key = [key for key in hook.entries 
+               if key[2] == 'Solver.visit_Declaration'][0]
+        self.assertEqual(2, hook.entries[key][1])
+        self.assertTrue(key[0].endswith(('solvers.py', 'solvers.pyc')))
+        
+    def test_table(self):
+        stream = StringIO()
+        reporter = reporters.Reporter(error_stream=stream)
+        core.compile_string(self.src, options={'PROFILE': '-'}, 
+                            reporter=reporter)
+        output = stream.getvalue()
+        self.assertIn('tottime', output)
+        self.assertIn('Solver.visit_Declaration', output)
+        self.assertIn('<pass write>', output)
+        
+    def test_dump_stats(self):
+        filename = os.path.join(self.create_tempdir(), 'profile.out')
+        core.compile_string(self.src, options={'PROFILE': filename})
+        stats = pstats.Stats(filename)
+        names = set(key[2] for key in stats.stats)
+        self.assertIn('<pass flatten>', names)
+        output = StringIO()
+        stats.stream = output
+        stats.sort_stats('cumulative').print_stats()
+        self.assertIn('visit_Declaration', output.getvalue())
+            
+    def test_dump_stats_filesystem(self):
+        fs = filesystems.MemoryFileSystem({'/in.css': self.src})
+        core.compile('/in.css', '/out.css', filesystem=fs, 
+                     options={'PROFILE': '/profile.out'})
+        stats = marshal.loads(fs.read_bytes('/profile.out'))
+        self.assertIn('<pass flatten>', set(key[2] for key in stats))
+            
+    def test_sort(self):
+        hook = hooks.ProfileHook()
+        proc = processors.Processor(hook=hook)
+        proc.parse_string(self.src)
+        proc.apply_transforms()
+        for sort in ('calls', 'tottime', 'cumtime', 'name'):
+            lines = hook.format(sort=sort, limit=3).splitlines()
+            self.assertEqual(4, len(lines))
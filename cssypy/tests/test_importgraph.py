@@ -0,0 +1,134 @@
+from cStringIO import StringIO
+import json
+import os
+
+from cssypy import core, filesystems, importgraph, main
+from cssypy.utils import reporters
+
+from . import base
+
+
+FILES = {
+    '/styles/main.css': u'@import "a.css";\n@import "b.css";\n.main {}\n',
+    '/styles/a.css': u'@import "c.css";\n.a {}\n',
+    '/styles/b.css': u'@import "c.css";\n@import "missing.css";\n.b {}\n',
+    '/styles/c.css': u'.c { color: red; }\n',
+}
+
+
+class ImportGraph_TestCase(base.TestCaseBase):
+    def build(self):
+        # main -> a -> c, main -> b -> c, with parse times in seconds.
+        graph = importgraph.ImportGraph()
+        for path, size, time in [('/s/main.css', 100, 1.0),
+                                 ('/s/a.css', 10, 5.0),
+                                 ('/s/c.css', 20, 2.0),
+                                 ('/s/b.css', 30, 1.0),
+                                 ('/s/c.css', 20, 2.0)]:
+            graph.add_file(path, size, time)
+        graph.add_import('/s/main.css', '/s/a.css')
+        graph.add_import('/s/a.css', '/s/c.css')
+        graph.add_import('/s/main.css', '/s/b.css')
+        graph.add_import('/s/b.css', '/s/c.css')
+        return graph
+
+    def test_files(self):
+        graph = self.build()
+        self.assertEqual('/s/main.css', graph.root)
+        c = graph.files['/s/c.css']
+        self.assertEqual((20, 2, 2.0), (c.size, c.parses, c.parse_time))
+        self.assertEqual(['/s/a.css', '/s/b.css'],
+                         graph.importers('/s/c.css'))
+        self.assertEqual(['/s/a.css', '/s/b.css'],
+                         graph.imports('/s/main.css'))
+
+    def test_duplicates(self):
+        self.assertEqual([('/s/c.css', 2)], self.build().duplicates())
+
+    def test_critical_path(self):
+        # c can start once b is parsed, at 2s, and ends at 4s; a ends at 6s.
+        path, time = self.build().critical_path()
+        self.assertEqual(['/s/main.css', '/s/a.css'], path)
+        self.assertEqual(6.0, time)
+        graph = self.build()
+        graph.files['/s/c.css'].total_time = 20.0
+        path, time = graph.critical_path()
+        self.assertEqual(['/s/main.css', '/s/b.css', '/s/c.css'], path)
+        self.assertEqual(12.0, time)
+        self.assertEqual(([], 0.0), importgraph.ImportGraph().critical_path())
+
+    def test_json(self):
+        data = json.loads(self.build().to_json())
+        self.assertEqual(['/s/main.css', '/s/a.css'],
+                         data['critical_path']['files'])
+        self.assertEqual([{'path': '/s/c.css', 'count': 2}],
+                         data['duplicates'])
+        self.assertEqual(4, len(data['files']))
+        self.assertEqual(4, len(data['imports']))
+
+    def test_dot(self):
+        dot = self.build().to_dot()
+        self.assertTrue(dot.startswith('digraph imports {'))
+        self.assertIn('"/s/main.css" -> "/s/a.css" [color=red, penwidth=2];',
+                      dot)
+        self.assertIn('"/s/a.css" -> "/s/c.css";', dot)
+        self.assertIn('label="c.css\\n20 B, 2000.00 ms"', dot)
+
+    def test_format(self):
+        output = self.build().format()
+        self.assertIn('Critical path: 6000.000 ms', output)
+        self.assertIn('2x  c.css', output)
+
+
+class Compile_TestCase(base.TestCaseBase):
+    def setUp(self):
+        super(Compile_TestCase, self).setUp()
+        self.fs = filesystems.MemoryFileSystem(FILES)
+
+    def test_import_graph(self):
+        graph = core.import_graph('/styles/main.css', filesystem=self.fs)
+        self.assertEqual('/styles/main.css', graph.root)
+        self.assertEqual(['/styles/main.css', '/styles/a.css',
+                          '/styles/c.css', '/styles/b.css'], list(graph.files))
+        self.assertEqual(len(FILES['/styles/b.css']),
+                         graph.files['/styles/b.css'].size)
+        self.assertEqual(2, graph.files['/styles/c.css'].parses)
+        self.assertEqual([('/styles/c.css', 2)], graph.duplicates())
+        self.assertEqual([('/styles/b.css', 'missing.css')], graph.missing)
+        self.assertEqual('/styles/main.css', graph.critical_path()[0][0])
+
+    def test_report(self):
+        stream = StringIO()
+        reporter = reporters.Reporter(error_stream=stream)
+        core.compile('/styles/main.css', '/out.css', filesystem=self.fs,
+                     options={'IMPORT_GRAPH': '-'}, reporter=reporter)
+        self.assertIn('Imported more than once:', stream.getvalue())
+        
+    def test_write(self):
+        # The graph is written in the filesystem of the stylesheets.
+        for name in ('/out/graph.json', '/out/graph.dot'):
+            core.compile('/styles/main.css', '/out/main.css', 
+                         filesystem=self.fs, options={'IMPORT_GRAPH': name})
+            self.assertTrue(self.fs.isfile(name))
+        data = json.loads(self.fs.read_bytes('/out/graph.json').decode('utf-8'))
+        self.assertEqual('/styles/main.css', data['root'])
+        dot = self.fs.read_bytes('/out/graph.dot').decode('utf-8')
+        self.assertTrue(dot.startswith(u'digraph imports {'))
+
+    def test_cmdline(self):
+        directory = self.create_tempdir(
+                        dict((os.path.basename(path), data.encode('utf-8'))
+                             for path, data in FILES.items()))
+        ifilename = os.path.join(directory, 'main.css')
+        ofilename = os.path.join(directory, 'out.css')
+        for name in ('graph.json', 'graph.dot'):
+            graphname = os.path.join(directory, name)
+            main._main(cmdline=[ifilename, ofilename,
+                                '--import-graph', graphname])
+            with open(graphname) as f:
+                output = f.read()
+            if name.endswith('.json'):
+                self.assertEqual(ifilename, json.loads(output)['root'])
+            else:
+                self.assertIn('"{0}"'.format(ifilename), output)
+
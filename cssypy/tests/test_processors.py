@@ -1,6 +1,6 @@
 import os.path
 
-from cssypy import processors, parsers, optionsdict, errors, nodes
+from cssypy import processors, parsers, optionsdict, errors, nodes, filesystems
 
 from . import base
 
@@ -53,3 +53,65 @@ class Importer_TestCase(base.TestCaseBase):
                          rootnode.imports[0].uri.string)
         
 
+
+class ResolverCache_TestCase(base.TestCaseBase):
+    FILES = {
+        '/styles/main.css': u'@import "a.css";\n@import "b.css";\n',
+        '/styles/a.css': u'@import "c.css";\n.a {}\n',
+        '/styles/b.css': u'@import "c.css";\n.b {}\n',
+        '/styles/c.css': u'@import "missing.css";\n.c {}\n',
+    }
+    
+    def setUp(self):
+        super(ResolverCache_TestCase, self).setUp()
+        self.fs = filesystems.MemoryFileSystem(self.FILES)
+        self.listings = []
+        listdir = self.fs.listdir
+        def counting_listdir(path):
+            self.listings.append(path)
+            return listdir(path)
+        self.fs.listdir = counting_listdir
+        # Each directory is listed once; '/' is searched by the top-level 
+        # stylesheet's finder.
+        
+    def compile(self, cache=None, **opts):
+        proc = processors.Processor(options=dict(opts, STATS=True), 
+                                    filesystem=self.fs, resolver_cache=cache)
+        proc.parse('/styles/main.css')
+        proc.process_imports()
+        return proc
+        
+    def test_one_compilation(self):
+        proc = self.compile()
+        self.assertEqual(4, proc.stats.imports)
+        # c.css is imported twice; the second time, c.css and missing.css 
+        # are resolved from the cache.
+        self.assertEqual(2, proc.stats.resolve_hits)
+        self.assertEqual(['/styles', '/'], self.listings)
+        
+    def test_shared(self):
+        cache = processors.ResolverCache(self.fs)
+        self.compile(cache)
+        proc = self.compile(cache)
+        self.assertEqual(6, proc.stats.resolve_hits)
+        self.assertEqual(['/styles', '/'], self.listings)
+        self.assertIs(self.fs, proc.filesystem)
+        
+    def test_context(self):
+        cache = processors.ResolverCache(self.fs)
+        self.compile(cache)
+        proc = self.compile(cache, IMPORT_RELATIVE_TO_TOPLEVEL_STYLESHEET=False)
+        self.assertEqual(2, proc.stats.resolve_hits)
+        
+    def test_invalidate(self):
+        cache = processors.ResolverCache(self.fs)
+        proc = self.compile(cache)
+        self.assertEqual(4, proc.stats.imports)
+        self.fs.write_bytes('/styles/missing.css', u'.missing {}\n')
+        proc = self.compile(cache)
+        self.assertEqual(4, proc.stats.imports)
+        cache.invalidate('/styles/missing.css')
+        proc = self.compile(cache)
+        self.assertEqual(6, proc.stats.imports)
+        self.assertEqual(['/styles', '/', '/styles'], self.listings)
+        
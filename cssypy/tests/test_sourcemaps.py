@@ -0,0 +1,200 @@
+import io
+import os.path
+import json
+import base64
+
+from cssypy import filesystems, sourcemaps, processors
+
+from . import base
+
+
+def decode_vlq_segment(segment):
+    values = []
+    value = shift = 0
+    for c in segment:
+        digit = sourcemaps.BASE64_DIGITS.index(c)
+        value += (digit & sourcemaps.VLQ_MASK) << shift
+        shift += sourcemaps.VLQ_SHIFT
+        if not digit & sourcemaps.VLQ_CONTINUATION:
+            values.append(-(value >> 1) if value & 1 else value >> 1)
+            value = shift = 0
+    return values
+
+def decode_mappings(mappings):
+    """Returns a list of (generated line, generated column, source index, 
+    source line) tuples, with 0-based lines.
+    """
+    result = []
+    source = source_line = 0
+    for line, segments in enumerate(mappings.split(';')):
+        column = 0
+        for segment in segments.split(','):
+            if not segment:
+                continue
+            dcol, dsource, dline, dscol = decode_vlq_segment(segment)
+            column += dcol
+            source += dsource
+            source_line += dline
+            result.append((line, column, source, source_line))
+    return result
+
+
+class VLQ_TestCase(base.TestCaseBase):
+    def test_encode(self):
+        self.assertEqual('A', sourcemaps.encode_vlq(0))
+        self.assertEqual('C', sourcemaps.encode_vlq(1))
+        self.assertEqual('D', sourcemaps.encode_vlq(-1))
+        self.assertEqual('gB', sourcemaps.encode_vlq(16))
+        
+    def test_roundtrip(self):
+        for value in (0, 1, -1, 15, 16, -16, 1000, -1000, 123456, -7654321):
+            self.assertEqual([value], 
+                    decode_vlq_segment(sourcemaps.encode_vlq(value)))
+        
+        
+class SourceMapGenerator_TestCase(base.TestCaseBase):
+    def test_mappings(self):
+        gen = sourcemaps.SourceMapGenerator('out.css')
+        gen.add(0, 'a.css', 1)
+        gen.next_line()
+        gen.add(4, 'a.css', 2)
+        gen.add(10, 'b.css', 7)
+        gen.next_line()
+        gen.next_line()
+        gen.add(0, 'a.css', 3)
+        self.assertEqual(['a.css', 'b.css'], gen.sources)
+        self.assertEqual([(0, 0, 0, 0), (1, 4, 0, 1), (1, 10, 1, 6), 
+                          (3, 0, 0, 2)], decode_mappings(gen.mappings()))
+        
+    def test_relative_sources(self):
+        gen = sourcemaps.SourceMapGenerator('out.css')
+        gen.add(0, '/src/css/a.css', 1)
+        gen.add(1, '<string>', 1)
+        d = gen.to_dict(relative_to='/src/out')
+        self.assertEqual(['../css/a.css', '<string>'], d['sources'])
+        self.assertEqual(3, d['version'])
+        
+        
+class ProcessorSourceMap_TestCase(base.TestCaseBase):
+    src = (u'a {\n'
+           u'    color: red;\n'
+           u'    b, c {\n'
+           u'        margin: 1px;\n'
+           u'    }\n'
+           u'}\n'
+           u'd { x: 1; }\n')
+    
+    def process(self, src=None, options=None):
+        options = dict(options or {}, PROPAGATE_EXCEPTIONS=True)
+        proc = processors.Processor(options=options)
+        proc.parse_string(src or self.src, filename='in.css')
+        proc.process_imports()
+        proc.apply_transforms()
+        return proc
+        
+    def inline_map(self, output):
+        css, comment = output.rsplit(u'/*# sourceMappingURL=', 1)
+        prefix = u'data:application/json;base64,'
+        self.assertTrue(comment.startswith(prefix))
+        data = comment[len(prefix):-len(u' */\n')]
+        return css, json.loads(base64.b64decode(data).decode('utf-8'))
+        
+    def test_write_string(self):
+        output = self.process().write_string(source_map=True)
+        css, smap = self.inline_map(output)
+        self.assertEqual(u'a {\n    color: red;\n}\n'
+                         u'a b, a c {\n    margin: 1px;\n}\n'
+                         u'd {\n    x: 1;\n}\n', css)
+        self.assertEqual(['in.css'], smap['sources'])
+        self.assertEqual([(0, 0, 0, 0), (1, 4, 0, 1), (3, 0, 0, 2), 
+                          (4, 4, 0, 3), (6, 0, 0, 6), (7, 4, 0, 6)], 
+                         decode_mappings(smap['mappings']))
+        
+    def test_minified(self):
+        output = self.process().write_string(minify=True, source_map=True)
+        css, smap = self.inline_map(output)
+        self.assertEqual(u'a{color:red}a b,a c{margin:1px}d{x:1}\n', css)
+        self.assertEqual([(0, 0, 0, 0), (0, 2, 0, 1), (0, 12, 0, 2), 
+                          (0, 20, 0, 3), (0, 31, 0, 6), (0, 33, 0, 6)], 
+                         decode_mappings(smap['mappings']))
+        
+    def test_wrapped_line(self):
+        selectors = u', '.join(u'.selector-{0}'.format(i) for i in range(10))
+        src = u'{0} {{\n    color: red;\n}}\n'.format(selectors)
+        output = self.process(src).write_string(source_map=True)
+        css, smap = self.inline_map(output)
+        lines = css.splitlines()
+        self.assertEqual(4, len(lines))
+        self.assertEqual([(0, 0, 0, 0), (2, 4, 0, 1)], 
+                         decode_mappings(smap['mappings']))
+        
+    def test_pipeline(self):
+        expected = self.process().write_string(source_map=True)
+        output = self.process(options={'ENABLE_PIPELINE': True}
+                              ).write_string(source_map=True)
+        self.assertEqual(expected, output)
+        
+    def test_write_file(self):
+        filename = self.create_tempfile(suffix='.css')
+        self.tempfiles.append(filename + '.map')
+        self.process().write(filename, source_map=True)
+        with io.open(filename, encoding='utf-8') as f:
+            css = f.read()
+        with io.open(filename + '.map', encoding='utf-8') as f:
+            smap = json.load(f)
+        basename = os.path.basename(filename)
+        self.assertTrue(css.endswith(
+                u'/*# sourceMappingURL={0}.map */\n'.format(basename)))
+        self.assertEqual(basename, smap['file'])
+        self.assertEqual(6, len(decode_mappings(smap['mappings'])))
+        
+    def test_option(self):
+        proc = self.process(options={'SOURCE_MAP': True})
+        self.assertIn(u'sourceMappingURL', proc.write_string())
+        self.assertNotIn(u'sourceMappingURL', 
+                         proc.write_string(source_map=False))
+        
+    def test_minified_imports(self):
+        fs = filesystems.MemoryFileSystem({
+            '/s/main.css': u'@import "a.css";\n@import "b.css";\n.main { x: 1; }\n',
+            '/s/a.css': u'@import "c.css";\n.a { y: 2; }\n',
+            '/s/b.css': u'.b { z: 3; }\n',
+            '/s/c.css': u'.c { w: 4; }\n',
+        })
+        proc = processors.Processor(options={'PROPAGATE_EXCEPTIONS': True}, 
+                                    filesystem=fs)
+        proc.parse('/s/main.css')
+        proc.process_imports()
+        proc.apply_transforms()
+        css, smap = self.inline_map(proc.write_string(minify=True, 
+                                                      source_map=True))
+        self.assertEqual(u'.c{w:4}.a{y:2}.b{z:3}.main{x:1}\n', css)
+        columns = [(column, smap['sources'][source]) for 
+                   line, column, source, source_line in 
+                   decode_mappings(smap['mappings'])]
+        self.assertEqual([(0, 'c.css'), (3, 'c.css'), 
+                          (7, 'a.css'), (10, 'a.css'), 
+                          (14, 'b.css'), (17, 'b.css'), 
+                          (21, 'main.css'), (27, 'main.css')], columns)
+        
+    def test_relative_imports(self):
+        # The sources of inline maps are relative, like those of write().
+        fs = filesystems.MemoryFileSystem({
+            '/build/main.css': 
+                u'@import "partials/part.css";\n.main { x: 1; }\n',
+            '/build/partials/part.css': u'.part { y: 2; }\n',
+        })
+        proc = processors.Processor(options={'PROPAGATE_EXCEPTIONS': True}, 
+                                    filesystem=fs)
+        proc.parse('/build/main.css')
+        proc.process_imports()
+        css, smap = self.inline_map(proc.write_string(source_map=True))
+        self.assertEqual(['partials/part.css', 'main.css'], smap['sources'])
+        # Without a filename, relative to the current directory.
+        proc = processors.Processor(options={'PROPAGATE_EXCEPTIONS': True}, 
+                                    import_directories=['/build'], 
+                                    filesystem=fs)
+        proc.parse_string(u'@import "partials/part.css";\n')
+        proc.process_imports()
+        css, smap = self.inline_map(proc.write_string(source_map=True))
+        self.assertEqual(['build/partials/part.css'], smap['sources'])
@@ -0,0 +1,72 @@
+from cStringIO import StringIO
+
+from cssypy import core, filesystems, nodes, parsers, processors, stats
+from cssypy.utils import reporters
+
+from . import base
+
+
+class Stats_TestCase(base.TestCaseBase):
+    src = u'$x: 2;\na { b { p: $x*3; q: rgb(1, 2, 3); } }\n'
+    
+    def test_compile_string(self):
+        css, st = core.compile_string(self.src, return_stats=True)
+        self.assertIn(u'p: 6;', css)
+        self.assertEqual(['parse', 'import', 'solve', 'flatten', 'write'], 
+                         list(st.timings))
+        self.assertGreater(st.tokens, 0)
+        self.assertGreater(st.nodes, 0)
+        self.assertEqual(len(css), st.output_bytes)
+        self.assertEqual(0, st.imports)
+        self.assertIn('fold', st.cache_hits())
+        
+    def test_pipeline(self):
+        options = {'ENABLE_PIPELINE': True}
+        css, st = core.compile_string(self.src, options=options, 
+                                      return_stats=True)
+        self.assertEqual(['parse', 'write'], list(st.timings))
+        
+    def test_option(self):
+        proc = processors.Processor(options={'STATS': True})
+        self.assertIsInstance(proc.stats, stats.Stats)
+        self.assertIsNone(processors.Processor().stats)
+        
+    def test_imports(self):
+        fs = filesystems.MemoryFileSystem({
+                '/main.css': u'@import "a.css";\nx { p: 1; }', 
+                '/a.css': u'@import "b.css";\ny { p: 2; }', 
+                '/b.css': u'z { p: 3; }'})
+        proc = processors.Processor(stats=stats.Stats(), filesystem=fs)
+        proc.parse('/main.css')
+        proc.process_imports()
+        self.assertEqual(2, proc.stats.imports)
+        self.assertIn('import', proc.stats.timings)
+            
+    def test_nodes(self):
+        # Counted by the import pass, the same as walking the parsed trees.
+        files = {'/main.css': u'@import "a.css";\nx { p: 1px+2px; }', 
+                 '/a.css': u'y { q: rgb(1, 2, 3); }'}
+        proc = processors.Processor(stats=stats.Stats(), 
+                        filesystem=filesystems.MemoryFileSystem(files))
+        proc.parse('/main.css')
+        proc.process_imports()
+        expected = sum(len(list(nodes.walk(parsers.Parser(src).parse())))
+                       for src in files.values())
+        self.assertEqual(expected, proc.stats.nodes)
+        
+    def test_add(self):
+        st = stats.Stats()
+        st.add('imports')
+        st.add('tokens', 10)
+        self.assertEqual((1, 10), (st.imports, st.tokens))
+        
+    def test_reporter(self):
+        stream = StringIO()
+        reporter = reporters.Reporter(error_stream=stream)
+        core.compile_string(self.src, options={'STATS': True}, 
+                            reporter=reporter)
+        output = stream.getvalue()
+        self.assertIn("Stage timings:", output)
+        self.assertIn("Tokens: ", output)
+        
+        
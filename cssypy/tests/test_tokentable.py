@@ -0,0 +1,67 @@
+import _sre
+import os
+import re
+
+from cssypy import csstokens, tokendefs, tokentable
+from cssypy.utils import resnapshot
+
+from . import base
+
+
+class TokenTable_TestCase(base.TestCaseBase):
+    def test_current(self):
+        # Run 'python -m cssypy.tokentable' if this fails.
+        self.assertTrue(tokentable.is_current())
+        
+    def test_tables(self):
+        self.assertEqual(tokendefs.tokens, csstokens.tokens)
+        self.assertEqual(tokendefs.token_lookup, csstokens.token_lookup)
+        self.assertEqual('|'.join(tokendefs.token_regexes), 
+                         csstokens.token_str)
+        self.assertEqual(tokendefs.IDENT, csstokens.IDENT)
+        self.assertEqual(tokendefs.BAD_TOKEN, csstokens.BAD_TOKEN)
+        
+    def test_out_of_date(self):
+        filename = os.path.join(self.create_tempdir(), '_tokentable.py')
+        self.assertFalse(tokentable.is_current(filename))
+        tokentable.write(filename)
+        self.assertTrue(tokentable.is_current(filename))
+        with open(filename, 'a') as f:
+            f.write('# edited\n')
+        self.assertFalse(tokentable.is_current(filename))
+            
+            
+class Snapshot_TestCase(base.TestCaseBase):
+    pattern = r'(?P<word>[a-z]+)|(?P<num>[0-9]+)|(?P<other>.)'
+    
+    def test_roundtrip(self):
+        data = resnapshot.dumps(self.pattern, re.UNICODE)
+        regex = resnapshot.loads(data, self.pattern, re.UNICODE)
+        expected = re.compile(self.pattern, re.UNICODE)
+        text = u'abc 123 d\u00e9f'
+        self.assertEqual([(m.lastgroup, m.group()) 
+                          for m in expected.finditer(text)], 
+                         [(m.lastgroup, m.group()) 
+                          for m in regex.finditer(text)])
+        self.assertEqual(expected.groupindex, regex.groupindex)
+        
+    def test_mismatch(self):
+        data = resnapshot.dumps(self.pattern)
+        self.assertIsNone(resnapshot.loads(data, self.pattern + 'x'))
+        self.assertIsNone(resnapshot.loads(data, self.pattern, re.I))
+        self.assertIsNone(resnapshot.loads(b'garbage', self.pattern))
+        
+    def test_capture_restores(self):
+        sre_compile = _sre.compile
+        with self.assertRaises(re.error):
+            resnapshot.dumps(u'(unbalanced')
+        self.assertIs(sre_compile, _sre.compile)
+        resnapshot.dumps(self.pattern)
+        self.assertIs(sre_compile, _sre.compile)
+        
+    def test_compiler(self):
+        filename = os.path.join(self.create_tempdir(), 'regex.snapshot')
+        compile = resnapshot.compiler(filename)
+        self.assertEqual(u'ab', compile(self.pattern).match(u'ab').group())
+        resnapshot.dump(filename, self.pattern)
+        self.assertEqual(u'ab', compile(self.pattern).match(u'ab').group())
@@ -0,0 +1,115 @@
+import io
+
+from cssypy import writers, parsers, processors
+from cssypy.utils import stringutil
+from cssypy.visitors import formatters
+from cssypy.benchmarks import output
+
+from . import base
+
+
+class ChunkWriter_TestCase(base.TestCaseBase):
+    def setUp(self):
+        super(ChunkWriter_TestCase, self).setUp()
+        self.stream = io.StringIO()
+        self.writer = writers.ChunkWriter(self.stream, line_width=10)
+        
+    def test_newline(self):
+        self.writer.write(u'abc')
+        self.writer.newline(u'  ')
+        self.writer.write(u'def')
+        self.writer.flush()
+        self.assertEqual(u'abc\n  def', self.stream.getvalue())
+        
+    def test_wrap(self):
+        self.writer.write(u'aaaa,')
+        self.writer.optional_newline(u'  ')
+        self.writer.write(u'bbbbbbbb')
+        self.writer.newline()
+        self.writer.flush()
+        self.assertEqual(u'aaaa,\nbbbbbbbb\n', self.stream.getvalue())
+        
+    def test_no_wrap(self):
+        self.writer.write(u'aaaa,')
+        self.writer.optional_newline()
+        self.writer.write(u'bbbb')
+        self.writer.flush()
+        self.assertEqual(u'aaaa,bbbb', self.stream.getvalue())
+        
+    def test_long_line(self):
+        self.writer.write(u'a'*11)
+        self.writer.optional_newline(u'  ')
+        self.writer.write(u'b')
+        self.writer.flush()
+        self.assertEqual(u'a'*11 + u'\n  b', self.stream.getvalue())
+        
+    def test_wrap_at_line_width(self):
+        self.writer.write(u'a'*10)
+        self.writer.optional_newline()
+        self.writer.write(u'b')
+        self.writer.flush()
+        self.assertEqual(u'a'*10 + u'\nb', self.stream.getvalue())
+        
+    def test_blocks(self):
+        writer = writers.ChunkWriter(self.stream, block_size=4)
+        for i in range(10):
+            writer.write(u'x')
+            writer.newline()
+        self.assertTrue(self.stream.getvalue())
+        writer.flush()
+        self.assertEqual(u'x\n'*10, self.stream.getvalue())
+        
+        
+class LegacyOutput_TestCase(base.TestCaseBase):
+    def format(self, Formatter, stylesheet):
+        stream = io.StringIO()
+        Formatter(stream).visit(stylesheet)
+        return stream.getvalue()
+        
+    def test_same_output(self):
+        stylesheet = parsers.Parser(output.generate_source(50)).parse()
+        self.assertEqual(
+            self.format(output.LegacyFormatterVisitor, stylesheet), 
+            self.format(formatters.CSSFormatterVisitor, stylesheet))
+            
+            
+            
+            
+class EncodedOutput_TestCase(base.TestCaseBase):
+    def setUp(self):
+        super(EncodedOutput_TestCase, self).setUp()
+        stringutil.register_unicode_handlers()
+        
+    def encode(self, texts, encoding, block_size=4):
+        stream = io.BytesIO()
+        output = writers.EncodedOutput(stream, encoding, block_size=block_size)
+        for text in texts:
+            output.write(text)
+        output.flush()
+        return stream.getvalue()
+        
+    def test_utf8(self):
+        texts = [u'a { content: "', u'\u00e9\u2014', u'"; }\n']
+        self.assertEqual(u''.join(texts).encode('utf-8'), 
+                         self.encode(texts, 'UTF_8'))
+        
+    def test_ascii_escapes(self):
+        texts = [u'a { content: "', u'\u00e9', u'"; }\n']
+        self.assertEqual(b'a { content: "\\0000E9"; }\n', 
+                         self.encode(texts, 'ascii'))
+        
+    def test_stateful_encoding(self):
+        # the byte order mark is written once
+        texts = [u'abc', u'def', u'ghi']
+        self.assertEqual(u'abcdefghi'.encode('utf-16'), 
+                         self.encode(texts, 'utf-16'))
+        
+    def test_write_stream(self):
+        proc = processors.Processor(options={'PROPAGATE_EXCEPTIONS': True})
+        proc.parse_string(u'a { content: "\u00e9"; }')
+        stream = io.BytesIO()
+        proc.write_stream(stream, encoding='ascii')
+        self.assertEqual(b'a {\n    content: "\\0000E9";\n}\n', 
+                         stream.getvalue())
+                         
+                         
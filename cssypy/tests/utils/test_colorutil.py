@@ -0,0 +1,100 @@
+import threading
+
+from cssypy.utils import colorutil
+from cssypy.utils.lrucache import LRUCache
+from cssypy import datatypes
+
+from .. import base
+
+
+class LRUCache_TestCase(base.TestCaseBase):
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(2)
+        cache['a'] = 1
+        cache['b'] = 2
+        self.assertEqual(1, cache.get('a'))
+        cache['c'] = 3
+        self.assertNotIn('b', cache)
+        self.assertIn('a', cache)
+        self.assertIn('c', cache)
+        self.assertEqual(2, len(cache))
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(1, cache.hits)
+        self.assertEqual(1, cache.misses)
+        
+    def test_locked(self):
+        # The caches are shared by threads: every operation takes the lock.
+        class RecordingLock(object):
+            def __init__(self):
+                self.lock = threading.Lock()
+                self.acquired = 0
+            def __enter__(self):
+                self.lock.acquire()
+                self.acquired += 1
+            def __exit__(self, *exc_info):
+                self.lock.release()
+        cache = LRUCache(2)
+        lock = cache._lock = RecordingLock()
+        cache['a'] = 1
+        cache.get('a')
+        cache.get('b')
+        cache.clear()
+        self.assertEqual(4, lock.acquired)
+        self.assertFalse(lock.lock.locked())
+        
+    def test_threads(self):
+        cache = LRUCache(8)
+        errors = []
+        def run():
+            try:
+                for i in range(50):
+                    key = i % 10
+                    if cache.get(key) is None:
+                        cache[key] = i
+            except Exception as e:
+                errors.append(e)
+        threads = [threading.Thread(target=run) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([], errors)
+        self.assertEqual(8, len(cache))
+        
+        
+class ColorUtil_TestCase(base.TestCaseBase):
+    def test_components_key(self):
+        self.assertNotEqual(colorutil.components_key((1, 0.0, 0.0)), 
+                            colorutil.components_key((1.0, 0.0, 0.0)))
+        self.assertNotEqual(colorutil.components_key((0.0, 0.0, 0.0)), 
+                            colorutil.components_key((-0.0, 0.0, 0.0)))
+        
+    def test_hsl_to_rgb(self):
+        self.assertEqual((255., 0., 0.), colorutil.hsl_to_rgb(0., 1., .5))
+        self.assertEqual((255., 0., 0.), colorutil.hsl_to_rgb(0., 1., .5))
+        self.assertEqual((0., 1., .5), colorutil.rgb_to_hsl(255., 0., 0.))
+        
+    def test_palettes(self):
+        hsls = [(0., 1., .5), (120., 1., .5), (0., 1., .5)]
+        rgbs = colorutil.hsl_to_rgb_palette(hsls)
+        self.assertEqual([colorutil.hsl_to_rgb(*x) for x in hsls], rgbs)
+        self.assertEqual([colorutil.rgb_to_hsl(*x) for x in rgbs], 
+                         colorutil.rgb_to_hsl_palette(rgbs))
+        
+        
+class ColorCache_TestCase(base.TestCaseBase):
+    def test_cached(self):
+        a = datatypes.Color.cached(hsl=(10., .5, .5), format='hsl')
+        b = datatypes.Color.cached(hsl=(10., .5, .5), format='hsl')
+        c = datatypes.Color.cached(hsl=(10., .5, .5), format='rgb')
+        self.assertIs(a, b)
+        self.assertIsNot(a, c)
+        self.assertEqual(datatypes.Color(hsl=(10., .5, .5), format='hsl'), a)
+        
+    def test_palette(self):
+        colors = datatypes.Color.palette(hsl=[(0., 1., .5), (240., 1., .5)], 
+                                         format='hex')
+        self.assertEqual([(255., 0., 0., 255), (0., 0., 255., 255)], 
+                         [x.rgba for x in colors])
+        self.assertEqual([], datatypes.Color.palette(rgb=[], format='rgb'))
+        
@@ -0,0 +1,21 @@
+import re
+
+from cssypy.utils import lazy
+
+from .. import base
+
+
+class LazyRegex_TestCase(base.TestCaseBase):
+    def test_compiled_on_first_use(self):
+        regex = lazy.LazyRegex(r'a(?P<b>b+)', re.UNICODE)
+        self.assertNotIn('match', vars(regex))
+        self.assertEqual(u'bb', regex.match(u'abbc').group('b'))
+        self.assertIn('match', vars(regex))
+        self.assertEqual(u'xcxc', regex.sub(u'x', u'abcabbc'))
+        self.assertEqual(r'a(?P<b>b+)', regex.pattern)
+        self.assertEqual({'b': 1}, regex.groupindex)
+        
+    def test_unknown_attribute(self):
+        regex = lazy.LazyRegex(r'a')
+        self.assertRaises(AttributeError, getattr, regex, 'nomethod')
+        self.assertNotIn('match', vars(regex))
@@ -0,0 +1,44 @@
+from __future__ import division
+
+from cssypy.utils import numformat
+from cssypy import core
+
+from .. import base
+
+
+class FormatNumber_TestCase(base.TestCaseBase):
+    def assertFormatsLikeLegacy(self, n, precision=3):
+        expected = numformat.strip_trailing_zeros(
+                        u'{0:.{p}f}'.format(n, p=precision))
+        self.assertEqual(expected, numformat.format_number(n, precision))
+        # a second call may come from the cache
+        self.assertEqual(expected, numformat.format_number(n, precision))
+        
+    def test_integers(self):
+        for n in (0, 1, 7, 100, 2**53 - 1, 2**60, 10**20 + 1):
+            self.assertFormatsLikeLegacy(n)
+            
+    def test_floats(self):
+        for n in (0.0, -0.0, 1.0, 0.5, 1/3, 2/3, 12.3456, 0.0004, 1e20, 
+                  2.0**60, 1e-10):
+            self.assertFormatsLikeLegacy(n)
+            
+    def test_precision(self):
+        self.assertEqual(u'0.33', numformat.format_number(1/3, 2))
+        self.assertEqual(u'0.3333', numformat.format_number(1/3, 4))
+        self.assertEqual(u'2', numformat.format_number(2.5, 0))
+        self.assertEqual(u'5', numformat.format_number(5, 0))
+        
+        
+class NumberPrecisionOption_TestCase(base.TestCaseBase):
+    def test_default(self):
+        css = core.compile_string(u'a { p: 1/3*1px; r: 1/3+10%; }')
+        self.assertIn(u'0.333px', css)
+        self.assertIn(u'10.3%', css)
+        
+    def test_option(self):
+        css = core.compile_string(u'a { p: 1/3*1px; r: 1/3+10%; }', 
+                                  options={'NUMBER_PRECISION': 5})
+        self.assertIn(u'0.33333px', css)
+        self.assertIn(u'10.33333%', css)
+        
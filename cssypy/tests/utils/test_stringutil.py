@@ -1,6 +1,9 @@
 import codecs
+import re
 from StringIO import StringIO
 
+import six
+
 from cssypy.utils import stringutil
 
 from .. import base
@@ -82,3 +85,63 @@ class css_unicode_error_handler_TestCase(base.TestCaseBase):
         self.assertEqual('ab\\00ABCDcd', stream.getvalue())
         
 
+        
+        
+class EscapedChars_TestCase(base.TestCaseBase):
+    def test_same_as_unicode_classes(self):
+        # The negated ASCII classes match the same characters as the classes 
+        # of allowed characters spanning all of Unicode.
+        nmchar = re.compile(
+            u'[^-A-Za-z0-9_\U000000A0-\U0010ffff\u00A0-\uffff]', re.UNICODE)
+        nmstart = re.compile(
+            u'[^A-Za-z_\U000000A0-\U0010ffff\u00A0-\uffff]', re.UNICODE)
+        for cp in range(0x400):
+            c = six.unichr(cp)
+            self.assertEqual(bool(nmchar.match(c)), 
+                             bool(stringutil.re_escape_nmchar.match(c)))
+            self.assertEqual(bool(nmstart.match(c)), 
+                             bool(stringutil.re_escape_nmstart.match(c)))
+            self.assertEqual(not nmchar.match(c), 
+                             bool(stringutil.re_safe_name.match(c)))
+        
+        
+class FastPath_TestCase(base.TestCaseBase):
+    # The fast paths and the memoized results must match the regexes.
+    names = [u'a', u'abc', u'a-b_c', u'-a', u'--a', u'-', u'-1a', u'1a', 
+             u'_a', u'a b', u'a:b', u'a.b', u'\u00e9l\u00e8ve', u'a\\:b', 
+             u'\\31 a', u'a\\"b', u'a\\\nb', u'ab\\', u'\\61 bc']
+    
+    def test_identifiers(self):
+        for _ in range(2):  # the second time from the caches
+            for name in self.names:
+                self.assertEqual(
+                    stringutil.re_unescape_ident.sub(
+                                    stringutil._unescape_ident, name), 
+                    stringutil.unescape_identifier(name))
+                self.assertEqual(stringutil._escape_identifier(name), 
+                                 stringutil.escape_identifier(name))
+                self.assertEqual(
+                    stringutil.re_escape_nmchar.sub(
+                                    stringutil._escape_nmchar, name), 
+                    stringutil.escape_name(name))
+                
+    def test_strings(self):
+        for _ in range(2):
+            for s in self.names + [u'', u'a"b', u"a'b"]:
+                self.assertEqual(
+                    stringutil.re_unescape_string.sub(
+                                    stringutil._unescape_string, s), 
+                    stringutil.unescape_string(s))
+                self.assertEqual(
+                    stringutil.re_escape_dquote_string.sub(u'\\\\\\g<0>', s), 
+                    stringutil.escape_string(s, 'double'))
+                self.assertEqual(
+                    stringutil.re_escape_squote_string.sub(u'\\\\\\g<0>', s), 
+                    stringutil.escape_string(s, 'single'))
+                
+    def test_unicode_result(self):
+        self.assertIsInstance(stringutil.escape_identifier('abc'), 
+                              six.text_type)
+        self.assertIsInstance(stringutil.escape_name('abc'), six.text_type)
+        
+        
@@ -56,6 +56,16 @@ class OptionSpec_TestCase(base.TestCaseBase):
         optdict = optsreader.get_options(cmdline=cmdline)
         self.assertEqual('123', optdict['abc'])
         
+    def test_dest(self):
+        optspec = useroptions.OptionSpec()
+        optspec.add_optdef(Opt('max_x', type=int, dest='MAX_X'))
+        
+        cmdline = ['--max-x', '10']
+        optsreader = useroptions.OptionsReader(optspec)
+        optdict = optsreader.get_options(cmdline=cmdline)
+        self.assertEqual(10, optdict['MAX_X'])
+        self.assertTrue('max_x' not in optdict)
+        
 
 class OptionDef_TestCase(base.TestCaseBase):
     def test_configfile_conv(self):
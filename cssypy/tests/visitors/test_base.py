@@ -0,0 +1,72 @@
+import sys
+
+from cssypy.visitors import base as visitorbase
+from cssypy import parsers
+from cssypy.nodes.util import dump
+from cssypy.nodes import *
+
+from .. import base
+
+
+class RecordingTransformer(visitorbase.NodeTransformer):
+    def __init__(self):
+        self.visited = []
+        
+    def visit_Declaration(self, node):
+        self.visited.append(node.property.name)
+        return self.generic_visit(node)
+        
+    def visit_IdentExpr(self, node):
+        self.visited.append(node.name)
+        if node.name == u'remove':
+            return None
+        if node.name == u'split':
+            return [IdentExpr(name=u'x'), IdentExpr(name=u'y')]
+        if node.name == u'replace':
+            return IdentExpr(name=u'replaced')
+        return node
+        
+        
+class IterativeRecordingTransformer(visitorbase.IterativeNodeTransformer, 
+                                    RecordingTransformer):
+    pass
+
+
+class IterativeNodeTransformer_TestCase(base.TestCaseBase):
+    def parse(self, src):
+        return parsers.Parser(src).parse()
+        
+    def test_same_as_recursive(self):
+        src = (u'a { p1: one two, remove three; p2: split replace; '
+               u'b { p3: func(remove, replace); } }')
+        tree1 = self.parse(src)
+        tree2 = self.parse(src)
+        recursive = RecordingTransformer()
+        iterative = IterativeRecordingTransformer()
+        recursive.visit(tree1)
+        iterative.visit(tree2)
+        self.assertEqual(recursive.visited, iterative.visited)
+        self.assertEqual(dump(tree1), dump(tree2))
+        
+    def test_unchanged_list_not_rebuilt(self):
+        tree = self.parse(u'a { p1: one two; p2: three; }')
+        statements = tree.statements[0].statements
+        items = list(statements)
+        IterativeRecordingTransformer().visit(tree)
+        self.assertIs(statements, tree.statements[0].statements)
+        self.assertEqual(len(items), len(statements))
+        for old, new in zip(items, statements):
+            self.assertIs(old, new)
+            
+    def test_deep_tree(self):
+        depth = sys.getrecursionlimit() * 2
+        node = NumberNode(number=u'1')
+        for i in range(depth):
+            node = UnaryOpExpr(op=UMinus(), operand=node)
+        root = node
+        result = visitorbase.IterativeNodeTransformer().visit(root)
+        self.assertIs(root, result)
+        for i in range(depth):
+            node = node.operand
+        self.assertEqual(NumberNode(number=u'1'), node)
+
@@ -0,0 +1,87 @@
+from cssypy.visitors import batchsolvers, solvers
+from cssypy import core, hooks, parsers, processors, errors
+from cssypy.nodes.util import dump
+from cssypy.nodes import *
+
+from .. import base
+
+
+class BatchSolver_TestCase(base.TestCaseBase):
+    def batch_solve(self, src):
+        stylesheet = parsers.Parser(src).parse()
+        batchsolver = batchsolvers.BatchSolver()
+        batchsolver(stylesheet)
+        return stylesheet, batchsolver
+        
+    def assertSameAsSolver(self, src):
+        expected = parsers.Parser(src).parse()
+        solvers.Solver().visit(expected)
+        stylesheet, batchsolver = self.batch_solve(src)
+        solvers.Solver().visit(stylesheet)
+        self.assertEqual(dump(expected), dump(stylesheet))
+        return batchsolver
+    
+    def test_numbers(self):
+        src = u'a { p: 1+2; q: 7-9; r: 3*4; s: 1.5*3; t: -(2*3); u: +1.5; }'
+        stylesheet, batchsolver = self.batch_solve(src)
+        values = [stmt.expr for stmt in stylesheet.statements[0].statements]
+        self.assertEqual([NumberNode(number=u'3'), 
+                          UnaryOpExpr(op=UMinus(), 
+                                      operand=NumberNode(number=u'2')), 
+                          NumberNode(number=u'12'), 
+                          NumberNode(number=u'4.5'), 
+                          UnaryOpExpr(op=UMinus(), 
+                                      operand=NumberNode(number=u'6')), 
+                          NumberNode(number=u'1.5')], 
+                         values)
+        self.assertEqual(6, batchsolver.folded)
+        
+    def test_same_as_solver(self):
+        src = u'''
+            a { p: 1px+2px; q: 2*3em-1; r: 10%+5; s: 1in+1px; t: 1px+1in; }
+            b { p: (1+2)*(3+4)-5px; q: 1.5*-2; r: 2s+1000ms; s: -1px-1px; }
+            $x: 3px*2;
+            c { p: $x+1px; q: 1-10%; r: 1cm+10mm; s: 100000*100000; }
+        '''
+        batchsolver = self.assertSameAsSolver(src)
+        self.assertEqual(13, batchsolver.folded)
+        
+    def test_unsupported_left_for_solver(self):
+        src = u'$x: 2px; a { p: $x*2; q: 1px*2px; r: 1/0; s: 1px+1s; t: 6/3; }'
+        stylesheet, batchsolver = self.batch_solve(src)
+        self.assertEqual(0, batchsolver.folded)
+        
+    def test_errors_reported_by_solver(self):
+        stylesheet, batchsolver = self.batch_solve(u'a { p: 1px+1s; }')
+        with self.assertRaises(errors.CSSTypeError):
+            solvers.Solver().visit(stylesheet)
+            
+    def test_evaluate_fallback(self):
+        numpy = batchsolvers.numpy
+        try:
+            batchsolvers.numpy = None
+            self.assertSameAsSolver(u'a { p: 1in+1px; q: 2*-3; r: 5/4; }')
+        finally:
+            batchsolvers.numpy = numpy
+            
+            
+    def test_pipeline(self):
+        class Hook(hooks.Hook):
+            trace_nodes = True
+            def __init__(self):
+                self.declarations = 0
+            def node_start(self, visitor, method, node):
+                if isinstance(visitor, batchsolvers.BatchSolver) and \
+                   method == 'visit_Declaration':
+                    self.declarations += 1
+        src = u'a { p: 1px+2px; b { q: 2*3em; } }\nc { r: 1in+1px; }\n'
+        expected = core.compile_string(src)
+        for pipeline in (False, True):
+            hook = Hook()
+            proc = processors.Processor(hook=hook, options={
+                        'ENABLE_BATCH_SOLVE': True, 'ENABLE_PIPELINE': pipeline})
+            proc.parse_string(src)
+            proc.process_imports()
+            proc.apply_transforms()
+            self.assertEqual(expected, proc.write_string())
+            self.assertEqual(3, hook.declarations)
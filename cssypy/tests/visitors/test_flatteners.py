@@ -186,7 +186,79 @@ class Flattener_TestCase(base.TestCaseBase):
         result = self.stylesheet_to_string(stylesheet)
         
         self.assertEqual(expect, result)
-
-
-
-
+        
+        
+class ChainRulesetFlattener_TestCase(base.TestCaseBase):
+    def flatten(self, src, Flattener):
+        stylesheet = parsers.Parser(src).parse()
+        stylesheet = Flattener().visit(stylesheet)
+        stream = io.StringIO()
+        formatters.CSSFormatterVisitor(stream).visit(stylesheet)
+        return stream.getvalue()
+        
+    def test_same_output(self):
+        src = u'''\
+        a, b {
+            p: 1;
+            c, d > e {
+                &.f, g + & { q: 2; }
+                h { r: 3; }
+            }
+            i ~ j {}
+        }
+        k { &:hover, l { s: 4; } }
+        '''
+        src = textwrap.dedent(src)
+        expected = self.flatten(src, flatteners.ChainRulesetFlattener)
+        self.assertEqual(expected, 
+                         self.flatten(src, flatteners.RulesetFlattener))
+        self.assertIn(u'b d > e.f', expected)
+        
+    def test_flatten_statement(self):
+        src = u'a, b { c { p: 1; } }'
+        ruleset = parsers.Parser(src).parse().statements[0]
+        stmts = flatteners.RulesetFlattener().flatten_statement(ruleset)
+        self.assertEqual(2, len(stmts))
+        self.assertEqual(2, len(stmts[1].selectors))
+        
+        
+        
+class LazySelectors_TestCase(base.TestCaseBase):
+    src = textwrap.dedent(u'''\
+    a, b {
+        p: 1;
+        c, & + d, e {
+            &.f, g { q: 2; }
+        }
+    }
+    ''')
+    
+    def flatten(self, options):
+        stylesheet = parsers.Parser(self.src, filename=u'x.css').parse()
+        return flatteners.RulesetFlattener(options).visit(stylesheet)
+        
+    def to_string(self, stylesheet):
+        stream = io.StringIO()
+        formatters.CSSFormatterVisitor(stream).visit(stylesheet)
+        return stream.getvalue()
+        
+    def test_same_output(self):
+        stylesheet = self.flatten({'LAZY_SELECTORS': True})
+        products = [ruleset.selectors for ruleset in stylesheet.statements]
+        # Only the nested rulesets are lazy.
+        self.assertIsInstance(products[0], list)
+        self.assertTrue(all(isinstance(x, flatteners.SelectorProduct) 
+                            for x in products[1:]))
+        self.assertEqual([2, 6, 12], [len(x) for x in products])
+        self.assertEqual(self.to_string(self.flatten({})), 
+                         self.to_string(stylesheet))
+        
+    def test_max_selectors(self):
+        self.flatten({'MAX_SELECTORS': 12})
+        for lazy in (False, True):
+            options = {'MAX_SELECTORS': 11, 'LAZY_SELECTORS': lazy}
+            with self.assertRaises(errors.CSSSelectorExplosionError) as cm:
+                self.flatten(options)
+            self.assertEqual(u'x.css', cm.exception.filename)
+            self.assertEqual(4, cm.exception.lineno)
+            
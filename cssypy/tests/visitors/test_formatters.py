@@ -0,0 +1,60 @@
+import io
+
+from cssypy.visitors import formatters
+from cssypy import parsers, processors, core
+
+from .. import base
+
+
+class MinifyingFormatter_TestCase(base.TestCaseBase):
+    def minify(self, src):
+        stylesheet = parsers.Parser(src).parse()
+        stream = io.StringIO()
+        formatters.MinifyingFormatterVisitor(stream).visit(stylesheet)
+        return stream.getvalue()
+        
+    def test_whitespace(self):
+        src = u'a > b, c  d ~ e + f { margin: 1px 2px; color: red !important; }'
+        self.assertEqual(u'a>b,c d~e+f{margin:1px 2px;color:red!important}', 
+                         self.minify(src))
+        
+    def test_values(self):
+        src = u'a { p: #AABBCC; q: #aabbcd; r: 0px 0.0em 0s 0%; s: x, y; }'
+        self.assertEqual(u'a{p:#abc;q:#aabbcd;r:0 0 0s 0%;s:x,y}', 
+                         self.minify(src))
+        
+    def test_zero_units_kept(self):
+        src = (u'a { flex: 1 1 0px; -webkit-flex: 0px; '
+               u'p: foo(0px, 1px); q: 0px calc(0px+1em); }')
+        self.assertEqual(u'a{flex:1 1 0px;-webkit-flex:0px;'
+                         u'p:foo(0px,1px);q:0 calc(0px+1em)}', 
+                         self.minify(src))
+        visitor = formatters.MinifyingFormatterVisitor(io.StringIO())
+        self.assertFalse(visitor.can_strip_zero_units(u'--gap'))
+        self.assertFalse(visitor.can_strip_zero_units(u'-ms-Flex'))
+        self.assertTrue(visitor.can_strip_zero_units(u'-webkit-margin'))
+        
+    def test_empty_ruleset(self):
+        self.assertEqual(u'b{p:1}', self.minify(u'a {} b { p: 1; }'))
+        
+    def test_no_wrapping(self):
+        src = u'a {{ p: {0}; }}'.format(u' '.join([u'x']*100))
+        self.assertNotIn(u'\n', self.minify(src))
+        
+        
+class MinifyOption_TestCase(base.TestCaseBase):
+    src = u'a { b { p: 1+2; } }'
+    
+    def test_write_string(self):
+        proc = processors.Processor(options={'PROPAGATE_EXCEPTIONS': True})
+        proc.parse_string(self.src)
+        proc.apply_transforms()
+        self.assertEqual(u'a b{p:3}', proc.write_string(minify=True))
+        self.assertEqual(u'a {}\na b {\n    p: 3;\n}\n', proc.write_string())
+        
+    def test_option(self):
+        for pipeline in (False, True):
+            options = {'MINIFY': True, 'ENABLE_PIPELINE': pipeline}
+            self.assertEqual(u'a b{p:3}', 
+                             core.compile_string(self.src, options=options))
+        
@@ -0,0 +1,181 @@
+import io
+import textwrap
+
+from cssypy.visitors import optimizers, flatteners, formatters
+from cssypy import parsers, core
+from cssypy.nodes import *
+
+from .. import base
+
+
+class PropertyFamily_TestCase(base.TestCaseBase):
+    def test_families(self):
+        family = optimizers.property_family
+        self.assertEqual('margin', family(u'margin-top'))
+        self.assertEqual('margin', family(u'MARGIN'))
+        self.assertEqual('border', family(u'-webkit-border-radius'))
+        self.assertEqual('font', family(u'line-height'))
+        self.assertEqual('inset', family(u'left'))
+        self.assertEqual('--main-color', family(u'--main-color'))
+        self.assertEqual('all', family(u'unknown-property'))
+        
+    def test_aliases(self):
+        family = optimizers.property_family
+        for a, b in [(u'word-wrap', u'overflow-wrap'), 
+                     (u'grid-gap', u'gap'), 
+                     (u'grid-row-gap', u'row-gap'), 
+                     (u'grid-column-gap', u'column-gap'), 
+                     (u'page-break-before', u'break-before'), 
+                     (u'page-break-inside', u'break-inside'), 
+                     (u'inline-size', u'width'), 
+                     (u'block-size', u'height'), 
+                     (u'min-inline-size', u'min-width'), 
+                     (u'max-block-size', u'max-height'), 
+                     (u'margin-inline-start', u'margin-left'), 
+                     (u'inset-block-end', u'bottom')]:
+            self.assertEqual(family(a), family(b), (a, b))
+        
+        
+class StructuralKey_TestCase(base.TestCaseBase):
+    def test_declarations(self):
+        def decl(src):
+            return parsers.Parser(u'a {{ {0}; }}'.format(src)).parse().statements[0].statements[0]
+        self.assertEqual(structural_key(decl(u'p: 1px solid')), 
+                         structural_key(decl(u'p: 1px  solid')))
+        self.assertNotEqual(structural_key(decl(u'p: 1px')), 
+                            structural_key(decl(u'p: 1.0px')))
+        self.assertNotEqual(structural_key(decl(u'p: 1px')), 
+                            structural_key(decl(u'p: 1px !important')))
+        
+        
+class RulesetMerger_TestCase(base.TestCaseBase):
+    def optimize(self, src):
+        stylesheet = parsers.Parser(textwrap.dedent(src)).parse()
+        stylesheet = flatteners.RulesetFlattener()(stylesheet)
+        merger = optimizers.RulesetMerger()
+        stylesheet = merger(stylesheet)
+        stream = io.StringIO()
+        formatters.CSSFormatterVisitor(stream).visit(stylesheet)
+        return stream.getvalue(), merger
+        
+    def test_remove_duplicates(self):
+        result, merger = self.optimize(u'a { color: red; margin: 0; color: red; }')
+        self.assertEqual(u'a {\n    margin: 0;\n    color: red;\n}\n', result)
+        self.assertEqual(1, merger.declarations_removed)
+        
+    def test_merge(self):
+        src = u'''\
+        a { color: red; }
+        b { margin: 0; }
+        c { color: red; }
+        d { color: blue; }
+        a { color: red; }
+        '''
+        expect = u'''\
+        a, c {
+            color: red;
+        }
+        b {
+            margin: 0;
+        }
+        d {
+            color: blue;
+        }
+        a {
+            color: red;
+        }
+        '''
+        result, merger = self.optimize(src)
+        self.assertEqual(textwrap.dedent(expect), result)
+        self.assertEqual(1, merger.rulesets_merged)
+        
+    def test_merge_nested(self):
+        src = u'''\
+        x { a { color: red; } b { margin: 0; } c { color: red; } }
+        '''
+        result, merger = self.optimize(src)
+        self.assertIn(u'x a, x c {', result)
+        
+    def test_shorthand_blocks_merge(self):
+        src = u'''\
+        a { line-height: 2; }
+        b { font: 12px serif; }
+        c { line-height: 2; }
+        '''
+        result, merger = self.optimize(src)
+        self.assertEqual(0, merger.rulesets_merged)
+        
+    def test_all_blocks_merge(self):
+        src = u'''\
+        a { color: red; }
+        b { all: initial; }
+        c { color: red; }
+        '''
+        result, merger = self.optimize(src)
+        self.assertEqual(0, merger.rulesets_merged)
+        
+    def test_aliases_block_merge(self):
+        for a, b in [(u'overflow-wrap', u'word-wrap'), 
+                     (u'word-wrap', u'overflow-wrap'), 
+                     (u'gap', u'grid-gap'), 
+                     (u'column-gap', u'grid-column-gap'), 
+                     (u'break-after', u'page-break-after')]:
+            src = u'.a {{ {0}: 1; }} .b {{ {1}: 2; }} .c {{ {0}: 1; }}'
+            result, merger = self.optimize(src.format(a, b))
+            self.assertEqual(0, merger.rulesets_merged, (a, b))
+        
+    def test_logical_properties_block_merge(self):
+        for a, b in [(u'width', u'inline-size'), 
+                     (u'inline-size', u'width'), 
+                     (u'height', u'block-size'), 
+                     (u'max-width', u'max-inline-size'), 
+                     (u'left', u'inset-inline-start'), 
+                     (u'padding-top', u'padding-block-start')]:
+            src = u'.a {{ {0}: 1px; }} .b {{ {1}: 2px; }} .c {{ {0}: 1px; }}'
+            result, merger = self.optimize(src.format(a, b))
+            self.assertEqual(0, merger.rulesets_merged, (a, b))
+        
+    def test_unknown_property_blocks_merge(self):
+        src = u'.a { color: red; } .b { -x-new-thing: 1; } .c { color: red; }'
+        result, merger = self.optimize(src)
+        self.assertEqual(0, merger.rulesets_merged)
+        src = u'.a { color: red; } .b { margin: 0; } .c { color: red; }'
+        result, merger = self.optimize(src)
+        self.assertEqual(1, merger.rulesets_merged)
+        
+    def test_duplicate_selectors(self):
+        result, merger = self.optimize(u'a { p: 1; } a { p: 1; }')
+        self.assertEqual(u'a {\n    p: 1;\n}\n', result)
+        
+    def test_option(self):
+        src = u'a { p: 1; } b { p: 1; }'
+        self.assertIn(u'a, b', core.compile_string(src, options={
+                                        'ENABLE_MERGE_RULESETS': True}))
+        # the pipeline merges within each top-level statement
+        self.assertIn(u'x a, x b', core.compile_string(
+                                        u'x { a { p: 1; } b { p: 1; } }', 
+                                        options={'ENABLE_MERGE_RULESETS': True, 
+                                                 'ENABLE_PIPELINE': True}))
+        self.assertNotIn(u'a, b', core.compile_string(src))
+        
+        
+    def test_lazy_selectors(self):
+        src = u'.p { x: 1; } .q { x: 1; } r { s { x: 2; } t { x: 2; } }'
+        options = {'ENABLE_MERGE_RULESETS': True, 'LAZY_SELECTORS': True}
+        result = core.compile_string(src, options=options)
+        self.assertIn(u'.p, .q', result)
+        self.assertIn(u'r s, r t', result)
+        
+    def test_large_lazy_selectors(self):
+        # Products of more than max_materialized selectors are not merged.
+        stylesheet = parsers.Parser(u'a, b { c, d { x: 1; } } e { x: 1; }'
+                                    ).parse()
+        stylesheet = flatteners.RulesetFlattener({'LAZY_SELECTORS': True}
+                                                 )(stylesheet)
+        merger = optimizers.RulesetMerger()
+        merger.max_materialized = 3
+        merger(stylesheet)
+        self.assertEqual(0, merger.rulesets_merged)
+        merger.max_materialized = 4
+        merger(stylesheet)
+        self.assertEqual(1, merger.rulesets_merged)
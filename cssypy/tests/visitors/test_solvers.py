@@ -325,3 +325,98 @@ class Solver_TestCase(base.TestCaseBase):
 
 
 
+        
+
+class SolverFoldingCache_TestCase(base.TestCaseBase):
+    def solve(self, src):
+        stylesheet = parsers.Parser(src).parse()
+        stats = solvers.SolverStats()
+        solver = solvers.Solver(stats=stats)
+        solver.visit(stylesheet)
+        values = [stmt.expr for ruleset in stylesheet.statements 
+                  for stmt in ruleset.statements]
+        return values, stats
+    
+    def test_repeated_expression(self):
+        src = u'$g: 10px; a { p: $g*2; } b { p: $g*2; } c { p: $g*2+1px; }'
+        values, stats = self.solve(src)
+        self.assertEqual([DimensionNode(number=u'20', unit=u'px'), 
+                          DimensionNode(number=u'20', unit=u'px'), 
+                          DimensionNode(number=u'21', unit=u'px')], values)
+        self.assertEqual(1, stats.fold_hits)
+        self.assertEqual(2, stats.fold_misses)
+        self.assertAlmostEqual(1/3., stats.hit_rate())
+        
+    def test_rebound_variable(self):
+        src = u'$g: 10px; a { p: $g*2; } $g: 3px; b { p: $g*2; }'
+        values, stats = self.solve(src)
+        self.assertEqual([DimensionNode(number=u'20', unit=u'px'), 
+                          DimensionNode(number=u'6', unit=u'px')], values)
+        self.assertEqual(0, stats.fold_hits)
+        self.assertEqual(2, stats.fold_misses)
+        
+    def test_scoped_variable(self):
+        src = u'$g: 1; a { $g: 2; p: -$g; } b { p: -$g; }'
+        values, stats = self.solve(src)
+        self.assertEqual([UnaryOpExpr(op=UMinus(), operand=NumberNode(number=u'2')), 
+                          UnaryOpExpr(op=UMinus(), operand=NumberNode(number=u'1'))], 
+                         values)
+        self.assertEqual(0, stats.fold_hits)
+        
+    def test_uncacheable(self):
+        src = u'a { p: 6/3; } b { p: 6/3; }'
+        values, stats = self.solve(src)
+        self.assertEqual(2, stats.fold_uncacheable)
+        self.assertEqual(0, stats.fold_hits)
+        
+
+class Namespace_TestCase(base.TestCaseBase):
+    def test_scopes(self):
+        ns = solvers.Namespace()
+        ns['a'] = 1
+        ns.push_scope()
+        ns['a'] = 2
+        ns['b'] = 3
+        ns['a'] = 4
+        self.assertEqual(4, ns['a'])
+        self.assertEqual(3, ns['b'])
+        ns.pop_scope()
+        self.assertEqual(1, ns['a'])
+        with self.assertRaises(KeyError):
+            ns['b']
+            
+    def test_merge_child_namespace(self):
+        ns = solvers.Namespace()
+        ns['a'] = 1
+        ns.push_scope()
+        ns['b'] = 2
+        child = solvers.Namespace()
+        child['a'] = 10
+        child['b'] = 20
+        child['c'] = 30
+        ns.merge_child_namespace(child)
+        # names defined in the current scope are not overridden
+        self.assertEqual(10, ns['a'])
+        self.assertEqual(2, ns['b'])
+        self.assertEqual(30, ns['c'])
+        ns.pop_scope()
+        self.assertEqual(1, ns['a'])
+        with self.assertRaises(KeyError):
+            ns['c']
+        
+    def test_merge_into_empty_namespace(self):
+        ns = solvers.Namespace()
+        child = solvers.Namespace()
+        child['a'] = 1
+        ns.merge_child_namespace(child)
+        self.assertEqual(1, ns['a'])
+        
+    def test_solver_merges_imported_namespace(self):
+        solver = solvers.Solver()
+        solver.push_namespace()
+        solver.assign_variable('a', 1)
+        solver.push_namespace()
+        solver.assign_variable('b', 2)
+        solver.pop_namespace()
+        self.assertEqual(1, solver.retrieve_variable('a'))
+        self.assertEqual(2, solver.retrieve_variable('b'))
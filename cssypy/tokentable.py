@@ -0,0 +1,82 @@
+"""Generates _tokentable, the token tables loaded by csstokens, from the 
+definitions in tokendefs.
+
+Usage: python -m cssypy.tokentable [--check] [--snapshot]
+
+With --check, nothing is written: the exit status is 1 if _tokentable is out 
+of date. With --snapshot, the snapshot of the compiled token regex is also 
+written for the running Python (see csstokens.SNAPSHOT_FILENAME).
+"""
+from __future__ import absolute_import
+from __future__ import print_function
+
+import argparse
+import os.path
+import sys
+
+TABLE_FILENAME = os.path.join(os.path.dirname(os.path.abspath(__file__)), 
+                              '_tokentable.py')
+
+HEADER = """\
+# Generated from tokendefs.py by 'python -m cssypy.tokentable'. Do not edit.
+"""
+
+
+#==============================================================================#
+def generate():
+    """Returns the source of the _tokentable module."""
+    from . import tokendefs
+    lines = [HEADER, 'FAMILIES = [']
+    for name, id in tokendefs.FAMILIES:
+        lines.append('    ({0!r}, 0x{1:08X}),'.format(name, id))
+    lines += [']', '', 'TOKENS = [']
+    for name, id in tokendefs.TOKENS:
+        lines.append('    ({0!r}, 0x{1:08X}),'.format(name, id))
+    lines += [']', '', 'TOKEN_REGEXES = [']
+    for regex in tokendefs.TOKEN_REGEXES:
+        lines.append('    {0!r},'.format(regex))
+    lines += [']', '', 
+              'NEWLINE_PATTERN = {0!r}'.format(tokendefs.NEWLINE_PATTERN), '']
+    return '\n'.join(lines)
+
+def is_current(filename=TABLE_FILENAME):
+    """Returns whether the table in 'filename' matches the definitions."""
+    try:
+        with open(filename, 'r') as f:
+            return f.read() == generate()
+    except (IOError, OSError):
+        return False
+
+def write(filename=TABLE_FILENAME):
+    with open(filename, 'w') as f:
+        f.write(generate())
+        
+def write_snapshot():
+    from . import csstokens, tokendefs
+    from .utils import resnapshot
+    pattern = '|'.join(tokendefs.TOKEN_REGEXES)
+    resnapshot.dump(csstokens.SNAPSHOT_FILENAME, pattern)
+    return csstokens.SNAPSHOT_FILENAME
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m cssypy.tokentable')
+    parser.add_argument('--check', action='store_true', 
+                        help='Only check that the table is up to date.')
+    parser.add_argument('--snapshot', action='store_true', 
+                        help='Also write the compiled regex snapshot.')
+    args = parser.parse_args(argv)
+    if args.check:
+        if not is_current():
+            print('{0} is out of date; run python -m cssypy.tokentable'
+                  .format(TABLE_FILENAME), file=sys.stderr)
+            return 1
+        return 0
+    write()
+    print('Wrote {0}'.format(TABLE_FILENAME))
+    if args.snapshot:
+        print('Wrote {0}'.format(write_snapshot()))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -76,8 +76,10 @@ for _name, _unitset in _unitsets:
     unitsets[_name] = _make_unitset(_name, _unitset)
     
 unitset_lookup = {}
+conversion_factors = {}  # unit -> factor converting to the set's common unit
 
 for _unitset in unitsets.itervalues():
-    for _unitname in _unitset.entries:
+    for _unitname, _entry in _unitset.entries.iteritems():
         unitset_lookup[_unitname] = _unitset
+        conversion_factors[_unitname] = _entry.conv
 
@@ -0,0 +1,61 @@
+"""Helpers for the concurrent.futures.Future objects of the asynchronous API.
+
+concurrent.futures is part of the standard library from Python 3.2. On 
+Python 2 it is provided by the 'futures' package, which is only imported 
+when the asynchronous API is used.
+"""
+from __future__ import absolute_import
+from __future__ import print_function
+
+
+#==============================================================================#
+def new_future():
+    from concurrent import futures
+    return futures.Future()
+
+def _invalid_state_errors():
+    # Setting the result of a future that was cancelled or completed in the 
+    # meantime raises InvalidStateError from Python 3.8.
+    from concurrent import futures
+    return getattr(futures, 'InvalidStateError', ())
+
+def set_result(future, result):
+    """Sets the result of 'future', unless it is already done or cancelled."""
+    if not future.done():
+        try:
+            future.set_result(result)
+        except _invalid_state_errors():
+            pass
+
+def set_exception(future, exception):
+    """Sets the exception of 'future', unless it is already done or 
+    cancelled.
+    """
+    if not future.done():
+        try:
+            future.set_exception(exception)
+        except _invalid_state_errors():
+            pass
+
+def propagate_failure(source, target):
+    """If the completed future 'source' was cancelled or raised an exception, 
+    cancels 'target' or sets its exception, and returns True.
+    """
+    if source.cancelled():
+        target.cancel()
+        return True
+    exception = source.exception()
+    if exception is not None:
+        set_exception(target, exception)
+        return True
+    return False
+
+def cancel_with(target, source):
+    """Cancels 'source' when 'target' is cancelled."""
+    def on_done(future):
+        if future.cancelled():
+            source.cancel()
+    target.add_done_callback(on_done)
+
+
+#==============================================================================#
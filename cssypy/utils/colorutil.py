@@ -3,25 +3,76 @@ from __future__ import print_function
 from __future__ import division
 
 import colorsys
+import math
+
+from .lrucache import LRUCache
+
+CACHE_SIZE = 1024
 
 
 # H: 0..360
 # S: 0..1
 # L: 0..1
 
+def components_key(components):
+    """Returns a cache key for a tuple of color components. Unlike the tuple
+    itself, the key tells 1 from 1.0 and 0.0 from -0.0, which are formatted
+    differently.
+    """
+    return tuple((type(c), c, math.copysign(1, c)) for c in components)
+
+
+_hsl_to_rgb_cache = LRUCache(CACHE_SIZE)
+_rgb_to_hsl_cache = LRUCache(CACHE_SIZE)
+
 def hsl_to_rgb(h,s,l):
-    r,g,b = colorsys.hls_to_rgb(h/360.,l,s)
-    return r*255, g*255, b*255
+    key = components_key((h,s,l))
+    rgb = _hsl_to_rgb_cache.get(key)
+    if rgb is None:
+        r,g,b = colorsys.hls_to_rgb(h/360.,l,s)
+        rgb = _hsl_to_rgb_cache[key] = (r*255, g*255, b*255)
+    return rgb
 
 def hsla_to_rgba(h,s,l,a):
-    r,g,b = colorsys.hls_to_rgb(h/360.,l,s)
-    return r*255, g*255, b*255, a
+    return hsl_to_rgb(h,s,l) + (a,)
 
 
 def rgb_to_hsl(r,g,b):
-    h,l,s = colorsys.rgb_to_hls(r/255., g/255., b/255.)
-    return h*360., s, l
+    key = components_key((r,g,b))
+    hsl = _rgb_to_hsl_cache.get(key)
+    if hsl is None:
+        h,l,s = colorsys.rgb_to_hls(r/255., g/255., b/255.)
+        hsl = _rgb_to_hsl_cache[key] = (h*360., s, l)
+    return hsl
 
 def rgba_to_hsla(r,g,b,a):
-    h,l,s = colorsys.rgb_to_hls(r/255., g/255., b/255.)
-    return h*360., s, l, a
+    return rgb_to_hsl(r,g,b) + (a,)
+
+
+def hsl_to_rgb_palette(palette):
+    """Converts a sequence of (h,s,l) tuples to a list of (r,g,b) tuples. Each
+    distinct color is converted once.
+    """
+    converted = {}
+    result = []
+    for hsl in palette:
+        key = components_key(hsl)
+        rgb = converted.get(key)
+        if rgb is None:
+            rgb = converted[key] = hsl_to_rgb(*hsl)
+        result.append(rgb)
+    return result
+
+def rgb_to_hsl_palette(palette):
+    """Converts a sequence of (r,g,b) tuples to a list of (h,s,l) tuples. Each
+    distinct color is converted once.
+    """
+    converted = {}
+    result = []
+    for rgb in palette:
+        key = components_key(rgb)
+        hsl = converted.get(key)
+        if hsl is None:
+            hsl = converted[key] = rgb_to_hsl(*rgb)
+        result.append(hsl)
+    return result
@@ -0,0 +1,46 @@
+"""Deferred initialization of module-level objects that are expensive to 
+create, so that importing a module stays cheap until they are first used.
+"""
+from __future__ import absolute_import
+from __future__ import print_function
+
+import re
+
+# The attributes of a compiled regular expression.
+_REGEX_ATTRS = ('match', 'search', 'sub', 'subn', 'split', 'findall', 
+                'finditer', 'fullmatch', 'scanner', 'pattern', 'flags', 
+                'groups', 'groupindex')
+
+
+#==============================================================================#
+class LazyRegex(object):
+    """A regular expression that is compiled when one of its attributes is 
+    first accessed. It can then be used in place of the compiled regex.
+    
+    'compiler' is called as compiler(pattern, flags) to compile it (default: 
+    re.compile).
+    """
+    def __init__(self, pattern, flags=0, compiler=None):
+        self._pattern = pattern
+        self._flags = flags
+        self._compiler = compiler or re.compile
+        
+    def compile(self):
+        """Compiles the regex, if not done yet, and returns it."""
+        regex = self._compiler(self._pattern, self._flags)
+        # Copy the attributes so that __getattr__ is no longer called.
+        for name in _REGEX_ATTRS:
+            if hasattr(regex, name):
+                setattr(self, name, getattr(regex, name))
+        return regex
+        
+    def __getattr__(self, name):
+        if name.startswith('__') or name not in _REGEX_ATTRS:
+            raise AttributeError(name)
+        return getattr(self.compile(), name)
+        
+    def __repr__(self):
+        return '<LazyRegex {0!r}>'.format(self._pattern)
+
+
+#==============================================================================#
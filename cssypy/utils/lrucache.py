@@ -0,0 +1,56 @@
+from __future__ import absolute_import
+from __future__ import print_function
+
+import collections
+import threading
+
+
+class LRUCache(object):
+    """A dict-like cache holding at most 'maxsize' items. When full, the least
+    recently used item is discarded.
+
+    The caches are shared by the compilations of all threads, so every
+    operation holds a lock.
+    """
+    def __init__(self, maxsize=1024):
+        assert maxsize > 0
+        self.maxsize = maxsize
+        self.items = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        items = self.items
+        with self._lock:
+            if key in items:
+                # move to the most recently used end
+                value = items.pop(key)
+                items[key] = value
+                self.hits += 1
+                return value
+            self.misses += 1
+            return default
+
+    def __setitem__(self, key, value):
+        items = self.items
+        with self._lock:
+            if key in items:
+                del items[key]
+            elif len(items) >= self.maxsize:
+                items.popitem(last=False)
+            items[key] = value
+
+    def __contains__(self, key):
+        return key in self.items
+
+    def __len__(self):
+        return len(self.items)
+
+    def clear(self):
+        with self._lock:
+            self.items.clear()
+            self.hits = 0
+            self.misses = 0
+
+
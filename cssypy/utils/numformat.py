@@ -0,0 +1,54 @@
+from __future__ import absolute_import
+from __future__ import print_function
+
+import six
+
+# Integers below this magnitude are formatted exactly by '{:.Nf}'; larger ones
+# are converted to float first.
+_MAX_EXACT_INT = 2**53
+_CACHE_SIZE = 4096
+
+_cache = {}
+
+
+def strip_trailing_zeros(s, remove_decimal_point=True):
+    """Remove trailing zeros from the string. The string must contain a decimal
+    point. If everything following the decimal point is a zero, the decimal
+    point is also removed.
+    """
+    if '.' not in s:
+        return s
+    s = s.rstrip(u'0')
+    if remove_decimal_point and s[-1] == u'.':
+        s = s[:-1]
+    if not s:
+        return u'0'
+    return s
+
+def format_number(n, precision):
+    """Formats 'n' with at most 'precision' digits after the decimal point and
+    without trailing zeros. Gives the same result as formatting with
+    '{0:.{precision}f}' and stripping the trailing zeros.
+
+    Integers, and floats with integral values, skip the formatting. Other
+    values are cached, so that common fractions (halves, thirds) are only
+    formatted once.
+    """
+    if isinstance(n, six.integer_types):
+        if -_MAX_EXACT_INT < n < _MAX_EXACT_INT:
+            return six.text_type(n)
+    elif n.is_integer() and n and -_MAX_EXACT_INT < n < _MAX_EXACT_INT:
+        return six.text_type(int(n))
+    elif not n:
+        # Don't cache zeros: 0.0 == -0.0, but they format differently.
+        return strip_trailing_zeros(u'{0:.{p}f}'.format(n, p=precision))
+    key = (n, precision)
+    s = _cache.get(key)
+    if s is None:
+        s = strip_trailing_zeros(u'{0:.{p}f}'.format(n, p=precision))
+        if len(_cache) >= _CACHE_SIZE:
+            _cache.clear()
+        _cache[key] = s
+    return s
+
+
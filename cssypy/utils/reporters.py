@@ -61,6 +61,22 @@ class Reporter(ReporterBase):
         msg = fmt.format(e.format_message(show_token=False))
         self.error(msg)
         
+    def on_stats(self, stats):
+        # Written to the error stream, so it doesn't mix with the CSS when 
+        # that is written to stdout.
+        if self.error_stream:
+            self.error_stream.write(stats.format() + '\n')
+            
+    def on_profile(self, profile):
+        # 'profile' is a hooks.ProfileHook.
+        if self.error_stream:
+            self.error_stream.write(profile.format() + '\n')
+            
+    def on_import_graph(self, graph):
+        # 'graph' is an importgraph.ImportGraph.
+        if self.error_stream:
+            self.error_stream.write(graph.format() + '\n')
+        
         
 class NullReporter(object):
     def critical(self, msg): pass
@@ -70,5 +86,8 @@ class NullReporter(object):
     def debug(self, msg): pass
     
     def on_syntax_error(self, e): pass
+    def on_stats(self, stats): pass
+    def on_profile(self, profile): pass
+    def on_import_graph(self, graph): pass
 
 
@@ -0,0 +1,104 @@
+"""Snapshots of compiled regular expressions.
+
+Compiling a large regex (like the scanner's) takes milliseconds, most of it 
+in the pure Python sre_parse and sre_compile modules. A snapshot stores the 
+arguments that the compiler passed to _sre.compile(), so the regex can be 
+rebuilt without parsing or compiling it again. The compiled code is specific 
+to the Python build, so a snapshot is only used by the same sys.version and 
+_sre.MAGIC that made it; otherwise the regex is compiled as usual.
+
+Loading (compiler(), loads()) is safe at any time. Making a snapshot 
+(dump(), dumps()) is for the build step only ('python -m cssypy.tokentable 
+--snapshot'): it temporarily replaces the process-wide _sre.compile.
+"""
+from __future__ import absolute_import
+from __future__ import print_function
+
+import io
+import marshal
+import re
+import sys
+import threading
+
+import _sre
+
+SNAPSHOT_VERSION = 1
+
+
+#==============================================================================#
+def _sre_compiler():
+    try:
+        from re import _compiler    # Python 3.11 and later
+    except ImportError:
+        import sre_compile as _compiler
+    return _compiler
+
+_capture_lock = threading.Lock()
+
+def _capture_compile_args(pattern, flags=0):
+    """Compiles 'pattern' and returns the arguments of the call to 
+    _sre.compile() that created the regex. Build step only.
+    
+    _sre.compile is replaced for the duration of the call, and restored even 
+    if compiling fails. Regexes compiled meanwhile by other threads go 
+    through the replacement, but are not captured.
+    """
+    calls = []
+    thread = threading.current_thread()
+    with _capture_lock:
+        sre_compile = _sre.compile
+        def compile(*args):
+            if threading.current_thread() is thread:
+                calls.append(args)
+            return sre_compile(*args)
+        _sre.compile = compile
+        try:
+            _sre_compiler().compile(pattern, flags)
+        finally:
+            _sre.compile = sre_compile
+    if not calls:
+        raise RuntimeError('_sre.compile() was not called')
+    return calls[0]
+
+def dumps(pattern, flags=0):
+    """Returns a snapshot of the regex 'pattern' as bytes. Build step only 
+    (see _capture_compile_args()).
+    """
+    header = (SNAPSHOT_VERSION, sys.version, _sre.MAGIC, pattern, flags)
+    return marshal.dumps((header, _capture_compile_args(pattern, flags)))
+
+def loads(data, pattern, flags=0):
+    """Returns the regex 'pattern' rebuilt from the snapshot 'data', or None 
+    if the snapshot is of a different pattern or Python build.
+    """
+    try:
+        header, args = marshal.loads(data)
+    except (EOFError, ValueError, TypeError):
+        return None
+    if header != (SNAPSHOT_VERSION, sys.version, _sre.MAGIC, pattern, flags):
+        return None
+    return _sre.compile(*args)
+
+def dump(filename, pattern, flags=0):
+    # Build step only.
+    with io.open(filename, 'wb') as f:
+        f.write(dumps(pattern, flags))
+
+def compiler(filename):
+    """Returns a function that compiles a regex like re.compile(), using the 
+    snapshot in 'filename' if it exists and matches.
+    """
+    def compile(pattern, flags=0):
+        try:
+            with io.open(filename, 'rb') as f:
+                data = f.read()
+        except (IOError, OSError):
+            data = None
+        regex = loads(data, pattern, flags) if data else None
+        if regex is None:
+            regex = re.compile(pattern, flags)
+        return regex
+    return compile
+
+
+#==============================================================================#
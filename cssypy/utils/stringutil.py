@@ -5,21 +5,51 @@ import re
 import codecs
 import sys
 
+import six
+
 from .py3compat import uchr, PYTHON3
+from .lazy import LazyRegex
+
+# Characters below U+00A0 that are not allowed unescaped in a name (anything 
+# but [-A-Za-z0-9_]) and at the start of an identifier (anything but 
+# [A-Za-z_]). All characters from U+00A0 up are allowed. Written as negated 
+# ranges, as classes that span all of Unicode are slow to compile.
+NMCHAR_ESCAPED = ur'\x00-\x2c\x2e\x2f\x3a-\x40\x5b-\x5e\x60\x7b-\x9f'
+NMSTART_ESCAPED = ur'\x00-\x40\x5b-\x5e\x60\x7b-\x9f'
 
 UNESCAPE_IDENT = ur'\\(?P<ucs6>[0-9A-Fa-f]{6})|\\(?P<ucs>[0-9A-Fa-f]{1,5})(?:\r\n|[ \t\r\n\f])?|\\(?P<char>[^\r\nA-Fa-f0-9])'
-ESCAPE_NMSTART = ur'(?P<digit>[0-9])|(?P<other>[^A-Za-z_\U000000A0-\U0010ffff\u00A0-\uffff])'     # lead character, cannot be a digit
-ESCAPE_NMCHAR = ur'(?P<other>[^-A-Za-z0-9_\U000000A0-\U0010ffff\u00A0-\uffff])' # trailing character, may be a digit
+ESCAPE_NMSTART = ur'(?P<digit>[0-9])|(?P<other>[' + NMSTART_ESCAPED + ur'])'     # lead character, cannot be a digit
+ESCAPE_NMCHAR = ur'(?P<other>[' + NMCHAR_ESCAPED + ur'])' # trailing character, may be a digit
 UNESCAPE_STRING = UNESCAPE_IDENT + ur'|\\(?P<nl>\r\n|[\r\n])'
 ESCAPE_DQUOTE_STRING = ur'[\\"]'
 ESCAPE_SQUOTE_STRING = ur"[\\']"
+# Names and identifiers that escape_name() and escape_identifier() return 
+# unchanged.
+SAFE_NAME = ur'[^' + NMCHAR_ESCAPED + ur']+\Z'
+SAFE_IDENT = ur'-?[^' + NMSTART_ESCAPED + ur'][^' + NMCHAR_ESCAPED + ur']*\Z'
+
+# Maximum number of results kept by each of the memoized functions.
+CACHE_SIZE = 4096
+
+re_unescape_ident = LazyRegex(UNESCAPE_IDENT)
+re_escape_nmstart = LazyRegex(ESCAPE_NMSTART, re.UNICODE)
+re_escape_nmchar =  LazyRegex(ESCAPE_NMCHAR, re.UNICODE)
+re_unescape_string = LazyRegex(UNESCAPE_STRING)
+re_escape_dquote_string = LazyRegex(ESCAPE_DQUOTE_STRING, re.UNICODE)
+re_escape_squote_string = LazyRegex(ESCAPE_SQUOTE_STRING, re.UNICODE)
+re_safe_name = LazyRegex(SAFE_NAME, re.UNICODE)
+re_safe_ident = LazyRegex(SAFE_IDENT, re.UNICODE)
+
+_unescape_ident_cache = {}
+_unescape_string_cache = {}
+_escape_name_cache = {}
+_escape_ident_cache = {}
 
-re_unescape_ident = re.compile(UNESCAPE_IDENT)
-re_escape_nmstart = re.compile(ESCAPE_NMSTART, re.UNICODE)
-re_escape_nmchar =  re.compile(ESCAPE_NMCHAR, re.UNICODE)
-re_unescape_string = re.compile(UNESCAPE_STRING)
-re_escape_dquote_string = re.compile(ESCAPE_DQUOTE_STRING, re.UNICODE)
-re_escape_squote_string = re.compile(ESCAPE_SQUOTE_STRING, re.UNICODE)
+def _memoize(cache, key, value):
+    if len(cache) >= CACHE_SIZE:
+        cache.clear()
+    cache[key] = value
+    return value
 
 #==============================================================================#
 if PYTHON3: # pragma: no cover
@@ -66,13 +96,19 @@ def _unescape_ident(m):
 def unescape_name(name):
     # Identical to unescape_identifier(). Provided for symmetry with 
     # escape_name().
-    return re_unescape_ident.sub(_unescape_ident, name)
+    return unescape_identifier(name)
 
 def unescape_identifier(ident):
     # \HEX{1,6}WS --> to_unicode(HEX{1,6})
     # \HEX{1,6} --> to_unicode(HEX{1,6})
     # \CHAR --> CHAR
-    return re_unescape_ident.sub(_unescape_ident, ident)
+    if u'\\' not in ident:
+        return ident
+    s = _unescape_ident_cache.get(ident)
+    if s is None:
+        s = re_unescape_ident.sub(_unescape_ident, ident)
+        _memoize(_unescape_ident_cache, ident, s)
+    return s
     
 #==============================================================================#
 def _escape_nmstart(m):
@@ -95,13 +131,30 @@ def _escape_nmchar(m):
 def escape_name(name):
     if not name:
         return name
-    return re_escape_nmchar.sub(_escape_nmchar, name)
+    s = _escape_name_cache.get(name)
+    if s is None:
+        if re_safe_name.match(name):
+            s = six.text_type(name)
+        else:
+            s = re_escape_nmchar.sub(_escape_nmchar, name)
+        _memoize(_escape_name_cache, name, s)
+    return s
 
 def escape_identifier(ident):
     # [^-A-Za-z0-9_\xA0-\xFFFFFFFF] -> \CHAR
     # Note: chars that cannot be represented in the current encoding are handled elsewhere.
     if not ident:
         return ident
+    s = _escape_ident_cache.get(ident)
+    if s is None:
+        if re_safe_ident.match(ident):
+            s = six.text_type(ident)
+        else:
+            s = _escape_identifier(ident)
+        _memoize(_escape_ident_cache, ident, s)
+    return s
+    
+def _escape_identifier(ident):
     if ident[0] == '-':
         return u''.join((
             u'-',
@@ -141,7 +194,13 @@ def _unescape_string(m):
 def unescape_string(s):
     # \NEWLINE -> nothing
     # \CHAR -> CHAR
-    return re_unescape_string.sub(_unescape_string, s)
+    if u'\\' not in s:
+        return s
+    result = _unescape_string_cache.get(s)
+    if result is None:
+        result = re_unescape_string.sub(_unescape_string, s)
+        _memoize(_unescape_string_cache, s, result)
+    return result
     
 def unquote_string(s):
     # Remove opening and closing quotes and unescape the contents. The string 
@@ -155,8 +214,12 @@ def escape_string(s, quote_type='double'):
     # quote -> \quote
     # Note: chars that cannot be represented in the current encoding are handled elsewhere.
     if quote_type=='double':
+        if u'\\' not in s and u'"' not in s:
+            return s
         return re_escape_dquote_string.sub(ur'\\\g<0>', s)
     elif quote_type=='single':
+        if u'\\' not in s and u"'" not in s:
+            return s
         return re_escape_squote_string.sub(ur'\\\g<0>', s)
     else:
         raise ValueError("Unknown quote_type: '{0}'".format(quote_type))
@@ -3,7 +3,6 @@ from __future__ import print_function
 
 import os.path
 import argparse
-import ConfigParser as configparser
 import collections
 import __builtin__
 
@@ -67,6 +66,10 @@ class OptionDef(object):
         else:
             return ('--'+self.name.replace('_', '-'),)
         
+    def storage_name(self):
+        # the key of the option in the options dict
+        return self.dest or self.name
+        
     def configfile_name(self):
         return self.name.lower()
         
@@ -260,6 +263,7 @@ class OptionsReader(object):
             return {}
         
         # 2. Open and parse the file
+        import ConfigParser as configparser  # only needed with a config file
         parser = configparser.ConfigParser()
         try:
             with open(filepath, 'r') as f:
@@ -278,7 +282,7 @@ class OptionsReader(object):
                     val = parser.get(section, opt.configfile_name(), raw=True)
                     # TODO: handle exception when configfile_conv() fails
                     val = opt.configfile_conv(val)
-                    confdict[opt.name] = val
+                    confdict[opt.storage_name()] = val
                 except (configparser.NoSectionError, configparser.NoOptionError):
                     pass
         return confdict
@@ -296,11 +300,12 @@ class OptionsReader(object):
         
     def merge_options(self, argsdict, confdict):
         for opt in self.optspec.iteroptions():
-            if opt.name not in argsdict:
-                if opt.name in confdict:
-                    argsdict[opt.name] = confdict[opt.name]
+            name = opt.storage_name()
+            if name not in argsdict:
+                if name in confdict:
+                    argsdict[name] = confdict[name]
                 else:
-                    argsdict[opt.name] = opt.get_default()
+                    argsdict[name] = opt.get_default()
         return argsdict
         
     def get_options(self, cmdline=None, config_filename=None):
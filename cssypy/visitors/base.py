@@ -3,9 +3,37 @@ from __future__ import print_function
 
 from ..nodes import Node, iter_fields
 
+
+def _traced(visitor, method, func):
+    # Wraps the bound visit_* method 'func' of 'visitor' in calls to the hook.
+    def traced(node):
+        hook = visitor.hook
+        hook.node_start(visitor, method, node)
+        try:
+            return func(node)
+        finally:
+            hook.node_end(visitor, method, node)
+    return traced
+
+
 # These visitor classes are based on those in the standard library 'ast' module
 
 class NodeVisitor(object):
+    hook = None
+    
+    def set_hook(self, hook):
+        """Sets the hooks.Hook of the visitor. If the hook traces nodes, each 
+        visit_* method of this instance is wrapped to call the hook's 
+        node_start() and node_end(); otherwise visiting is left untouched.
+        """
+        self.hook = hook
+        for method in dir(type(self)):
+            if method.startswith('visit_'):
+                self.__dict__.pop(method, None)
+                if hook is not None and hook.trace_nodes:
+                    setattr(self, method, 
+                            _traced(self, method, getattr(self, method)))
+        
     def visit(self, node):
         """Visit a node."""
         method = 'visit_' + node.__class__.__name__
@@ -48,3 +76,64 @@ class NodeTransformer(NodeVisitor):
         return node
 
 
+class IterativeNodeTransformer(NodeTransformer):
+    """A NodeTransformer whose generic_visit walks the tree with an explicit 
+    stack instead of recursion.
+    
+    Nodes without a visit_* method are descended into iteratively, so deep 
+    trees do not hit the recursion limit. Visitor methods are called in the 
+    same order as with NodeTransformer. A list field is only rebuilt when one 
+    of its items is actually replaced or removed.
+    """
+    def _transform_fields(self, node):
+        # Generator yielding each child node of 'node' and receiving the 
+        # child's replacement.
+        for field in node._fields:
+            old_value = getattr(node, field, None)
+            if isinstance(old_value, list):
+                new_values = None
+                for i, value in enumerate(old_value):
+                    if isinstance(value, Node):
+                        new_value = yield value
+                        if new_value is not value:
+                            if new_values is None:
+                                new_values = old_value[:i]
+                            if new_value is None:
+                                continue
+                            elif not isinstance(new_value, Node):
+                                new_values.extend(new_value)
+                                continue
+                            value = new_value
+                    if new_values is not None:
+                        new_values.append(value)
+                if new_values is not None:
+                    old_value[:] = new_values
+            elif isinstance(old_value, Node):
+                new_node = yield old_value
+                if new_node is None:
+                    delattr(node, field)
+                elif new_node is not old_value:
+                    setattr(node, field, new_node)
+    
+    def generic_visit(self, node):
+        nodes = [node]
+        frames = [self._transform_fields(node)]
+        result = None
+        while frames:
+            try:
+                child = frames[-1].send(result)
+            except StopIteration:
+                # generic_visit() always returns the node it was given.
+                frames.pop()
+                result = nodes.pop()
+                continue
+            visitor = getattr(self, 'visit_' + child.__class__.__name__, None)
+            if visitor is None:
+                nodes.append(child)
+                frames.append(self._transform_fields(child))
+                result = None
+            else:
+                result = visitor(child)
+        return node
+
+
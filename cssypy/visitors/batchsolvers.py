@@ -0,0 +1,297 @@
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+
+import array
+import operator
+
+import six
+
+try:
+    import numpy
+except ImportError:     # pragma: no cover
+    numpy = None
+
+from .base import NodeVisitor
+from .solvers import value_as_node
+from .. import nodes, datatypes, units
+
+#==============================================================================#
+# Kinds of values held in a slot.
+FAILED =        0
+NUMBER =        1
+PERCENTAGE =    2
+DIMENSION =     3
+
+# Integer operands at or above this magnitude are left to the Solver, so that
+# evaluating integer arithmetic with doubles gives exactly the same results.
+MAX_EXACT_INT = 2**26
+
+# Operation codes.
+ADD, SUB, MUL, DIV, NEG, POS = range(6)
+
+_binops = {
+    nodes.AddOp:        ADD,
+    nodes.SubtractOp:   SUB,
+    nodes.MultOp:       MUL,
+    nodes.DivisionOp:   DIV,
+}
+
+_unops = {
+    nodes.UMinus:   NEG,
+    nodes.UPlus:    POS,
+}
+
+_leaf_nodes = (nodes.NumberNode, nodes.PercentageNode, nodes.DimensionNode)
+
+_scalar_ops = {
+    ADD: operator.add,
+    SUB: operator.sub,
+    MUL: operator.mul,
+    DIV: operator.truediv,
+}
+
+#==============================================================================#
+def evaluate(opcode, xs, ys=None, lscale=1.0, rscale=1.0, divisor=1.0):
+    """Applies a binary operation elementwise as
+    'op(x*lscale, y*rscale) / divisor', or a unary operation to 'xs' when 'ys'
+    is None. Uses NumPy if it is available, otherwise typed arrays. Returns a
+    sequence of floats.
+    """
+    if numpy is not None:
+        x = numpy.array(xs, dtype=numpy.float64)
+        if ys is None:
+            return (-x if opcode == NEG else x).tolist()
+        y = numpy.array(ys, dtype=numpy.float64)
+    else:
+        x = array.array('d', xs)
+        if ys is None:
+            if opcode == NEG:
+                return array.array('d', (-a for a in x))
+            return x
+        y = array.array('d', ys)
+        if lscale != 1.0:
+            x = array.array('d', (a * lscale for a in x))
+        if rscale != 1.0:
+            y = array.array('d', (b * rscale for b in y))
+        r = array.array('d', map(_scalar_ops[opcode], x, y))
+        if divisor != 1.0:
+            r = array.array('d', (c / divisor for c in r))
+        return r
+    if lscale != 1.0:
+        x = x * lscale
+    if rscale != 1.0:
+        y = y * rscale
+    r = _scalar_ops[opcode](x, y)
+    if divisor != 1.0:
+        r = r / divisor
+    return r.tolist()
+
+
+#==============================================================================#
+class BatchSolver(NodeVisitor):
+    """Solves the arithmetic in a stylesheet in bulk, ahead of the Solver.
+
+    The expressions of declarations and variable definitions that consist
+    only of numeric literals (numbers, percentages and dimensions) and
+    arithmetic operators are gathered into flat arrays of slots. The
+    operations are then evaluated level by level (leaves first), with the
+    operations of each level grouped by operator and unit conversion factors
+    so each group is a single vectorized operation. Solved expressions are
+    replaced by the same nodes the Solver would produce.
+
+    Expressions that would raise an error (incompatible types or units,
+    division by zero) are left untouched for the Solver to report.
+    """
+    def __init__(self, options=None):
+        self.kinds = []
+        self.units = []
+        self.ints = []
+        self.values = []
+        self.levels = []
+        self.ops = {}       # level -> [(slot, opcode, lhs, rhs)]
+        self.targets = []   # [(statement, root slot)]
+        self.folded = 0
+        self.precision = options.get('NUMBER_PRECISION') if options else None
+
+    def __call__(self, node):
+        self.visit(node)
+        self.solve()
+        return node
+
+    def new_slot(self, kind, unit, isint, value, level):
+        self.kinds.append(kind)
+        self.units.append(unit)
+        self.ints.append(isint)
+        self.values.append(value)
+        self.levels.append(level)
+        return len(self.kinds) - 1
+
+    #==========================================================================#
+    def generic_visit(self, node):
+        pass
+
+    def visit_Stylesheet(self, node):
+        for stmt in node.statements:
+            self.visit(stmt)
+
+    def visit_RuleSet(self, node):
+        for stmt in node.statements:
+            self.visit(stmt)
+
+    def visit_Declaration(self, node):
+        self.add_target(node)
+
+    def visit_VarDef(self, node):
+        self.add_target(node)
+
+    def add_target(self, stmt):
+        if isinstance(stmt.expr, (nodes.BinaryOpExpr, nodes.UnaryOpExpr)):
+            slot = self.compile_expr(stmt.expr)
+            if slot is not None:
+                self.targets.append((stmt, slot))
+
+    def compile_expr(self, node):
+        """Allocates slots for the expression 'node' and returns the slot of
+        its result, or None if it cannot be solved in bulk.
+        """
+        if isinstance(node, nodes.BinaryOpExpr):
+            opcode = _binops.get(type(node.op))
+            if opcode is None:
+                return None
+            lhs = self.compile_expr(node.lhs)
+            if lhs is None:
+                return None
+            rhs = self.compile_expr(node.rhs)
+            if rhs is None:
+                return None
+        elif isinstance(node, nodes.UnaryOpExpr):
+            opcode = _unops.get(type(node.op))
+            if opcode is None:
+                return None
+            lhs = self.compile_expr(node.operand)
+            if lhs is None:
+                return None
+            rhs = None
+        elif isinstance(node, _leaf_nodes):
+            return self.compile_leaf(node.to_value())
+        else:
+            return None
+        level = self.levels[lhs]
+        if rhs is not None:
+            level = max(level, self.levels[rhs])
+        level += 1
+        slot = self.new_slot(FAILED, None, False, None, level)
+        self.ops.setdefault(level, []).append((slot, opcode, lhs, rhs))
+        return slot
+
+    def compile_leaf(self, value):
+        if isinstance(value, datatypes.Number):
+            isint = isinstance(value.n, six.integer_types)
+            if isint and abs(value.n) >= MAX_EXACT_INT:
+                return None
+            return self.new_slot(NUMBER, None, isint, value.n, 0)
+        elif isinstance(value, datatypes.Percentage):
+            return self.new_slot(PERCENTAGE, None, False, value.p, 0)
+        else:
+            assert isinstance(value, datatypes.Dimension)
+            return self.new_slot(DIMENSION, value.unit, False, value.n, 0)
+
+    #==========================================================================#
+    def result_type(self, opcode, lhs, rhs):
+        """Returns (kind, unit, isint, lscale, rscale, divisor) for the result
+        of an operation, following the rules of the datatypes module, or None
+        if the operation is not supported.
+        """
+        kinds, units_, ints = self.kinds, self.units, self.ints
+        ka = kinds[lhs]
+        if ka == FAILED:
+            return None
+        if rhs is None:
+            return ka, units_[lhs], ints[lhs], 1.0, 1.0, 1.0
+        kb = kinds[rhs]
+        if kb == FAILED:
+            return None
+        isint = ints[lhs] and ints[rhs]
+        if isint and (abs(self.values[lhs]) >= MAX_EXACT_INT or
+                      abs(self.values[rhs]) >= MAX_EXACT_INT):
+            return None
+        if opcode == ADD or opcode == SUB:
+            if ka == NUMBER and kb == NUMBER:
+                return NUMBER, None, isint, 1.0, 1.0, 1.0
+            elif ka == PERCENTAGE and kb in (PERCENTAGE, NUMBER):
+                return PERCENTAGE, None, False, 1.0, 1.0, 1.0
+            elif ka == NUMBER and kb == PERCENTAGE:
+                return PERCENTAGE, None, False, 1.0, 1.0, 1.0
+            elif ka == DIMENSION and kb == DIMENSION:
+                ua, ub = units_[lhs], units_[rhs]
+                if ua == ub:
+                    return DIMENSION, ua, False, 1.0, 1.0, 1.0
+                unitset = units.unitset_lookup.get(ua)
+                if unitset and (ub in unitset):
+                    ca = units.conversion_factors[ua]
+                    cb = units.conversion_factors[ub]
+                    return DIMENSION, ua, False, ca, cb, ca
+            elif ka == DIMENSION and kb == NUMBER:
+                return DIMENSION, units_[lhs], False, 1.0, 1.0, 1.0
+            elif ka == NUMBER and kb == DIMENSION:
+                return DIMENSION, units_[rhs], False, 1.0, 1.0, 1.0
+        elif opcode == MUL:
+            if ka == NUMBER and kb == NUMBER:
+                return NUMBER, None, isint, 1.0, 1.0, 1.0
+            elif ka == DIMENSION and kb == NUMBER:
+                return DIMENSION, units_[lhs], False, 1.0, 1.0, 1.0
+            elif ka == NUMBER and kb == DIMENSION:
+                return DIMENSION, units_[rhs], False, 1.0, 1.0, 1.0
+        elif opcode == DIV:
+            if ka == NUMBER and kb == NUMBER and self.values[rhs] != 0:
+                return NUMBER, None, False, 1.0, 1.0, 1.0
+        return None
+
+    def solve_level(self, ops):
+        groups = {}
+        for slot, opcode, lhs, rhs in ops:
+            rtype = self.result_type(opcode, lhs, rhs)
+            if rtype is None:
+                continue
+            kind, unit, isint, lscale, rscale, divisor = rtype
+            self.kinds[slot] = kind
+            self.units[slot] = unit
+            self.ints[slot] = isint
+            key = (opcode, rhs is None, lscale, rscale, divisor)
+            groups.setdefault(key, []).append((slot, lhs, rhs))
+        values = self.values
+        for key, members in groups.iteritems():
+            opcode, unary, lscale, rscale, divisor = key
+            xs = [values[lhs] for slot, lhs, rhs in members]
+            if unary:
+                results = evaluate(opcode, xs)
+            else:
+                ys = [values[rhs] for slot, lhs, rhs in members]
+                results = evaluate(opcode, xs, ys, lscale, rscale, divisor)
+            for (slot, lhs, rhs), result in zip(members, results):
+                if self.ints[slot]:
+                    result = int(result)
+                values[slot] = result
+
+    def solve(self):
+        for level in sorted(self.ops):
+            self.solve_level(self.ops[level])
+        for stmt, slot in self.targets:
+            value = self.slot_value(slot)
+            if value is not None:
+                stmt.expr = value_as_node(value, self.precision)
+                self.folded += 1
+
+    def slot_value(self, slot):
+        kind = self.kinds[slot]
+        if kind == NUMBER:
+            return datatypes.Number(self.values[slot])
+        elif kind == PERCENTAGE:
+            return datatypes.Percentage(self.values[slot])
+        elif kind == DIMENSION:
+            return datatypes.Dimension(self.values[slot], self.units[slot])
+        return None
+
+
+#==============================================================================#
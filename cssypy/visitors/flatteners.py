@@ -2,9 +2,33 @@ from __future__ import absolute_import
 from __future__ import print_function
 
 from .base import NodeTransformer
-from .. import nodes
+from .. import nodes, errors
 
 #==============================================================================#
+def resolve_selector(ancestors, selector):
+    """Returns the children of 'selector' combined with the list of resolved 
+    'ancestors' children. The 'ancestors' list may be modified.
+    """
+    assert isinstance(ancestors, list)
+    assert isinstance(selector, nodes.Selector)
+    if not ancestors:
+        return selector.children[:]
+    for i,node in enumerate(selector.children):
+        if isinstance(node, nodes.SimpleSelectorSequence) and isinstance(node.head, nodes.CombineAncestorSelector):
+            newseq = selector.children[:]
+            if node.tail:
+                assert isinstance(ancestors[-1], nodes.SimpleSelectorSequence)
+                anc = nodes.SimpleSelectorSequence(ancestors[-1].head, ancestors[-1].tail[:])  # clone()?
+                ancestors[-1] = anc
+                ancestors[-1].tail.extend(node.tail)
+            newseq[i:i+1] = ancestors
+            return newseq
+    else:
+        ancestors.append(nodes.DescendantCombinator())
+        ancestors.extend(selector.children)
+        return ancestors
+        
+        
 class RulesetChain(object):
     def __init__(self, selectors, statements):
         assert isinstance(selectors, list)
@@ -29,24 +53,7 @@ class RulesetChain(object):
             self.selector_seqs = new_selector_seqs
             
     def _resolve_selector(self, ancestors, selector):
-        assert isinstance(ancestors, list)
-        assert isinstance(selector, nodes.Selector)
-        if not ancestors:
-            return selector.children[:]
-        for i,node in enumerate(selector.children):
-            if isinstance(node, nodes.SimpleSelectorSequence) and isinstance(node.head, nodes.CombineAncestorSelector):
-                newseq = selector.children[:]
-                if node.tail:
-                    assert isinstance(ancestors[-1], nodes.SimpleSelectorSequence)
-                    anc = nodes.SimpleSelectorSequence(ancestors[-1].head, ancestors[-1].tail[:])  # clone()?
-                    ancestors[-1] = anc
-                    ancestors[-1].tail.extend(node.tail)
-                newseq[i:i+1] = ancestors
-                return newseq
-        else:
-            ancestors.append(nodes.DescendantCombinator())
-            ancestors.extend(selector.children)
-            return ancestors
+        return resolve_selector(ancestors, selector)
     
     def resolve_selectors(self):
         selectors = []
@@ -62,8 +69,132 @@ class RulesetChain(object):
         return selectors
 
 
+#==============================================================================#
+class SelectorProduct(object):
+    """The selectors of a flattened ruleset, generated lazily: each of 
+    'selectors' combined with each of 'prefixes'. 'prefixes' is a list of 
+    tuples of resolved selector children, or the SelectorProduct of the 
+    enclosing ruleset.
+    
+    Iterating yields Selector nodes. The length is known without generating 
+    the selectors.
+    """
+    def __init__(self, prefixes, selectors):
+        self.prefixes = prefixes
+        self.selectors = selectors
+        self._len = len(prefixes) * len(selectors)
+        
+    def __len__(self):
+        return self._len
+        
+    def resolved(self):
+        # yields lists of resolved selector children
+        for selector in self.selectors:
+            prefixes = self.prefixes
+            if isinstance(prefixes, SelectorProduct):
+                prefixes = prefixes.resolved()
+            for prefix in prefixes:
+                yield resolve_selector(list(prefix), selector)
+                
+    def __iter__(self):
+        for children in self.resolved():
+            yield nodes.Selector(children)
+            
+
 #==============================================================================#
 class RulesetFlattener(NodeTransformer):
+    """Flattens nested rulesets in a single top-down pass. 
+    
+    Each nesting level passes the resolved selectors of its ruleset down to 
+    its children as tuples, which are shared by all the selectors built from 
+    them. The flattened rulesets are appended to the output in document order 
+    (each ruleset before the rulesets nested in it).
+    
+    With the LAZY_SELECTORS option, the selectors of the flattened nested 
+    rulesets are SelectorProducts, generated as they are written; top-level 
+    rulesets keep a list of their selectors. The MAX_SELECTORS 
+    option limits the number of selectors of a flattened ruleset.
+    """
+    def __init__(self, options=None):
+        options = options or {}
+        self.lazy = options.get('LAZY_SELECTORS', False)
+        self.max_selectors = options.get('MAX_SELECTORS')
+        
+    def __call__(self, node):
+        return self.visit(node)
+    
+    def visit(self, node):
+        # RuleSets are flattened by self.flatten_ruleset, called directly from 
+        # their parent nodes.
+        assert node is not None
+        assert not isinstance(node, nodes.RuleSet)
+        return super(RulesetFlattener, self).visit(node)
+        
+    def flatten_statement(self, stmt):
+        """Flatten a single top-level statement. Returns a list of the 
+        statements that replace it.
+        """
+        newstmts = []
+        self.flatten_into(stmt, newstmts)
+        return newstmts
+        
+    def flatten_into(self, stmt, output):
+        if isinstance(stmt, nodes.RuleSet):
+            self.flatten_ruleset(stmt, [()], output)
+        else:
+            newstmt = self.visit(stmt)
+            if newstmt:
+                output.append(newstmt)
+        
+    def visit_Stylesheet(self, node):
+        output = []
+        for stmt in node.statements:
+            self.flatten_into(stmt, output)
+        node.statements = output
+        return node
+        
+    def flatten_ruleset(self, node, prefixes, output):
+        # 'prefixes' holds the resolved selectors of the enclosing rulesets, 
+        # as tuples of selector children.
+        child_rulesets = []
+        child_statements = []  # non-ruleset statements
+        for stmt in node.statements:
+            if isinstance(stmt, nodes.RuleSet):
+                child_rulesets.append(stmt)
+            elif isinstance(stmt, nodes.VarDef):
+                # TODO: use pkg-specific exception
+                raise RuntimeError('Cannot flatten rulesets containing variable definitions.')
+            else:
+                child_statements.append(stmt)
+        self.check_selector_count(node, len(prefixes) * len(node.selectors))
+        if self.lazy and prefixes != [()]:
+            resolved = SelectorProduct(prefixes, node.selectors)
+            selectors = resolved
+        else:
+            resolved = [tuple(resolve_selector(list(prefix), selector)) 
+                        for selector in node.selectors for prefix in prefixes]
+            selectors = [nodes.Selector(list(children)) 
+                         for children in resolved]
+        output.append(nodes.RuleSet(selectors, child_statements, 
+                                    lineno=node.lineno, filename=node.filename))
+        if not node.selectors:
+            resolved = prefixes
+        for stmt in child_rulesets:
+            self.flatten_ruleset(stmt, resolved, output)
+            
+
+    def check_selector_count(self, node, count):
+        if self.max_selectors is not None and count > self.max_selectors:
+            msg = ('Flattening the ruleset produces {0} selectors, more than '
+                   'the limit of {1}.'.format(count, self.max_selectors))
+            raise errors.CSSSelectorExplosionError(msg, filename=node.filename, 
+                                                   lineno=node.lineno)
+            
+
+class ChainRulesetFlattener(NodeTransformer):
+    """The original flattener, which builds a chain of selectors for each 
+    ruleset bottom-up. Kept as a reference for RulesetFlattener.
+    """
     def __init__(self, options=None):
         pass
         
@@ -75,33 +206,36 @@ class RulesetFlattener(NodeTransformer):
         # directly from their parent nodes.
         assert node is not None
         assert not isinstance(node, nodes.RuleSet)
-        return super(RulesetFlattener, self).visit(node)
+        return super(ChainRulesetFlattener, self).visit(node)
+        
+    def flatten_statement(self, stmt):
+        """Flatten a single top-level statement. Returns a list of the 
+        statements that replace it.
+        """
+        if isinstance(stmt, nodes.RuleSet):
+            # get chains from ruleset
+            chains = self.visit_RuleSet(stmt)
+            newrulesets = []
+            for chain in chains:
+                # resolve chain selectors
+                selectors = chain.resolve_selectors()
+                statements = chain.statements
+                # create new ruleset from resolved selectors and statements
+                ruleset = nodes.RuleSet(selectors, statements)
+                newrulesets.append(ruleset)
+            return newrulesets
+        newstmt = self.visit(stmt)
+        if newstmt:
+            return [newstmt]
+        return []
         
     def visit_Stylesheet(self, node):
         i = 0
         while i < len(node.statements):
-            stmt = node.statements[i]
-            if isinstance(stmt, nodes.RuleSet):
-                # get chains from ruleset
-                chains = self.visit_RuleSet(stmt)
-                newrulesets = []
-                for chain in chains:
-                    # resolve chain selectors
-                    selectors = chain.resolve_selectors()
-                    statements = chain.statements
-                    # create new ruleset from resolved selectors and statements
-                    ruleset = nodes.RuleSet(selectors, statements)
-                    newrulesets.append(ruleset)
-                # replace stmt with new rulesets
-                node.statements[i:i+1] = newrulesets
-                i += len(newrulesets)
-            else:
-                newstmt = self.visit(stmt)
-                if newstmt:
-                    node.statements[i:i+1] = [newstmt]
-                    i += 1
-                else:
-                    node.statements[i:i+1] = []
+            newstmts = self.flatten_statement(node.statements[i])
+            # replace stmt with new statements
+            node.statements[i:i+1] = newstmts
+            i += len(newstmts)
         return node
                 
     def visit_RuleSet(self, node):
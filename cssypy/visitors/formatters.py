@@ -2,24 +2,33 @@ from __future__ import absolute_import
 from __future__ import print_function
 
 from .base import NodeVisitor
-from .. import nodes
+from .. import nodes, writers
 from ..utils import stringutil
 
 
 #==============================================================================#
 class CSSFormatterVisitor(NodeVisitor):
-    def __init__(self, stream):
+    def __init__(self, stream, source_map=None):
+        # 'source_map' is an optional sourcemaps.SourceMapGenerator.
         self.indent_str = u' '*4
         self.indent_level = 0
         self.line_width = 80
         self.stream = stream
-        self._cache = u''
-        self._last_optional_newline = 0
+        self.source_map = source_map
+        self.writer = writers.ChunkWriter(stream, self.line_width, 
+                                          source_map=source_map)
+        self.write = self.writer.write
+        
+    def mark(self, node):
+        """Maps the position of the next write to the source of 'node'."""
+        if self.source_map is not None and node.lineno:
+            self.writer.mark(node.filename, node.lineno)
+        
+    def indent(self):
+        return self.indent_str * self.indent_level
         
     def newline(self):
-        self.write(u'\n')
-        self.flush()
-        self.write(self.indent_str * self.indent_level)
+        self.writer.newline(self.indent())
         
     def push_indent(self):
         self.indent_level += 1
@@ -27,26 +36,11 @@ class CSSFormatterVisitor(NodeVisitor):
     def pop_indent(self):
         self.indent_level -= 1
         
-    def write(self, data):
-        self._cache += data
-        if self._last_optional_newline and len(self._cache) > self.line_width:
-            temp = self._cache[self._last_optional_newline:]
-            self._cache = self._cache[:self._last_optional_newline]
-            self.newline()
-            self._cache = temp
-        ##self.stream.write(data)
-        
     def optional_newline(self):
-        if len(self._cache) > self.line_width:
-            self.newline()
-        else:
-            self._last_optional_newline = len(self._cache)
+        self.writer.optional_newline(self.indent())
         
     def flush(self):
-        ##print('type(self._cache): {0}'.format(type(self._cache)))
-        self.stream.write(self._cache)
-        self._cache = u''
-        self._last_optional_newline = 0
+        self.writer.flush()
         
     def generic_visit(self, node):
         super(CSSFormatterVisitor, self).generic_visit(node)
@@ -76,11 +70,15 @@ class CSSFormatterVisitor(NodeVisitor):
         
     def visit_RuleSet(self, node):
         # selectors '{' PUSH_INDENT NL statements POP_INDENT NL '}'
-        for selector in node.selectors[:-1]:
+        # 'selectors' may be a lazily generated SelectorProduct
+        self.mark(node)
+        first = True
+        for selector in node.selectors:
+            if not first:
+                self.write(u', ')
+                self.optional_newline()
+            first = False
             self.visit_Selector(selector)
-            self.write(u', ')
-            self.optional_newline()
-        self.visit_Selector(node.selectors[-1])
         
         if node.statements:
             self.write(u' {')
@@ -100,6 +98,7 @@ class CSSFormatterVisitor(NodeVisitor):
         
     def visit_Declaration(self, node):
         # property ':' expression '!important'? ';'
+        self.mark(node)
         self.visit(node.property)
         self.write(u': ')
         self.visit(node.expr)
@@ -305,3 +304,106 @@ class CSSFormatterVisitor(NodeVisitor):
 
 #==============================================================================#
 
+class MinifyingFormatterVisitor(CSSFormatterVisitor):
+    """Writes the stylesheet with as few characters as possible: no optional 
+    whitespace or newlines, short lowercase hex colors, zero lengths without 
+    units, no semicolon after the last declaration of a ruleset, and no empty 
+    rulesets. The output is a single line.
+    
+    Units are only dropped from zero lengths at the top level of a 
+    declaration's value: not in function arguments (a unitless 0 is invalid 
+    in calc() and the like), nor in the values of the properties of 
+    'keep_zero_units' (in 'flex', 0 is the grow factor, not the basis) or of 
+    custom properties.
+    """
+    # Units that can be dropped from zero values.
+    length_units = frozenset([u'px', u'em', u'rem', u'ex', u'ch', u'vw', 
+                              u'vh', u'vmin', u'vmax', u'cm', u'mm', u'q', 
+                              u'in', u'pt', u'pc'])
+    # Properties (without vendor prefix) whose zero lengths keep their units.
+    keep_zero_units = frozenset([u'flex'])
+    
+    # True while writing a value whose zero lengths can lose their units.
+    _strip_zero_units = False
+    
+    def newline(self):
+        pass
+        
+    def optional_newline(self):
+        pass
+        
+    # Structure...
+    def visit_RuleSet(self, node):
+        if not node.statements:
+            return
+        write = self.write
+        self.mark(node)
+        first = True
+        for selector in node.selectors:
+            if not first:
+                write(u',')
+            first = False
+            self.visit_Selector(selector)
+        write(u'{')
+        first = True
+        for stmt in node.statements:
+            if not first:
+                write(u';')
+            first = False
+            self.visit(stmt)
+        write(u'}')
+        
+    def visit_Declaration(self, node):
+        self.mark(node)
+        self.visit(node.property)
+        self.write(u':')
+        self._strip_zero_units = self.can_strip_zero_units(node.property.name)
+        try:
+            self.visit(node.expr)
+        finally:
+            self._strip_zero_units = False
+        if node.important:
+            self.write(u'!important')
+            
+    def can_strip_zero_units(self, name):
+        name = name.lower()
+        if name.startswith(u'--'):
+            return False    # custom property
+        if name.startswith(u'-'):
+            name = name.partition(u'-')[2].partition(u'-')[2]
+        return name not in self.keep_zero_units
+        
+    def visit_Selector(self, node):
+        for child in node.children:
+            self.visit(child)
+        
+    # Values...
+    def visit_FunctionExpr(self, node):
+        strip = self._strip_zero_units
+        self._strip_zero_units = False
+        try:
+            super(MinifyingFormatterVisitor, self).visit_FunctionExpr(node)
+        finally:
+            self._strip_zero_units = strip
+        
+    def visit_DimensionNode(self, node):
+        if (self._strip_zero_units and 
+                node.unit.lower() in self.length_units and 
+                float(node.number) == 0):
+            self.write(u'0')
+        else:
+            self.write(node.to_string())
+        
+    def visit_HexColorNode(self, node):
+        r, g, b = node.normalized_hex()
+        if r[0] == r[1] and g[0] == g[1] and b[0] == b[1]:
+            self.write(u'#{0}{1}{2}'.format(r[0], g[0], b[0]))
+        else:
+            self.write(u'#{0}{1}{2}'.format(r, g, b))
+        
+    # Operators...
+    def visit_CommaOp(self, node):
+        self.write(u',')
+
+
+#==============================================================================#
@@ -4,7 +4,7 @@ from __future__ import print_function
 from . import base
 from .. import nodes
 
-class Importer(base.NodeTransformer):
+class Importer(base.IterativeNodeTransformer):
     def __init__(self, callback):
         self.callback = callback
         
@@ -25,3 +25,20 @@ class Importer(base.NodeTransformer):
         return self.visit(node)
 
 
+class CountingImporter(Importer):
+    """An Importer that also counts the nodes it goes through: those of the 
+    stylesheet it is called on, without the imported stylesheets.
+    """
+    def __init__(self, callback):
+        super(CountingImporter, self).__init__(callback)
+        self.node_count = 0
+        
+    def _transform_fields(self, node):
+        self.node_count += 1
+        return super(CountingImporter, self)._transform_fields(node)
+        
+    def visit_Import(self, node):
+        self.node_count += sum(1 for child in nodes.walk(node))
+        return super(CountingImporter, self).visit_Import(node)
+
+
@@ -0,0 +1,182 @@
+from __future__ import absolute_import
+from __future__ import print_function
+
+from .base import NodeVisitor
+from .. import nodes
+from ..utils.lazy import LazyRegex
+
+#==============================================================================#
+re_vendor_prefix = LazyRegex(r'^-[a-z0-9]+-')
+
+# Properties that are set by shorthands of another family, or that are 
+# aliases or logical equivalents of properties of another family.
+_family_aliases = {
+    'line':     'font',     # font -> line-height
+    'osx':      'font',     # -moz-osx-font-smoothing
+    'columns':  'gap',      # columns -> column-*
+    'column':   'gap',      # gap -> column-gap
+    'row':      'gap',      # gap -> row-gap
+    'grid':     'gap',      # grid-gap, grid-row-gap, grid-column-gap
+    'top':      'inset',    # inset -> top, right, bottom, left
+    'right':    'inset',
+    'bottom':   'inset',
+    'left':     'inset',
+    'place':    'align',    # place-* -> align-*, justify-*
+    'justify':  'align',
+    'page':     'break',    # page-break-* -> break-*
+    'width':    'size',     # inline-size, block-size -> width, height
+    'height':   'size',
+    'inline':   'size',
+    'block':    'size',
+    'min':      'size',
+    'max':      'size',
+    'white':    'text',     # white-space -> text-wrap-mode
+    'print':    'color',    # print-color-adjust, color-adjust
+    'forced':   'color',
+}
+
+# Aliases of whole property names.
+_property_aliases = {
+    'word-wrap':    'overflow', # overflow-wrap
+}
+
+# A family that conflicts with every other family.
+ALL = 'all'
+
+# The families of the known properties, after aliasing.
+_families = frozenset([
+    ALL, 'accent', 'align', 'animation', 'appearance', 'aspect', 'backdrop', 
+    'backface', 'background', 'border', 'box', 'break', 'caption', 'caret', 
+    'clear', 'clip', 'color', 'contain', 'container', 'content', 'counter', 
+    'cursor', 'direction', 'display', 'empty', 'fill', 'filter', 'flex', 
+    'float', 'font', 'gap', 'hyphenate', 'hyphens', 'image', 'initial', 
+    'inset', 'isolation', 'letter', 'list', 'margin', 'marker', 'mask', 
+    'mix', 'object', 'offset', 'opacity', 'order', 'orphans', 'outline', 
+    'overflow', 'overscroll', 'padding', 'paint', 'perspective', 'pointer', 
+    'position', 'quotes', 'resize', 'rotate', 'ruby', 'scale', 'scroll', 
+    'scrollbar', 'shape', 'size', 'speak', 'stroke', 'tab', 'table', 'tap', 
+    'text', 'touch', 'transform', 'transition', 'translate', 'unicode', 
+    'user', 'vertical', 'visibility', 'widows', 'will', 'word', 'writing', 
+    'z', 'zoom',
+])
+
+
+def property_family(name):
+    """Returns the family of a property: the first part of its name without
+    any vendor prefix, or that of the properties it is an alias or a logical 
+    equivalent of. Declarations of properties in different families never
+    override each other. Unknown properties are in the ALL family, as they 
+    may override anything.
+    """
+    name = name.lower()
+    if name.startswith('--'):
+        # custom property
+        return name
+    name = re_vendor_prefix.sub('', name)
+    family = _property_aliases.get(name)
+    if family is None:
+        family = name.split('-', 1)[0]
+        family = _family_aliases.get(family, family)
+    return family if family in _families else ALL
+
+
+#==============================================================================#
+class RulesetMerger(NodeVisitor):
+    """Optimizes a flattened stylesheet.
+
+    - Exact duplicate declarations in a ruleset are removed, keeping the last
+      one.
+    - Rulesets with identical declarations are merged into the first of them,
+      if no ruleset between them declares a property of the same family (so
+      the cascade is unchanged). Statements other than rulesets, and 
+      rulesets declaring properties that property_family() does not know, 
+      are never moved across.
+
+    The lazy selectors of a ruleset (a flatteners.SelectorProduct, with the
+    LAZY_SELECTORS option) are generated to be merged if there are at most
+    'max_materialized' of them; larger products are left unmerged.
+    """
+    max_materialized = 64
+
+    def __init__(self, options=None):
+        self.declarations_removed = 0
+        self.rulesets_merged = 0
+
+    def __call__(self, node):
+        return self.visit(node)
+
+    def visit_Stylesheet(self, node):
+        node.statements = self.merge(node.statements)
+        return node
+
+    def remove_duplicates(self, ruleset):
+        seen = set()
+        statements = []
+        for stmt in reversed(ruleset.statements):
+            key = nodes.structural_key(stmt)
+            if key in seen:
+                self.declarations_removed += 1
+                continue
+            seen.add(key)
+            statements.append(stmt)
+        statements.reverse()
+        ruleset.statements = statements
+
+    def merge(self, statements):
+        """Returns the optimized list of 'statements'."""
+        output = []
+        # body key -> (ruleset, its position, families of its body)
+        candidates = {}
+        # family -> position of the last ruleset declaring it
+        last_declared = {}
+        position = 0
+        for stmt in statements:
+            if not isinstance(stmt, nodes.RuleSet):
+                candidates.clear()
+                output.append(stmt)
+                continue
+            self.remove_duplicates(stmt)
+            self.materialize(stmt)
+            key = nodes.structural_key(stmt.statements)
+            candidate = candidates.get(key)
+            if candidate is not None and isinstance(stmt.selectors, list):
+                ruleset, pos, families = candidate
+                if all(last_declared.get(f, pos) <= pos for f in families):
+                    self.add_selectors(ruleset, stmt.selectors)
+                    self.rulesets_merged += 1
+                    continue
+            position += 1
+            families = self.families(stmt)
+            for family in families:
+                last_declared[family] = position
+            if families:
+                # every declaration conflicts with the 'all' property
+                last_declared[ALL] = position
+            if ALL in families:
+                candidates.clear()
+            if isinstance(stmt.selectors, list):
+                candidates[key] = (stmt, position, families)
+            output.append(stmt)
+        return output
+
+    def materialize(self, ruleset):
+        selectors = ruleset.selectors
+        if (not isinstance(selectors, list) and 
+                len(selectors) <= self.max_materialized):
+            ruleset.selectors = list(selectors)
+
+    def families(self, ruleset):
+        return frozenset(property_family(stmt.property.name)
+                         for stmt in ruleset.statements
+                         if isinstance(stmt, nodes.Declaration))
+
+    def add_selectors(self, ruleset, selectors):
+        keys = set(nodes.structural_key(sel) for sel in ruleset.selectors)
+        for sel in selectors:
+            key = nodes.structural_key(sel)
+            if key not in keys:
+                keys.add(key)
+                ruleset.selectors.append(sel)
+
+
+#==============================================================================#
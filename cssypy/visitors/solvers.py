@@ -9,6 +9,21 @@ from .. import nodes, errors, datatypes, functions
 
 ifilter = itertools.ifilter
 
+#==============================================================================#
+def value_as_node(value, precision=None):
+    """Converts a solved value to the node that represents it. 'precision' 
+    overrides the default number of decimal places of numeric values.
+    """
+    assert not isinstance(value, (list, tuple))
+    if not isinstance(value, nodes.Node):
+        if value.is_negative():
+            node = nodes.CSSValueNode.node_from_value(-value, precision)
+            return nodes.UnaryOpExpr(op=nodes.UMinus(), operand=node) 
+        else:
+            return nodes.CSSValueNode.node_from_value(value, precision)
+    return value
+
+
 #==============================================================================#
 class ScopeContext(object):
     def __init__(self, solver):
@@ -34,41 +49,94 @@ class NamespaceContext(object):
         self.solver.pop_namespace()
         
 
+_UNBOUND = object()
+
 class Namespace(object):
+    """Variable bindings for a stylesheet.
+    
+    All visible bindings are kept in one dict, so a lookup is a single dict 
+    access. Each pushed scope has an undo log recording the binding each name 
+    had before the scope first assigned it; popping the scope restores them.
+    """
     def __init__(self):
-        self.scopes = [{}]
+        self.vars = {}
+        self.undo_logs = []
         
     def push_scope(self):
-        self.scopes.append({})
+        self.undo_logs.append({})
         
     def pop_scope(self):
-        self.scopes.pop()
+        vars = self.vars
+        for name, value in self.undo_logs.pop().iteritems():
+            if value is _UNBOUND:
+                del vars[name]
+            else:
+                vars[name] = value
+                
+    def in_current_scope(self, name):
+        if self.undo_logs:
+            return name in self.undo_logs[-1]
+        return name in self.vars
         
     def merge_child_namespace(self, child):
         assert isinstance(child, Namespace)
-        assert len(child.scopes) == 1
-        for name, value in child.scopes[0].iteritems():
-            if name not in self.scopes[-1]:
-                self.scopes[-1][name] = value
+        assert not child.undo_logs
+        if not self.vars and not self.undo_logs:
+            # Nothing to shadow; take over the child's bindings as they are.
+            self.vars = child.vars
+            child.vars = {}
+            return
+        for name, value in child.vars.iteritems():
+            if not self.in_current_scope(name):
+                self[name] = value
         
     def __getitem__(self, name):
-        for scope in self.scopes[::-1]:
-            try:
-                return scope[name]
-            except KeyError:
-                pass
-        # TODO: should this raise an exception or return a sentinel value?
-        raise KeyError('name not found')
+        try:
+            return self.vars[name]
+        except KeyError:
+            # TODO: should this raise an exception or return a sentinel value?
+            raise KeyError('name not found')
         
     def __setitem__(self, name, value):
-        self.scopes[-1][name] = value
+        if self.undo_logs:
+            undo_log = self.undo_logs[-1]
+            if name not in undo_log:
+                undo_log[name] = self.vars.get(name, _UNBOUND)
+        self.vars[name] = value
+
+
+#==============================================================================#
+class SolverStats(object):
+    """Counters for the Solver's constant-folding cache."""
+    def __init__(self):
+        self.fold_hits = 0
+        self.fold_misses = 0
+        self.fold_uncacheable = 0
+        
+    def hit_rate(self):
+        lookups = self.fold_hits + self.fold_misses
+        if not lookups:
+            return 0.0
+        return float(self.fold_hits) / lookups
+        
+    def __repr__(self):
+        fmt = '<SolverStats: hits={0}, misses={1}, uncacheable={2}>'
+        return fmt.format(self.fold_hits, self.fold_misses, 
+                          self.fold_uncacheable)
 
 
 #==============================================================================#
 class Solver(NodeTransformer):
-    def __init__(self, options=None):
+    def __init__(self, options=None, stats=None):
         self.namespaces = []
         self.context = None
+        self.stats = stats
+        self.precision = options.get('NUMBER_PRECISION') if options else None
+        # Constant-folding cache: maps the key of an arithmetic expression to 
+        # its solved value and the variable bindings the key refers to. The 
+        # bindings are kept so their ids stay unique while the entry exists.
+        self._folds = {}
+        self._folding = 0
         
     def namespace(self):
         return NamespaceContext(self)
@@ -79,7 +147,7 @@ class Solver(NodeTransformer):
     def pop_namespace(self):
         if len(self.namespaces) > 1:
             child = self.namespaces.pop()
-            self.namespaces[-1].merge_child_namespaces(child)
+            self.namespaces[-1].merge_child_namespace(child)
         else:
             self.namespaces.pop()
         
@@ -105,14 +173,7 @@ class Solver(NodeTransformer):
         return node
         
     def value_as_node(self, value):
-        assert not isinstance(value, (list, tuple))
-        if not isinstance(value, nodes.Node):
-            if value.is_negative():
-                node = nodes.CSSValueNode.node_from_value(-value)
-                return nodes.UnaryOpExpr(op=nodes.UMinus(), operand=node) 
-            else:
-                return nodes.CSSValueNode.node_from_value(value)
-        return value
+        return value_as_node(value, self.precision)
         
     #==========================================================================#
     def __call__(self, node):
@@ -161,7 +222,79 @@ class Solver(NodeTransformer):
         except KeyError:
             raise errors.CSSVarNameError()
         
+    #==========================================================================#
+    def fold_key(self, node, bindings):
+        """Returns a hashable key describing the structure of the arithmetic 
+        expression 'node' and the identity of the variable bindings it reads, 
+        or None if the expression's value cannot be cached. The bindings read 
+        are appended to the list 'bindings'.
+        """
+        if isinstance(node, nodes.BinaryOpExpr):
+            if node.op not in self._binop_map:
+                return None
+            lhs = self.fold_key(node.lhs, bindings)
+            if lhs is None:
+                return None
+            rhs = self.fold_key(node.rhs, bindings)
+            if rhs is None:
+                return None
+            return (type(node.op), lhs, rhs)
+        elif isinstance(node, nodes.UnaryOpExpr):
+            operand = self.fold_key(node.operand, bindings)
+            if operand is None:
+                return None
+            return (type(node.op), operand)
+        elif isinstance(node, nodes.VarName):
+            try:
+                value = self.retrieve_variable(node.name)
+            except KeyError:
+                return None
+            bindings.append(value)
+            return (nodes.VarName, node.name, id(value))
+        elif isinstance(node, nodes.CSSValueNode):
+            return (type(node),) + tuple(getattr(node, field) 
+                                         for field in node._fields)
+        return None
+        
+    def fold(self, node, solve):
+        """Returns the value of the arithmetic expression 'node', computed by 
+        'solve(node)' unless an identical expression reading the same 
+        variable bindings has already been solved. Only the outermost 
+        expression is cached.
+        """
+        if self._folding:
+            return solve(node)
+        bindings = []
+        key = self.fold_key(node, bindings)
+        if key is not None:
+            try:
+                value = self._folds[key][0]
+            except KeyError:
+                pass
+            else:
+                if self.stats:
+                    self.stats.fold_hits += 1
+                return value
+        self._folding += 1
+        try:
+            value = solve(node)
+        finally:
+            self._folding -= 1
+        if key is not None:
+            self._folds[key] = (value, bindings)
+            if self.stats:
+                self.stats.fold_misses += 1
+        elif self.stats:
+            self.stats.fold_uncacheable += 1
+        return value
+        
     def visit_UnaryOpExpr(self, node):
+        return self.fold(node, self.solve_UnaryOpExpr)
+        
+    def visit_BinaryOpExpr(self, node):
+        return self.fold(node, self.solve_BinaryOpExpr)
+        
+    def solve_UnaryOpExpr(self, node):
         # TODO: handle TypeError 'bad operand type for ...' exceptions
         operand = self.visit(node.operand)
         if isinstance(node.op, nodes.UMinus):
@@ -178,7 +311,7 @@ class Solver(NodeTransformer):
         nodes.DivisionOp(): operator.truediv,
     }
         
-    def visit_BinaryOpExpr(self, node):
+    def solve_BinaryOpExpr(self, node):
         # TODO: handle TypeError 'unsupported operand type ...' exceptions
         lhs = self.visit(node.lhs)
         rhs = self.visit(node.rhs)
@@ -196,9 +329,8 @@ class Solver(NodeTransformer):
     def call_function(self, name, operands):
         # 1. check that function exists
         #   - function doesn't exist - not an error
-        try:
-            func = functions.get_function(name, len(operands))
-        except errors.CSSFunctionNotFound:
+        func = functions.lookup_function(name, len(operands))
+        if func is None:
             return None
         # 2. convert operands to values
         # 2.a. handle error on conversion
@@ -0,0 +1,215 @@
+from __future__ import absolute_import
+from __future__ import print_function
+
+import codecs
+
+# Number of chunks collected before they are written to the stream.
+BLOCK_SIZE = 8192
+# Number of characters collected before they are encoded.
+ENCODE_BLOCK_SIZE = 256 * 1024
+
+# Encodings that can be applied to separate blocks of text. Any other encoding
+# may keep state (e.g. a byte order mark) between blocks.
+STATELESS_ENCODINGS = frozenset(['utf-8', 'ascii', 'latin-1', 'iso8859-1'])
+
+
+#==============================================================================#
+class ChunkWriter(object):
+    """Collects the output of a formatter and wraps long lines.
+
+    'write' appends a string to a list of chunks. A line may be broken at the
+    last optional newline if it grows longer than 'line_width'; the text after
+    the break continues on the next line without indentation. Whether to
+    break is decided at the next newline or optional newline, so the column
+    of the current line is only counted there and writing a chunk is a single
+    list append. Once about 'block_size' chunks have been collected, the
+    finished lines are joined and written to 'stream'.
+
+    If 'source_map' (a sourcemaps.SourceMapGenerator) is given, positions
+    marked with 'mark' are added to it as each line is finished, once their
+    generated line and column are known.
+    """
+    def __init__(self, stream, line_width=80, block_size=BLOCK_SIZE, 
+                 source_map=None):
+        self.stream = stream
+        self.line_width = line_width
+        self.block_size = block_size
+        self._chunks = []
+        self._line_start = 0    # index in self._chunks of the current line
+        self._line_offset = 0   # column of that index (after a flush)
+        self._column = 0        # length of the current line up to...
+        self._counted = 0       # ...this index in self._chunks
+        self._wrap_column = 0   # column of the last optional newline, or 0
+        self._wrap_index = 0    # index in self._chunks of that column
+        self.source_map = source_map
+        self._marks = []        # (index in self._chunks, filename, lineno)
+        self.write = self._chunks.append
+
+    @property
+    def column(self):
+        """The length of the current line."""
+        chunks = self._chunks
+        if self._counted < len(chunks):
+            self._column += sum(map(len, chunks[self._counted:]))
+            self._counted = len(chunks)
+        return self._column
+
+    def mark(self, filename, lineno):
+        """Maps the position of the next write to line 'lineno' of 
+        'filename'.
+        """
+        if self.source_map is not None:
+            self._marks.append((len(self._chunks), filename, lineno))
+
+    def _map_line(self, end, newline=True):
+        # Adds the marks before index 'end' (the end of the current line) to
+        # the source map.
+        chunks = self._chunks
+        start = self._line_start
+        column = self._line_offset
+        count = 0
+        for index, filename, lineno in self._marks:
+            if index >= end:
+                break
+            column += sum(map(len, chunks[start:index]))
+            start = index
+            self.source_map.add(column, filename, lineno)
+            count += 1
+        if count:
+            del self._marks[:count]
+        if newline:
+            self.source_map.next_line()
+
+    def _shift_marks(self, offset):
+        self._marks = [(index + offset, filename, lineno) 
+                       for index, filename, lineno in self._marks]
+
+    def wrap_if_needed(self):
+        if self._wrap_column and self.column > self.line_width:
+            self.wrap()
+
+    def wrap(self):
+        """Breaks the current line at the last optional newline."""
+        column = self.column
+        i = self._wrap_index
+        if self.source_map is not None:
+            self._map_line(i)
+            self._shift_marks(1)
+        self._chunks.insert(i, u'\n')
+        self._line_start = i + 1
+        self._line_offset = 0
+        self._column = column - self._wrap_column
+        self._counted += 1
+        self._wrap_column = 0
+
+    def newline(self, indent=u''):
+        chunks = self._chunks
+        chunks.append(u'\n')
+        self.wrap_if_needed()
+        if self.source_map is not None:
+            self._map_line(len(chunks) - 1)
+        if len(chunks) >= self.block_size:
+            self.write_block()
+        chunks.append(indent)
+        self._line_start = self._counted = len(chunks) - 1
+        self._line_offset = 0
+        self._column = 0
+        self._wrap_column = 0
+
+    def optional_newline(self, indent=u''):
+        column = self.column
+        if column > self.line_width:
+            if self._wrap_column:
+                self.wrap()
+                column = self._column
+            if column > self.line_width:
+                self.newline(indent)
+                return
+        self._wrap_column = column
+        self._wrap_index = len(self._chunks)
+
+    def write_block(self):
+        """Writes the finished lines to the stream."""
+        chunks = self._chunks
+        start = self._line_start
+        if start:
+            self.stream.write(u''.join(chunks[:start]))
+            del chunks[:start]
+            self._counted -= start
+            self._wrap_index -= start
+            if self._marks:
+                self._shift_marks(-start)
+            self._line_start = 0
+
+    def flush(self):
+        """Writes all pending output, including the current line, to the
+        stream. The current line goes on after it: its column is kept.
+        """
+        self.wrap_if_needed()
+        column = self.column
+        chunks = self._chunks
+        if self.source_map is not None:
+            self._map_line(len(chunks), newline=False)
+        if chunks:
+            self.stream.write(u''.join(chunks))
+            if self._marks:
+                self._shift_marks(-len(chunks))
+            del chunks[:]
+        self._line_start = self._counted = 0
+        self._line_offset = self._column = column
+        self._wrap_column = 0
+
+
+#==============================================================================#
+class EncodedOutput(object):
+    """A text stream that encodes its output to the byte stream 'stream'.
+
+    Written text is collected, and encoded in blocks of about 'block_size' 
+    characters. For stateless encodings (utf-8, ascii, latin-1) each block is 
+    encoded with the built-in codec; the 'errors' handler is only used for a 
+    block that cannot be encoded as is. Other encodings use an incremental 
+    encoder.
+    """
+    def __init__(self, stream, encoding, errors='cssypy', 
+                 block_size=ENCODE_BLOCK_SIZE):
+        self.stream = stream
+        self.encoding = codecs.lookup(encoding).name
+        self.errors = errors
+        self.block_size = block_size
+        self._texts = []
+        self._length = 0
+        self.bytes_written = 0
+        if self.encoding in STATELESS_ENCODINGS:
+            self.encode = self._encode_block
+        else:
+            encoder = codecs.getincrementalencoder(self.encoding)(errors)
+            self.encode = encoder.encode
+        
+    def _encode_block(self, text):
+        try:
+            return text.encode(self.encoding)
+        except UnicodeEncodeError:
+            return text.encode(self.encoding, self.errors)
+        
+    def write(self, text):
+        self._texts.append(text)
+        self._length += len(text)
+        if self._length >= self.block_size:
+            self.write_block()
+            
+    def write_block(self):
+        if self._texts:
+            data = self.encode(u''.join(self._texts))
+            self.stream.write(data)
+            self.bytes_written += len(data)
+            del self._texts[:]
+            self._length = 0
+            
+    def flush(self):
+        """Encodes and writes all pending output."""
+        self.write_block()
+        if hasattr(self.stream, 'flush'):
+            self.stream.flush()
+
+
+#==============================================================================#
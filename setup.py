@@ -67,6 +67,10 @@ setup(
     packages = find_packages(),
     include_package_data = True,
     install_requires = install_requires,
+    extras_require = {
+        # core.compile_async() needs concurrent.futures
+        'async': ['futures'],
+    },
     zip_safe = True,
     
     test_suite = 'cssypy.tests',